@@ -0,0 +1,25 @@
+"""Add traffic keyset pagination index
+
+Revision ID: 9c4e2a7b1d30
+Revises: 55bf67eab1ad
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4e2a7b1d30'
+down_revision: Union[str, None] = '55bf67eab1ad'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_traffics_timestamp_id', 'traffics', ['timestamp', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_traffics_timestamp_id', table_name='traffics')
@@ -0,0 +1,36 @@
+"""Normalize traffic plate keys
+
+Revision ID: a3d7e9f1c446
+Revises: f1c3a5e7b335
+Create Date: 2026-10-20 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3d7e9f1c446'
+down_revision: Union[str, None] = 'f1c3a5e7b335'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# utils.plates.normalize_plate_text as a one-to-one character mapping:
+# Persian/Arabic-Indic digits and Persian plate letters to the LPR codes
+PERSIAN_CHARS = "۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩" + "ابصدژفگهعجکلمنثقستوطیپشز"
+PLATE_CODES = "01234567890123456789" + "abcdefghijklmnoqstvwypuz"
+
+
+def upgrade() -> None:
+    # e5b9d1c7a224 backfilled the raw segments; rows holding Persian
+    # characters never matched plate filters on the normalized key
+    op.execute(
+        f"UPDATE traffics SET plate_key = translate(btrim(prefix_2 || alpha || mid_3 || suffix_2), "
+        f"'{PERSIAN_CHARS}', '{PLATE_CODES}') "
+        "WHERE plate_key IS NULL OR plate_key !~ '^[ -~]*$'"
+    )
+
+
+def downgrade() -> None:
+    pass
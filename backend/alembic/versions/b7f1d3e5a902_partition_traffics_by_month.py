@@ -0,0 +1,140 @@
+"""Partition traffics by month
+
+Revision ID: b7f1d3e5a902
+Revises: 9c4e2a7b1d30
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7f1d3e5a902'
+down_revision: Union[str, None] = '9c4e2a7b1d30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 2
+
+COLUMNS = """
+    id INTEGER NOT NULL DEFAULT nextval('traffics_id_seq'::regclass),
+    prefix_2 VARCHAR(2) NOT NULL,
+    alpha VARCHAR(1) NOT NULL,
+    mid_3 VARCHAR(3) NOT NULL,
+    suffix_2 VARCHAR(2) NOT NULL,
+    plate_number VARCHAR NOT NULL,
+    timestamp TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    ocr_accuracy FLOAT,
+    vision_speed FLOAT,
+    camera_name VARCHAR,
+    gate_name VARCHAR,
+    plate_image VARCHAR,
+    full_image VARCHAR,
+    access_granted BOOLEAN
+"""
+COLUMN_NAMES = (
+    "id, prefix_2, alpha, mid_3, suffix_2, plate_number, timestamp, ocr_accuracy, "
+    "vision_speed, camera_name, gate_name, plate_image, full_image, access_granted"
+)
+INDEXES = (
+    "CREATE INDEX ix_traffics_id ON traffics (id)",
+    "CREATE INDEX ix_traffics_plate_number ON traffics (plate_number)",
+    "CREATE INDEX ix_traffics_camera_name ON traffics (camera_name)",
+    "CREATE INDEX ix_traffics_gate_name ON traffics (gate_name)",
+    "CREATE INDEX ix_traffics_timestamp_id ON traffics (timestamp, id)",
+)
+INDEX_NAMES = (
+    "ix_traffics_id", "ix_traffics_plate_number", "ix_traffics_camera_name",
+    "ix_traffics_gate_name", "ix_traffics_timestamp_id", "ix_traffics_timestamp_brin",
+)
+
+
+# Kept local rather than imported from database.partitions, which pulls in
+# the app's engine and storage.
+def month_start(value: date, offset: int = 0) -> date:
+    month_index = value.year * 12 + value.month - 1 + offset
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def create_partition_sql(start: date) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS traffics_p{start.year:04d}_{start.month:02d} "
+        f"PARTITION OF traffics "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{month_start(start, 1).isoformat()}')"
+    )
+
+
+def _is_partitioned(bind) -> bool:
+    return bind.execute(sa.text(
+        "SELECT 1 FROM pg_partitioned_table p "
+        "JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = 'traffics'"
+    )).scalar() is not None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if _is_partitioned(bind):
+        return
+
+    has_legacy = bind.execute(sa.text("SELECT to_regclass('traffics')")).scalar() is not None
+    if has_legacy:
+        op.execute("ALTER TABLE traffics RENAME TO traffics_legacy")
+        op.execute("ALTER TABLE traffics_legacy RENAME CONSTRAINT traffics_pkey TO traffics_legacy_pkey")
+        for index_name in INDEX_NAMES:
+            op.execute(f"DROP INDEX IF EXISTS {index_name}")
+    else:
+        op.execute("CREATE SEQUENCE IF NOT EXISTS traffics_id_seq")
+
+    op.execute(
+        f"CREATE TABLE traffics ({COLUMNS}, PRIMARY KEY (id, timestamp)) "
+        "PARTITION BY RANGE (timestamp)"
+    )
+    op.execute("ALTER SEQUENCE traffics_id_seq OWNED BY traffics.id")
+    for statement in INDEXES:
+        op.execute(statement)
+    op.execute("CREATE INDEX ix_traffics_timestamp_brin ON traffics USING brin (timestamp)")
+
+    # One partition per month covering every legacy row and a couple of
+    # months ahead; anything else lands in the default partition until
+    # database.partitions splits it out
+    first_timestamp = last_timestamp = None
+    if has_legacy:
+        first_timestamp, last_timestamp = bind.execute(
+            sa.text("SELECT min(timestamp), max(timestamp) FROM traffics_legacy")
+        ).one()
+    today = datetime.now(timezone.utc).date()
+    current = month_start(first_timestamp.date() if first_timestamp else today)
+    last = month_start(today, MONTHS_AHEAD)
+    if last_timestamp is not None:
+        last = max(last, month_start(last_timestamp.date()))
+    while current <= last:
+        op.execute(create_partition_sql(current))
+        current = month_start(current, 1)
+    op.execute("CREATE TABLE traffics_default PARTITION OF traffics DEFAULT")
+
+    if has_legacy:
+        op.execute(
+            f"INSERT INTO traffics ({COLUMN_NAMES}) "
+            f"SELECT {COLUMN_NAMES.replace('timestamp,', 'COALESCE(timestamp, now()),', 1)} "
+            "FROM traffics_legacy"
+        )
+        op.execute("DROP TABLE traffics_legacy")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if not _is_partitioned(bind):
+        return
+
+    op.execute(f"CREATE TABLE traffics_plain ({COLUMNS}, PRIMARY KEY (id))")
+    op.execute(f"INSERT INTO traffics_plain ({COLUMN_NAMES}) SELECT {COLUMN_NAMES} FROM traffics")
+    op.execute("ALTER SEQUENCE traffics_id_seq OWNED BY traffics_plain.id")
+    op.execute("DROP TABLE traffics CASCADE")
+    op.execute("ALTER TABLE traffics_plain RENAME TO traffics")
+    op.execute("ALTER TABLE traffics RENAME CONSTRAINT traffics_plain_pkey TO traffics_pkey")
+    for statement in INDEXES:
+        op.execute(statement)
@@ -0,0 +1,51 @@
+"""Add camera_id and gate_id to traffics
+
+Revision ID: d2a8c6f4b113
+Revises: b7f1d3e5a902
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a8c6f4b113'
+down_revision: Union[str, None] = 'b7f1d3e5a902'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('traffics', sa.Column('camera_id', sa.Integer(), nullable=True))
+    op.add_column('traffics', sa.Column('gate_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'traffics_camera_id_fkey', 'traffics', 'cameras', ['camera_id'], ['id'], ondelete='SET NULL'
+    )
+    op.create_foreign_key(
+        'traffics_gate_id_fkey', 'traffics', 'gates', ['gate_id'], ['id'], ondelete='SET NULL'
+    )
+
+    # Backfill from the names recorded at ingest time
+    op.execute(
+        "UPDATE traffics AS t SET camera_id = c.id "
+        "FROM cameras AS c WHERE t.camera_id IS NULL AND t.camera_name = c.name"
+    )
+    op.execute(
+        "UPDATE traffics AS t SET gate_id = g.id "
+        "FROM gates AS g WHERE t.gate_id IS NULL AND t.gate_name = g.name"
+    )
+
+    op.create_index(op.f('ix_traffics_camera_id'), 'traffics', ['camera_id'], unique=False)
+    op.create_index(op.f('ix_traffics_gate_id'), 'traffics', ['gate_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_traffics_gate_id'), table_name='traffics')
+    op.drop_index(op.f('ix_traffics_camera_id'), table_name='traffics')
+    op.drop_constraint('traffics_gate_id_fkey', 'traffics', type_='foreignkey')
+    op.drop_constraint('traffics_camera_id_fkey', 'traffics', type_='foreignkey')
+    op.drop_column('traffics', 'gate_id')
+    op.drop_column('traffics', 'camera_id')
@@ -0,0 +1,38 @@
+"""Add canonical plate key to traffics
+
+Revision ID: e5b9d1c7a224
+Revises: d2a8c6f4b113
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b9d1c7a224'
+down_revision: Union[str, None] = 'd2a8c6f4b113'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column('traffics', sa.Column('plate_key', sa.String(length=8), nullable=True))
+    op.execute(
+        "UPDATE traffics SET plate_key = prefix_2 || alpha || mid_3 || suffix_2 "
+        "WHERE plate_key IS NULL"
+    )
+    op.create_index(op.f('ix_traffics_plate_key'), 'traffics', ['plate_key'], unique=False)
+    op.create_index(
+        'ix_traffics_plate_key_trgm', 'traffics', ['plate_key'], unique=False,
+        postgresql_using='gin', postgresql_ops={'plate_key': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_traffics_plate_key_trgm', table_name='traffics')
+    op.drop_index(op.f('ix_traffics_plate_key'), table_name='traffics')
+    op.drop_column('traffics', 'plate_key')
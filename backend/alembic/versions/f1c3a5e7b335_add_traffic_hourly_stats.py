@@ -0,0 +1,47 @@
+"""Add hourly traffic rollup table
+
+Revision ID: f1c3a5e7b335
+Revises: e5b9d1c7a224
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c3a5e7b335'
+down_revision: Union[str, None] = 'e5b9d1c7a224'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('traffic_hourly_stats',
+    sa.Column('bucket', sa.DateTime(), nullable=False),
+    sa.Column('gate_id', sa.Integer(), nullable=False),
+    sa.Column('camera_id', sa.Integer(), nullable=False),
+    sa.Column('access_granted', sa.Boolean(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['gate_id'], ['gates.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['camera_id'], ['cameras.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('bucket', 'gate_id', 'camera_id', 'access_granted')
+    )
+    op.create_index(
+        'ix_traffic_hourly_stats_gate_bucket', 'traffic_hourly_stats', ['gate_id', 'bucket'], unique=False
+    )
+
+    # Seed the rollup from the existing traffic rows
+    op.execute(
+        "INSERT INTO traffic_hourly_stats (bucket, gate_id, camera_id, access_granted, count) "
+        "SELECT date_trunc('hour', timestamp), gate_id, camera_id, COALESCE(access_granted, false), count(*) "
+        "FROM traffics WHERE gate_id IS NOT NULL AND camera_id IS NOT NULL "
+        "GROUP BY 1, 2, 3, 4"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_traffic_hourly_stats_gate_bucket', table_name='traffic_hourly_stats')
+    op.drop_table('traffic_hourly_stats')
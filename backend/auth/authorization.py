@@ -1,22 +1,19 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from jose import jwt, JWTError
 
 from settings import settings
 from database.engine import get_db
 from auth.auth import oauth2_scheme
-from schema.auth import TokenData
-from schema.user import UserInDB
-from models.user import DBUser, UserType
-from models.camera import DBCamera
+from auth.principal import principal_cache
+from schema.auth import TokenData, Principal
+from models.user import UserType
 from crud.user import UserOperation
 
 
 
 async def get_current_user(
-    db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme)
+    request: Request, db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme)
 ):
     try:
         if settings.SECRET_KEY and settings.ALGORITHM:
@@ -29,11 +26,12 @@ async def get_current_user(
                     detail="Authorization Error: Could not validate credentials",
                     headers={"WWW-Authenticate": "Bearer"})
             token_data = TokenData(personal_number=personal_number)
-            user_op = UserOperation(db)
-            current_user = await user_op.get_user_personal_number(personal_number=token_data.personal_number)
+            current_user = await principal_cache.get_or_load(db, token_data.personal_number)
             if current_user is None:
                 raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Authorization Error: Could not validate credentials",
                     headers={"WWW-Authenticate": "Bearer"})
+            # Shared with the logging middleware so it needs no lookup of its own
+            request.state.principal = current_user
             return current_user
 
     except JWTError:
@@ -41,21 +39,21 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"})
 
 
-async def get_current_active_user(current_user: UserInDB = Depends(get_current_user)):
+async def get_current_active_user(current_user: Principal = Depends(get_current_user)):
     if not current_user.is_active:
         raise HTTPException(status.HTTP_403_FORBIDDEN, {"Permission denied":"Inactive user"}
         )
     return current_user
 
 
-async def get_admin_user(current_user: UserInDB = Depends(get_current_active_user)):
+async def get_admin_user(current_user: Principal = Depends(get_current_active_user)):
     if current_user.user_type is not UserType.ADMIN:
         raise HTTPException(status.HTTP_403_FORBIDDEN,
             {"Permission denied":"Admin access required"})
     return current_user
 
 
-async def get_admin_or_staff_user(current_user: DBUser = Depends(get_current_active_user)):
+async def get_admin_or_staff_user(current_user: Principal = Depends(get_current_active_user)):
     if current_user.user_type not in [UserType.ADMIN, UserType.STAFF]:
         raise HTTPException(
             status.HTTP_403_FORBIDDEN,
@@ -65,8 +63,7 @@ async def get_admin_or_staff_user(current_user: DBUser = Depends(get_current_act
 
 
 async def get_admin_staff_viewer_user(
-    db: AsyncSession = Depends(get_db),
-    current_user: UserInDB = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     camera_id: int = None,
 ):
     # Check if the user type is valid
@@ -76,24 +73,9 @@ async def get_admin_staff_viewer_user(
             {"Permission denied": "Not accessible for this user type"},
         )
 
-    # If the user is a viewer, check gate access
+    # If the user is a viewer, check the camera is on one of the viewer's gates
     if current_user.user_type == UserType.VIEWER and camera_id is not None:
-        # Fetch the camera and its associated gate
-        query = await db.execute(
-            select(DBCamera)
-            .where(DBCamera.id == camera_id)
-            .options(selectinload(DBCamera.gate))  # Load the associated gate
-        )
-        camera = query.scalars().first()
-
-        if not camera:
-            raise HTTPException(
-                status.HTTP_404_NOT_FOUND,
-                {"Error": "Camera not found"},
-            )
-
-        # Check if the user's gates include the gate associated with the camera
-        if camera.gate.id not in [gate.id for gate in current_user.gates]:
+        if camera_id not in current_user.camera_ids:
             raise HTTPException(
                 status.HTTP_403_FORBIDDEN,
                 {"Permission denied": "Access to this camera is denied"},
@@ -104,7 +86,7 @@ async def get_admin_staff_viewer_user(
 
 async def get_self_or_admin_user(
     user_id: int,
-    current_user: UserInDB = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     if current_user.user_type == UserType.ADMIN or current_user.id == user_id:
         return current_user
@@ -116,7 +98,7 @@ async def get_self_or_admin_user(
 async def get_self_or_admin_or_staff_user(
     user_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: UserInDB = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
 ):
     user_op = UserOperation(db)
     target_user = await user_op.get_one_object_id(user_id)
@@ -144,7 +126,7 @@ async def get_self_or_admin_or_staff_user(
 
 async def get_self_user_only(
     user_id: int,
-    current_user: UserInDB = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     if current_user.id == user_id:
         return current_user
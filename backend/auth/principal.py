@@ -0,0 +1,110 @@
+import time
+from typing import Optional
+from sqlalchemy.future import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from settings import settings
+from models.user import DBUser, UserType
+from models.camera import DBCamera
+from models.association import viewer_gate_access
+from schema.auth import Principal
+
+
+async def load_principal(db_session: AsyncSession, personal_number: str) -> Optional[Principal]:
+    """
+    Build a Principal from plain column selects, skipping the selectin
+    relationships a full DBUser would pull in.
+    """
+    query = await db_session.execute(
+        select(
+            DBUser.id,
+            DBUser.personal_number,
+            DBUser.user_type,
+            DBUser.is_active,
+            DBUser.password_changed,
+        ).where(DBUser.personal_number == personal_number)
+    )
+    user = query.one_or_none()
+    if user is None:
+        return None
+
+    gate_ids, camera_ids, lpr_ids = set(), set(), set()
+    if user.user_type == UserType.VIEWER:
+        scope_query = await db_session.execute(
+            select(viewer_gate_access.c.gate_id, DBCamera.id, DBCamera.lpr_id)
+            .select_from(viewer_gate_access)
+            .outerjoin(DBCamera, DBCamera.gate_id == viewer_gate_access.c.gate_id)
+            .where(viewer_gate_access.c.user_id == user.id)
+        )
+        for gate_id, camera_id, lpr_id in scope_query.all():
+            gate_ids.add(gate_id)
+            if camera_id is not None:
+                camera_ids.add(camera_id)
+                lpr_ids.add(lpr_id)
+
+    return Principal(
+        id=user.id,
+        personal_number=user.personal_number,
+        user_type=user.user_type,
+        is_active=user.is_active,
+        password_changed=user.password_changed,
+        gate_ids=frozenset(gate_ids),
+        camera_ids=frozenset(camera_ids),
+        lpr_ids=frozenset(lpr_ids),
+    )
+
+
+class PrincipalCache:
+    """
+    In-process TTL cache of principals keyed by token subject (personal number).
+    """
+    # Writes to these tables can change any viewer's permitted gates/cameras
+    SCOPE_TABLES = ("gates", "cameras", "lprs", "viewer_gate_access")
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self.entries = {}  # personal_number -> (expires_at, Principal)
+        self.subjects = {}  # user id -> personal_number
+
+    def get(self, personal_number: str) -> Optional[Principal]:
+        entry = self.entries.get(personal_number)
+        if entry is None:
+            return None
+        expires_at, principal = entry
+        if expires_at < time.monotonic():
+            self.entries.pop(personal_number, None)
+            return None
+        return principal
+
+    def set(self, principal: Principal) -> None:
+        self.entries[principal.personal_number] = (time.monotonic() + self.ttl, principal)
+        self.subjects[principal.id] = principal.personal_number
+
+    async def get_or_load(self, db_session: AsyncSession, personal_number: str) -> Optional[Principal]:
+        principal = self.get(personal_number)
+        if principal is None:
+            principal = await load_principal(db_session, personal_number)
+            if principal is not None:
+                self.set(principal)
+        return principal
+
+    def invalidate_user(self, user_id: int) -> None:
+        personal_number = self.subjects.pop(user_id, None)
+        if personal_number is not None:
+            self.entries.pop(personal_number, None)
+
+    def invalidate(self, table_name: str, object_id: Optional[int] = None) -> None:
+        """
+        Evict principals affected by a committed write to `table_name`.
+        """
+        if table_name == "users" and object_id is not None:
+            self.invalidate_user(object_id)
+        elif table_name == "users" or table_name in self.SCOPE_TABLES:
+            self.clear()
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.subjects.clear()
+
+
+principal_cache = PrincipalCache(ttl=settings.PRINCIPAL_CACHE_TTL)
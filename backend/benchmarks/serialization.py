@@ -0,0 +1,144 @@
+"""
+Serialization time per list endpoint, FastAPI's default path against the
+orjson fast path, on synthetic page_size=100 pages.
+
+    cd backend && python -m benchmarks.serialization [--rows 100] [--repeat 200]
+
+"before" is what FastAPI does with the endpoint's return value: validate it
+against response_model and serialize it, or run jsonable_encoder over it when
+the route has no response_model, then json.dumps in JSONResponse. "after" is
+the path the endpoint uses now. Compressed sizes are reported for the
+"after" body.
+"""
+import argparse
+import asyncio
+import gzip
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from models.user import UserType
+from schema.camera import CameraPagination
+from schema.traffic import TrafficInDB
+from schema.user import UserPagination
+from utils.fast_json import fast_response, shape_rows
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def page(items) -> dict:
+    return {
+        "items": items,
+        "total_records": 10_000,
+        "total_pages": 100,
+        "current_page": 1,
+        "page_size": len(items),
+        "has_next": True,
+    }
+
+
+def traffic_rows(count: int) -> list:
+    now = datetime.now()
+    return [
+        SimpleNamespace(
+            id=i, prefix_2="12", alpha="ب", mid_3="345", suffix_2="67", plate_number="12ب34567",
+            ocr_accuracy=0.97, vision_speed=41.5, timestamp=now - timedelta(seconds=i),
+            plate_image=f"http://minio:9000/plates/{i}.jpg?X-Amz-Signature={'f' * 64}",
+            full_image=f"http://minio:9000/full/{i}.jpg?X-Amz-Signature={'f' * 64}",
+            plate_image_url=None, full_image_url=None, gate_id=1, camera_id=2,
+            gate_name="Main gate", camera_name="Entrance camera", access_granted=i % 3 != 0,
+        )
+        for i in range(count)
+    ]
+
+
+def user_rows(count: int) -> list:
+    now = datetime.now()
+    gates = [SimpleNamespace(name=f"Gate {g}", description="North side") for g in range(3)]
+    return [
+        SimpleNamespace(
+            id=i, personal_number=f"P{i:05}", national_id=f"{i:010}", first_name="Ali", last_name="Rezaei",
+            office="Security", phone_number="09120000000", email=f"user{i}@example.com",
+            user_type=UserType.USER, max_vehicle=5, profile_image=None, profile_image_url=None,
+            password_changed=True, created_at=now, updated_at=now, is_active=True,
+            vehicles=[SimpleNamespace(id=v, plate_number="12ب34567", is_active=True) for v in range(2)],
+            gates=gates, accessible_gates=gates,
+        )
+        for i in range(count)
+    ]
+
+
+def camera_rows(count: int) -> list:
+    now = datetime.now()
+    settings = [SimpleNamespace(id=s, name=f"setting {s}", is_active=True) for s in range(8)]
+    return [
+        SimpleNamespace(
+            id=i, name=f"Camera {i}", latitude="35.6892", longitude="51.3890", description="Lane 1",
+            crud_image=None, points=[(0, 0), (640, 0), (640, 480), (0, 480)], is_active=True,
+            created_at=now, updated_at=now, gate_id=1, settings=settings, lpr_id=None,
+        )
+        for i in range(count)
+    ]
+
+
+async def default_body(content, response_model=None) -> bytes:
+    if response_model is None:
+        return JSONResponse(jsonable_encoder(content)).body
+    field = create_model_field(name="Response", type_=response_model, mode="serialization")
+    return JSONResponse(await serialize_response(field=field, response_content=content)).body
+
+
+async def timed(make_body, repeat: int) -> tuple[float, bytes]:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        body = await make_body()
+    return (time.perf_counter() - start) / repeat * 1000, body
+
+
+async def main(rows: int, repeat: int) -> None:
+    traffic = page(traffic_rows(rows))
+    users = page(user_rows(rows))
+    cameras = page(camera_rows(rows))
+    cached_cameras = CameraPagination.model_validate(cameras).model_dump(mode="json")
+
+    async def fast_traffic():
+        return fast_response({**traffic, "items": shape_rows(traffic["items"], TrafficInDB)}).body
+
+    async def fast_users():
+        return fast_response(users, UserPagination).body
+
+    async def fast_cameras():
+        return ORJSONResponse(cached_cameras).body
+
+    cases = [
+        ("GET /v1/traffic", lambda: default_body(traffic), fast_traffic),
+        ("GET /v1/users", lambda: default_body(users, UserPagination), fast_users),
+        ("GET /v1/cameras (cache hit)", lambda: default_body(cached_cameras, CameraPagination), fast_cameras),
+    ]
+
+    print(f"{rows} rows per page, {repeat} runs each (ms per response)")
+    print(f"{'endpoint':<30}{'before':>10}{'after':>10}{'speedup':>10}{'bytes':>10}{'gzip':>10}{'br':>10}")
+    for name, before, after in cases:
+        before_ms, _ = await timed(before, repeat)
+        after_ms, body = await timed(after, repeat)
+        br_size = len(brotli.compress(body, quality=4)) if brotli is not None else "-"
+        print(
+            f"{name:<30}{before_ms:>10.3f}{after_ms:>10.3f}{before_ms / after_ms:>9.1f}x"
+            f"{len(body):>10}{len(gzip.compress(body, compresslevel=6)):>10}{br_size:>10}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
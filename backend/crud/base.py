@@ -1,12 +1,19 @@
+import logging
 import math
 from typing import Optional
 from fastapi import HTTPException, status
-from sqlalchemy import func
 from sqlalchemy.future import select
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from search_service.search import BaseSearchService
+from utils.invalidation_bus import invalidation_bus
+from utils.response_cache import response_cache
+from utils.pagination import count_query
+from crud.loaders import list_options
+
+
+logger = logging.getLogger(__name__)
 
 
 class CrudOperation:
@@ -31,30 +38,62 @@ class CrudOperation:
         object = result.unique().scalar_one_or_none()
         return object
 
-    async def get_all_objects(self, page: int=1, page_size: int=10):
-        total_query = await self.db_session.execute(select(func.count(self.db_table.id)))
-        total_records = total_query.scalar_one()
+    async def notify_change(self, object_id: Optional[int] = None, table: Optional[str] = None) -> None:
+        """
+        Evict cached state derived from a table (this operation's own by
+        default) after a committed write: the shared response cache here, and
+        every process's in-memory caches through the invalidation bus.
+
+        The write is already committed, so a Redis or NATS failure here is
+        logged rather than raised; the stale entries then age out by TTL.
+        """
+        table = table or self.db_table.__tablename__
+        try:
+            await response_cache.invalidate(table)
+        except Exception as e:
+            logger.error(f"Response cache invalidation of '{table}' failed: {e}")
+        try:
+            await invalidation_bus.publish(table, object_id)
+        except Exception as e:
+            logger.error(f"Invalidation publish of '{table}' failed: {e}")
+
+    async def paginate(self, query, page: int=1, page_size: int=10, count: str="exact"):
+        """
+        Page through an ordered select. count is "exact", "estimated" or
+        "none"; has_next always comes from fetching one row past the page.
+        """
+        total_records = await count_query(self.db_session, query, count)
 
         # Calculate total number of pages
-        total_pages = math.ceil(total_records / page_size) if page_size else 1
+        total_pages = None
+        if total_records is not None:
+            total_pages = math.ceil(total_records / page_size) if page_size else 1
 
         # Calculate offset
         offset = (page - 1) * page_size
 
-        # Fetch the records
-        query = await self.db_session.execute(
-            select(self.db_table).order_by(self.db_table.created_at.desc()).offset(offset).limit(page_size)
-        )
-        objects = query.unique().scalars().all()
+        # Fetch the records, one past the page to know whether another follows
+        result = await self.db_session.execute(query.offset(offset).limit(page_size + 1))
+        objects = result.unique().scalars().all()
+        has_next = len(objects) > page_size
 
         return {
-            "items": objects,
+            "items": objects[:page_size],
             "total_records": total_records,
             "total_pages": total_pages,
             "current_page": page,
             "page_size": page_size,
+            "has_next": has_next,
         }
 
+    async def get_all_objects(self, page: int=1, page_size: int=10, count: str="exact", fields: tuple=None):
+        query = (
+            select(self.db_table)
+            .options(*list_options(self.db_table, fields))
+            .order_by(self.db_table.created_at.desc())
+        )
+        return await self.paginate(query, page, page_size, count)
+
 
     async def change_activation_status(self, object_id: int):
         db_object = await self.get_one_object_id(object_id)
@@ -67,6 +106,7 @@ class CrudOperation:
             self.db_session.add(db_object)
             await self.db_session.commit()
             await self.db_session.refresh(db_object)
+            await self.notify_change(object_id)
             # Return the appropriate message
             status_message = "activated" if db_object.is_active else "deactivated"
             return {"message": status_message}
@@ -85,6 +125,7 @@ class CrudOperation:
         try:
             await self.db_session.delete(db_object)
             await self.db_session.commit()
+            await self.notify_change(object_id)
             # If search service is provided, delete the document from Meilisearch
             if self.search_service:
                 await self.search_service.delete_document(object_id)
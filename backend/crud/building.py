@@ -1,11 +1,10 @@
-import math
 from fastapi import HTTPException, status
-from sqlalchemy import func
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from crud.base import CrudOperation
+from crud.loaders import list_options
 from models.building import DBBuilding
 from models.gate import DBGate
 from schema.building import BuildingInDB, BuildingUpdate, BuildingCreate
@@ -32,6 +31,7 @@ class BuildingOperation(CrudOperation):
             self.db_session.add(new_building)
             await self.db_session.commit()
             await self.db_session.refresh(new_building)
+            await self.notify_change(new_building.id)
             meilisearch_building = BuildingInDB.from_orm(new_building)
             await building_search.sync_document(meilisearch_building)
             return new_building
@@ -50,6 +50,7 @@ class BuildingOperation(CrudOperation):
             self.db_session.add(db_building)
             await self.db_session.commit()
             await self.db_session.refresh(db_building)
+            await self.notify_change(building_id)
             meilisearch_building = BuildingInDB.from_orm(db_building)
             await building_search.sync_document(meilisearch_building)
             return db_building
@@ -62,26 +63,6 @@ class BuildingOperation(CrudOperation):
         finally:
             await self.db_session.close()
 
-    async def get_building_all_gates(self, building_id: int, page: int=1, page_size: int=10):
-        total_query = await self.db_session.execute(select(func.count(DBGate.id)).where(DBGate.building_id == building_id))
-        total_records = total_query.scalar_one()
-
-        # Calculate total number of pages
-        total_pages = math.ceil(total_records / page_size) if page_size else 1
-
-        # Calculate offset
-        offset = (page - 1) * page_size
-
-        # Fetch the records
-        query = await self.db_session.execute(
-            select(DBGate).where(DBGate.building_id == building_id).order_by(DBGate.created_at.desc()).offset(offset).limit(page_size)
-        )
-        objects = query.unique().scalars().all()
-
-        return {
-            "items": objects,
-            "total_records": total_records,
-            "total_pages": total_pages,
-            "current_page": page,
-            "page_size": page_size,
-        }
+    async def get_building_all_gates(self, building_id: int, page: int=1, page_size: int=10, count: str="exact"):
+        query = select(DBGate).options(*list_options(DBGate)).where(DBGate.building_id == building_id).order_by(DBGate.created_at.desc())
+        return await self.paginate(query, page, page_size, count)
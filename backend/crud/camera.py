@@ -1,12 +1,11 @@
-import math
 from fastapi import HTTPException, status
-from sqlalchemy import func
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 # from tcp.tcp_manager import add_connection, update_connection
 from crud.base import CrudOperation
+from crud.loaders import list_options
 from crud.gate import GateOperation
 from crud.lpr import LprOperation
 from models.camera_setting import DBCameraSetting, DBCameraSettingInstance
@@ -20,39 +19,17 @@ class CameraOperation(CrudOperation):
     def __init__(self, db_session: AsyncSession) -> None:
         super().__init__(db_session, DBCamera, camera_search)
 
-    async def get_objects_by_gate_ids(self, gate_ids: list[int], page: int = 1, page_size: int = 10):
+    async def get_objects_by_gate_ids(self, gate_ids: list[int], page: int = 1, page_size: int = 10, count: str = "exact"):
         """
         Retrieve cameras associated with the given gate IDs, with pagination.
         """
-        # Count total records
-        total_query = await self.db_session.execute(
-            select(func.count(self.db_table.id)).where(self.db_table.gate_id.in_(gate_ids))
-        )
-        total_records = total_query.scalar_one()
-
-        # Calculate total number of pages
-        total_pages = math.ceil(total_records / page_size) if page_size else 1
-
-        # Calculate offset
-        offset = (page - 1) * page_size
-
-        # Fetch the records
-        query = await self.db_session.execute(
+        query = (
             select(self.db_table)
+            .options(*list_options(self.db_table))
             .where(self.db_table.gate_id.in_(gate_ids))
             .order_by(self.db_table.created_at.desc())
-            .offset(offset)
-            .limit(page_size)
         )
-        objects = query.unique().scalars().all()
-
-        return {
-            "items": objects,
-            "total_records": total_records,
-            "total_pages": total_pages,
-            "current_page": page,
-            "page_size": page_size,
-        }
+        return await self.paginate(query, page, page_size, count)
 
 
     async def create_camera(self, camera: CameraCreate):
@@ -93,6 +70,7 @@ class CameraOperation(CrudOperation):
 
             await self.db_session.commit()
             await self.db_session.refresh(new_camera)
+            await self.notify_change(new_camera.id)
             meilisearch_camera = CameraInDB.from_orm(new_camera)
             await camera_search.sync_document(meilisearch_camera)
             return new_camera
@@ -123,6 +101,7 @@ class CameraOperation(CrudOperation):
             self.db_session.add(db_camera)
             await self.db_session.commit()
             await self.db_session.refresh(db_camera)
+            await self.notify_change(camera_id)
             meilisearch_camera = CameraInDB.from_orm(db_camera)
             await camera_search.sync_document(meilisearch_camera)
 
@@ -136,29 +115,9 @@ class CameraOperation(CrudOperation):
         finally:
             await self.db_session.close()
 
-    async def get_camera_all_settings(self, camera_id: int, page: int=1, page_size: int=10):
-        total_query = await self.db_session.execute(select(func.count(DBCameraSettingInstance.id)).where(DBCameraSettingInstance.camera_id == camera_id))
-        total_records = total_query.scalar_one()
-
-        # Calculate total number of pages
-        total_pages = math.ceil(total_records / page_size) if page_size else 1
-
-        # Calculate offset
-        offset = (page - 1) * page_size
-
-        # Fetch the records
-        query = await self.db_session.execute(
-            select(DBCameraSettingInstance).where(DBCameraSettingInstance.camera_id == camera_id).order_by(DBCameraSettingInstance.name.desc()).offset(offset).limit(page_size)
-        )
-        objects = query.unique().scalars().all()
-
-        return {
-            "items": objects,
-            "total_records": total_records,
-            "total_pages": total_pages,
-            "current_page": page,
-            "page_size": page_size,
-        }
+    async def get_camera_all_settings(self, camera_id: int, page: int=1, page_size: int=10, count: str="exact"):
+        query = select(DBCameraSettingInstance).options(*list_options(DBCameraSettingInstance)).where(DBCameraSettingInstance.camera_id == camera_id).order_by(DBCameraSettingInstance.name.desc())
+        return await self.paginate(query, page, page_size, count)
 
     async def add_camera_setting(self, camera_id: int, setting_create: CameraSettingInstanceCreate):
         exists_query = await self.db_session.execute(
@@ -191,6 +150,7 @@ class CameraOperation(CrudOperation):
             self.db_session.add(setting_instance)
             await self.db_session.commit()
             await self.db_session.refresh(setting_instance)
+            await self.notify_change(setting_instance.id, table="camera_setting_instances")
             meilisearch_setting = CameraSettingInstanceInDB.from_orm(setting_instance)
             await camera_setting_search.sync_document(meilisearch_setting)
             return setting_instance
@@ -223,6 +183,7 @@ class CameraOperation(CrudOperation):
                 setattr(setting_instance, key, value)
             await self.db_session.commit()
             await self.db_session.refresh(setting_instance)
+            await self.notify_change(setting_instance.id, table="camera_setting_instances")
             meilisearch_setting = CameraSettingInstanceInDB.from_orm(setting_instance)
             await camera_setting_search.sync_document(meilisearch_setting)
             return setting_instance
@@ -251,6 +212,7 @@ class CameraOperation(CrudOperation):
         try:
             await self.db_session.delete(setting_instance)
             await self.db_session.commit()
+            await self.notify_change(setting_id, table="camera_setting_instances")
             await camera_setting_search.delete_document(setting_id)
             return {"message": f"object {setting_instance.name} deleted successfully"}
         except SQLAlchemyError as error:
@@ -27,6 +27,7 @@ class CameraSettingOperation(CrudOperation):
             self.db_session.add(new_setting)
             await self.db_session.commit()
             await self.db_session.refresh(new_setting)
+            await self.notify_change(new_setting.id)
             return new_setting
         except SQLAlchemyError as error:
             await self.db_session.rollback()
@@ -43,6 +44,7 @@ class CameraSettingOperation(CrudOperation):
             self.db_session.add(db_camera_setting)
             await self.db_session.commit()
             await self.db_session.refresh(db_camera_setting)
+            await self.notify_change(setting_id)
             return db_camera_setting
         except SQLAlchemyError as error:
             await self.db_session.rollback()
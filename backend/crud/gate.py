@@ -1,14 +1,15 @@
-import math
+from datetime import datetime, timedelta, timezone
 from fastapi import HTTPException, status
-from sqlalchemy import func, extract
+from sqlalchemy import and_, func, extract
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from crud.base import CrudOperation
+from crud.loaders import list_options
 from crud.building import BuildingOperation
 from models.gate import DBGate, GateType
-from models.traffic import DBTraffic
+from models.traffic import DBTrafficHourlyStat
 from models.camera import DBCamera
 from schema.gate import GateUpdate, GateCreate, GateInDB, TimeIntervalCount
 from search_service.search_config import gate_search
@@ -34,6 +35,7 @@ class GateOperation(CrudOperation):
             self.db_session.add(new_gate)
             await self.db_session.commit()
             await self.db_session.refresh(new_gate)
+            await self.notify_change(new_gate.id)
             meilisearch_gate = GateInDB.from_orm(new_gate)
             await gate_search.sync_document(meilisearch_gate)
             return new_gate
@@ -59,6 +61,7 @@ class GateOperation(CrudOperation):
             self.db_session.add(db_gate)
             await self.db_session.commit()
             await self.db_session.refresh(db_gate)
+            await self.notify_change(gate_id)
             meilisearch_gate = GateInDB.from_orm(db_gate)
             await gate_search.sync_document(meilisearch_gate)
             return db_gate
@@ -73,31 +76,32 @@ class GateOperation(CrudOperation):
 
 
 
-    async def get_gate_all_cameras(self, gate_id: int, page: int=1, page_size: int=10):
-        total_query = await self.db_session.execute(select(func.count(DBCamera.id)).where(DBCamera.gate_id == gate_id))
-        total_records = total_query.scalar_one()
-
-        # Calculate total number of pages
-        total_pages = math.ceil(total_records / page_size) if page_size else 1
-
-        # Calculate offset
-        offset = (page - 1) * page_size
-
-        # Fetch the records
-        query = await self.db_session.execute(
-            select(DBCamera).where(DBCamera.gate_id == gate_id).order_by(DBCamera.created_at.desc()).offset(offset).limit(page_size)
-        )
-        objects = query.unique().scalars().all()
-
-        return {
-            "items": objects,
-            "total_records": total_records,
-            "total_pages": total_pages,
-            "current_page": page,
-            "page_size": page_size,
-        }
-
-    async def get_gate_traffic_stats(self, gate_type: str):
+    async def get_gate_all_cameras(self, gate_id: int, page: int=1, page_size: int=10, count: str="exact"):
+        query = select(DBCamera).options(*list_options(DBCamera)).where(DBCamera.gate_id == gate_id).order_by(DBCamera.created_at.desc())
+        return await self.paginate(query, page, page_size, count)
+
+    @staticmethod
+    def _utc_now() -> datetime:
+        # Traffic timestamps are stored as naive UTC
+        return datetime.now(timezone.utc).replace(tzinfo=None)
+
+    @staticmethod
+    def _naive_utc(value: datetime) -> datetime:
+        # Aware query dates are converted to UTC, naive ones are taken as UTC
+        return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+    async def get_gate_traffic_stats(
+        self,
+        gate_type: str,
+        start_date: datetime = None,
+        end_date: datetime = None
+    ):
+        """
+        Traffic count per gate in [start_date, end_date), read from the hourly
+        rollup. Defaults to the last 24 hours.
+        """
+        end_date = self._naive_utc(end_date) if end_date else self._utc_now()
+        start_date = self._naive_utc(start_date) if start_date else end_date - timedelta(days=1)
         try:
             gate_type_enum = None
             if gate_type != 'all':
@@ -110,9 +114,14 @@ class GateOperation(CrudOperation):
                 DBGate.id,
                 DBGate.name,
                 DBGate.gate_type,
-                func.count(DBTraffic.id).label('traffic_count')
+                func.coalesce(func.sum(DBTrafficHourlyStat.count), 0).label('traffic_count')
             ).select_from(DBGate).outerjoin(
-                DBTraffic, DBGate.name == DBTraffic.gate_name
+                DBTrafficHourlyStat,
+                and_(
+                    DBGate.id == DBTrafficHourlyStat.gate_id,
+                    DBTrafficHourlyStat.bucket >= start_date,
+                    DBTrafficHourlyStat.bucket < end_date,
+                )
             )
 
             if gate_type_enum is not None:
@@ -135,7 +144,13 @@ class GateOperation(CrudOperation):
         except SQLAlchemyError as e:
             raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
-    async def get_gate_time_series(self, gate_id: int, interval: str):
+    async def get_gate_time_series(self, gate_id: int, interval: str, end_date: datetime = None):
+        """
+        Traffic counts for one gate from the hourly rollup, over the day, week
+        or month ending at end_date (default now). The month is the 31
+        calendar days up to and including end_date's, one bucket per date.
+        """
+        end_date = self._naive_utc(end_date) if end_date else self._utc_now()
         try:
             # Get gate first to verify existence
             gate = await self.get_one_object_id(gate_id)
@@ -143,18 +158,25 @@ class GateOperation(CrudOperation):
                 raise HTTPException(status_code=404, detail="Gate not found")
 
             # Determine time grouping
+            window_start = None
             if interval == "daily":
-                time_part = func.date_trunc('hour', DBTraffic.timestamp)
+                time_part = DBTrafficHourlyStat.bucket
                 format_str = "HH24:00"
                 max_intervals = 24
+                window = timedelta(days=1)
             elif interval == "weekly":
-                time_part = func.date_trunc('day', DBTraffic.timestamp)
+                time_part = func.date_trunc('day', DBTrafficHourlyStat.bucket)
                 format_str = "Dy"
                 max_intervals = 7
+                window = timedelta(days=7)
             elif interval == "monthly":
-                time_part = func.date_trunc('day', DBTraffic.timestamp)
-                format_str = "DD"
+                time_part = func.date_trunc('day', DBTrafficHourlyStat.bucket)
+                format_str = "YYYY-MM-DD"
                 max_intervals = 31
+                # Whole days, so no date is split across both ends of the window
+                window_start = datetime.combine(
+                    (end_date - timedelta(days=max_intervals - 1)).date(), datetime.min.time()
+                )
             else:
                 raise HTTPException(status_code=400, detail="Invalid interval")
 
@@ -162,9 +184,13 @@ class GateOperation(CrudOperation):
             query = (
                 select(
                     func.to_char(time_part, format_str).label('interval'),
-                    func.count(DBTraffic.id).label('count')
+                    func.sum(DBTrafficHourlyStat.count).label('count')
+                )
+                .where(
+                    DBTrafficHourlyStat.gate_id == gate.id,
+                    DBTrafficHourlyStat.bucket >= (window_start or end_date - window),
+                    DBTrafficHourlyStat.bucket < end_date,
                 )
-                .where(DBTraffic.gate_name == gate.name)  # Add filter here
                 .group_by('interval')
             )
 
@@ -173,12 +199,12 @@ class GateOperation(CrudOperation):
             db_results = result.all()
 
             # Generate complete time series
-            return self._generate_series(db_results, interval, max_intervals)
+            return self._generate_series(db_results, interval, max_intervals, window_start)
 
         except SQLAlchemyError as e:
             raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
-    def _generate_series(self, db_results, interval, max_intervals):
+    def _generate_series(self, db_results, interval, max_intervals, window_start=None):
         # Convert to case-insensitive dictionary for weekly intervals
         result_dict = {}
         for row in db_results:
@@ -196,8 +222,8 @@ class GateOperation(CrudOperation):
                 label = days[i][:3].title()  # Return "Mon", "Tue" etc
                 key = days[i]
             elif interval == "monthly":
-                label = f"Day {i+1}"
-                key = f"{i+1:02}"
+                key = (window_start + timedelta(days=i)).strftime("%Y-%m-%d")
+                label = key
 
             series.append(TimeIntervalCount(
                 interval=label,
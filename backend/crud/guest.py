@@ -67,6 +67,7 @@ class GuestOperation(CrudOperation):
             self.db_session.add(new_guest)
             await self.db_session.commit()
             await self.db_session.refresh(new_guest)
+            await self.notify_change(new_guest.id)
             meilisearch_data = GuestInDB.from_orm(new_guest)
             await guest_search.sync_document(meilisearch_data)
             return new_guest
@@ -87,6 +88,7 @@ class GuestOperation(CrudOperation):
             self.db_session.add(db_guest)
             await self.db_session.commit()
             await self.db_session.refresh(db_guest)
+            await self.notify_change(guest_id)
             meilisearch_data = GuestInDB.from_orm(db_guest)
             await guest_search.sync_document(meilisearch_data)
             return db_guest
@@ -45,6 +45,7 @@ class KeyOperation(CrudOperation):
             self.db_session.add(db_relay_key)
             await self.db_session.commit()
             await self.db_session.refresh(db_relay_key)
+            await self.notify_change(db_relay_key.id)
             return db_relay_key
         except SQLAlchemyError as error:
             await self.db_session.rollback()
@@ -105,6 +106,7 @@ class KeyOperation(CrudOperation):
                     setattr(db_relay_key, key, value)
             await self.db_session.commit()
             await self.db_session.refresh(db_relay_key)
+            await self.notify_change(key_id)
             return db_relay_key
         except SQLAlchemyError as error:
             await self.db_session.rollback()
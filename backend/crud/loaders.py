@@ -0,0 +1,110 @@
+"""
+Loader profiles for list endpoints.
+
+Relationships are declared lazy="selectin", so a bare select(DBGate) also
+loads every permitted user of each gate, and each of those users their
+vehicles, gates and guests. A profile eagerly loads only what the list
+response schema serializes: nested summaries get their own columns and
+nothing below them, and every other relationship raises if it is touched.
+"""
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import joinedload, load_only, raiseload, selectinload
+
+from models.building import DBBuilding
+from models.camera import DBCamera
+from models.camera_setting import DBCameraSettingInstance
+from models.gate import DBGate
+from models.key import DBRelayKey
+from models.lpr import DBLpr
+from models.lpr_setting import DBLprSettingInstance
+from models.relay import DBRelay
+from models.status import DBStatus
+from models.user import DBUser, DBGuest
+from models.vehicle import DBVehicle
+
+
+def summary(relationship, *columns, loader=selectinload):
+    """
+    Eager-load a relationship rendered as a summary: only the given columns
+    (plus the primary key) and no further relationships.
+    """
+    return loader(relationship).options(load_only(*columns), raiseload("*"))
+
+
+GATE_SUMMARY = (DBGate.name, DBGate.description)
+CAMERA_SUMMARY = (DBCamera.name, DBCamera.is_active)
+VEHICLE_SUMMARY = (DBVehicle.plate_number, DBVehicle.is_active)
+
+LIST_PROFILES = {
+    DBBuilding: {
+        "gates": summary(DBBuilding.gates, *GATE_SUMMARY),
+    },
+    DBGate: {
+        "cameras": summary(DBGate.cameras, *CAMERA_SUMMARY),
+        "permitted_users": summary(DBGate.permitted_users, DBUser.personal_number, DBUser.first_name, DBUser.last_name),
+    },
+    DBCamera: {
+        "settings": summary(DBCamera.settings, DBCameraSettingInstance.name, DBCameraSettingInstance.is_active),
+    },
+    DBLpr: {
+        "settings": summary(DBLpr.settings, DBLprSettingInstance.name, DBLprSettingInstance.is_active),
+        "cameras": summary(DBLpr.cameras, *CAMERA_SUMMARY),
+    },
+    DBUser: {
+        "vehicles": summary(DBUser.vehicles, *VEHICLE_SUMMARY),
+        "gates": summary(DBUser.gates, *GATE_SUMMARY),
+        "accessible_gates": summary(DBUser.accessible_gates, *GATE_SUMMARY),
+    },
+    DBGuest: {
+        "vehicles": summary(DBGuest.vehicles, *VEHICLE_SUMMARY),
+        "gates": summary(DBGuest.gates, *GATE_SUMMARY),
+    },
+    DBRelay: {
+        "gate": summary(DBRelay.gate, *GATE_SUMMARY, loader=joinedload),
+        "keys": summary(
+            DBRelay.keys,
+            DBRelayKey.key_number,
+            DBRelayKey.duration,
+            DBRelayKey.description,
+            DBRelayKey.status_id,
+            DBRelayKey.camera_id,
+        ),
+    },
+    DBRelayKey: {
+        "relay": summary(DBRelayKey.relay, DBRelay.name, DBRelay.protocol, DBRelay.is_active, loader=joinedload),
+        "camera": summary(DBRelayKey.camera, *CAMERA_SUMMARY),
+        "status": summary(DBRelayKey.status, DBStatus.name, DBStatus.is_active),
+    },
+}
+
+
+def column_options(model, fields):
+    """
+    Load only the requested columns of a model (and its primary key); any
+    other column raises if it is touched instead of lazy-loading.
+    """
+    columns = [
+        prop.class_attribute
+        for prop in sa_inspect(model).column_attrs
+        if prop.key in fields or any(column.primary_key for column in prop.columns)
+    ]
+    return load_only(*columns, raiseload=True)
+
+
+def list_options(model, fields=None) -> tuple:
+    """
+    Loader options for listing a model. Models without a profile (settings,
+    vehicles, statuses, ...) serialize no relationships, so all of theirs
+    are blocked.
+
+    With fields (a sparse field selection) only those columns are selected
+    and only the requested relationships are loaded.
+    """
+    profile = LIST_PROFILES.get(model, {})
+    if fields is None:
+        return (*profile.values(), raiseload("*"))
+    return (
+        column_options(model, fields),
+        *(option for name, option in profile.items() if name in fields),
+        raiseload("*"),
+    )
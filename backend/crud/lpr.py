@@ -1,12 +1,11 @@
-import math
 from fastapi import HTTPException, status
-from sqlalchemy import func
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from settings import settings
 from crud.base import CrudOperation
+from crud.loaders import list_options
 from models.lpr_setting import DBLprSetting, DBLprSettingInstance
 from models.camera import DBCamera
 from models.lpr import DBLpr
@@ -57,6 +56,7 @@ class LprOperation(CrudOperation):
 
             await self.db_session.commit()
             await self.db_session.refresh(new_lpr)
+            await self.notify_change(new_lpr.id)
             meilisearch_lpr = LprInDB.from_orm(new_lpr)
             await lpr_search.sync_document(meilisearch_lpr)
             return new_lpr
@@ -75,6 +75,7 @@ class LprOperation(CrudOperation):
             self.db_session.add(db_lpr)
             await self.db_session.commit()
             await self.db_session.refresh(db_lpr)
+            await self.notify_change(lpr_id)
             meilisearch_lpr = LprInDB.from_orm(db_lpr)
             await lpr_search.sync_document(meilisearch_lpr)
 
@@ -93,6 +94,7 @@ class LprOperation(CrudOperation):
         try:
             await self.db_session.delete(db_lpr)
             await self.db_session.commit()
+            await self.notify_change(lpr_id)
 
             # Remove connection from Twisted
             # remove_connection(lpr_id)
@@ -106,53 +108,13 @@ class LprOperation(CrudOperation):
 
 
 
-    async def get_lpr_all_cameras(self, lpr_id: int, page: int=1, page_size: int=10):
-        total_query = await self.db_session.execute(select(func.count(DBCamera.id)).where(DBCamera.lpr_id == lpr_id))
-        total_records = total_query.scalar_one()
+    async def get_lpr_all_cameras(self, lpr_id: int, page: int=1, page_size: int=10, count: str="exact"):
+        query = select(DBCamera).options(*list_options(DBCamera)).where(DBCamera.lpr_id == lpr_id).order_by(DBCamera.name.desc())
+        return await self.paginate(query, page, page_size, count)
 
-        # Calculate total number of pages
-        total_pages = math.ceil(total_records / page_size) if page_size else 1
-
-        # Calculate offset
-        offset = (page - 1) * page_size
-
-        # Fetch the records
-        query = await self.db_session.execute(
-            select(DBCamera).where(DBCamera.lpr_id == lpr_id).order_by(DBCamera.name.desc()).offset(offset).limit(page_size)
-        )
-        objects = query.unique().scalars().all()
-
-        return {
-            "items": objects,
-            "total_records": total_records,
-            "total_pages": total_pages,
-            "current_page": page,
-            "page_size": page_size,
-        }
-
-    async def get_lpr_all_settings(self, lpr_id: int, page: int=1, page_size: int=10):
-        total_query = await self.db_session.execute(select(func.count(DBLprSettingInstance.id)).where(DBLprSettingInstance.lpr_id == lpr_id))
-        total_records = total_query.scalar_one()
-
-        # Calculate total number of pages
-        total_pages = math.ceil(total_records / page_size) if page_size else 1
-
-        # Calculate offset
-        offset = (page - 1) * page_size
-
-        # Fetch the records
-        query = await self.db_session.execute(
-            select(DBLprSettingInstance).where(DBLprSettingInstance.lpr_id == lpr_id).order_by(DBLprSettingInstance.name.desc()).offset(offset).limit(page_size)
-        )
-        objects = query.unique().scalars().all()
-
-        return {
-            "items": objects,
-            "total_records": total_records,
-            "total_pages": total_pages,
-            "current_page": page,
-            "page_size": page_size,
-        }
+    async def get_lpr_all_settings(self, lpr_id: int, page: int=1, page_size: int=10, count: str="exact"):
+        query = select(DBLprSettingInstance).options(*list_options(DBLprSettingInstance)).where(DBLprSettingInstance.lpr_id == lpr_id).order_by(DBLprSettingInstance.name.desc())
+        return await self.paginate(query, page, page_size, count)
 
     async def add_lpr_setting(self, lpr_id: int, setting_create: LprSettingInstanceCreate):
         exists_query = await self.db_session.execute(
@@ -185,6 +147,7 @@ class LprOperation(CrudOperation):
             self.db_session.add(setting_instance)
             await self.db_session.commit()
             await self.db_session.refresh(setting_instance)
+            await self.notify_change(setting_instance.id, table="lpr_setting_instances")
             meilisearch_setting = LprSettingInstanceInDB.from_orm(setting_instance)
             await lpr_setting_search.sync_document(meilisearch_setting)
             return setting_instance
@@ -217,6 +180,7 @@ class LprOperation(CrudOperation):
                 setattr(setting_instance, key, value)
             await self.db_session.commit()
             await self.db_session.refresh(setting_instance)
+            await self.notify_change(setting_instance.id, table="lpr_setting_instances")
             meilisearch_setting = LprSettingInstanceInDB.from_orm(setting_instance)
             await lpr_setting_search.sync_document(meilisearch_setting)
             return setting_instance
@@ -245,6 +209,7 @@ class LprOperation(CrudOperation):
         try:
             await self.db_session.delete(setting_instance)
             await self.db_session.commit()
+            await self.notify_change(setting_id, table="lpr_setting_instances")
             await lpr_setting_search.delete_document(setting_id)
             return {"message": f"object {setting_instance.name} deleted successfully"}
         except SQLAlchemyError as error:
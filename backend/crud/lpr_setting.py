@@ -29,6 +29,7 @@ class LprSettingOperation(CrudOperation):
             self.db_session.add(new_setting)
             await self.db_session.commit()
             await self.db_session.refresh(new_setting)
+            await self.notify_change(new_setting.id)
             return new_setting
         except SQLAlchemyError as error:
             await self.db_session.rollback()
@@ -45,6 +46,7 @@ class LprSettingOperation(CrudOperation):
             self.db_session.add(db_lpr_setting)
             await self.db_session.commit()
             await self.db_session.refresh(db_lpr_setting)
+            await self.notify_change(setting_id)
             return db_lpr_setting
         except SQLAlchemyError as error:
             await self.db_session.rollback()
@@ -1,8 +1,6 @@
-import math
 import datetime
 from typing import Optional
 from fastapi import HTTPException, status
-from sqlalchemy import func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.exc import SQLAlchemyError
@@ -14,6 +12,21 @@ from models.camera import DBCamera
 from schema.record import RecordCreate
 from schema.schedule_record import ScheduleRecordCreate, ScheduleRecordUpdate
 
+
+def _records_page(result: dict) -> dict:
+    """
+    Reshape a CrudOperation.paginate result into the records endpoints' layout.
+    """
+    return {
+        "records": result["items"],
+        "page": result["current_page"],
+        "page_size": result["page_size"],
+        "total_pages": result["total_pages"],
+        "total_records": result["total_records"],
+        "has_next": result["has_next"],
+    }
+
+
 class RecordOperation(CrudOperation):
     def __init__(self, db_session: AsyncSession):
         super().__init__(db_session, DBRecord, None)
@@ -36,35 +49,15 @@ class RecordOperation(CrudOperation):
         finally:
             await self.db_session.close()
 
-    async def get_all_records(self, page: int=1, page_size: int=10, camera_id: Optional[int] = None):
+    async def get_all_records(self, page: int=1, page_size: int=10, camera_id: Optional[int] = None, count: str="exact"):
         try:
             query = select(DBRecord)
             if camera_id:
                 query = query.where(DBRecord.camera_id == camera_id)
 
-            total_query = await self.db_session.execute(select(func.count(self.db_table.id)).where(DBRecord.camera_id == camera_id) if camera_id else select(func.count(DBRecord.id)))
-            total_records = total_query.scalar_one()
-
-            # Calculate total number of pages
-            total_pages = math.ceil(total_records / page_size) if page_size else 1
-
-            # Calculate offset
-            offset = (page - 1) * page_size
-
             # Apply pagination
-            query = query.order_by(DBRecord.timestamp.desc()).offset(offset).limit(page_size)
-
-            # Execute query and fetch results
-            result = await self.db_session.execute(query)
-            records = result.scalars().all()
-
-            return {
-                "records": records,
-                "page": page,
-                "page_size": page_size,
-                "total_pages": total_pages,
-                "total_records": total_records,
-            }
+            query = query.order_by(DBRecord.timestamp.desc())
+            return _records_page(await self.paginate(query, page, page_size, count))
         except SQLAlchemyError as error:
             raise HTTPException(status.HTTP_400_BAD_REQUEST, f"{error}: Failed to retrieve records.")
 
@@ -94,31 +87,13 @@ class ScheduledRecordOperation(CrudOperation):
             await self.db_session.close()
 
 
-    async def get_all_scheduled_records(self, page: int=1, page_size: int=10):
+    async def get_all_scheduled_records(self, page: int=1, page_size: int=10, count: str="exact"):
         try:
             query = select(self.db_table).where(self.db_table.is_processed == False)
 
-            total_query = await self.db_session.execute(select(func.count(self.db_table.id)).where(DBScheduledRecord.is_processed == False))
-            total_records = total_query.scalar_one()
-
-            # Calculate total number of pages
-            total_pages = math.ceil(total_records / page_size) if page_size else 1
-
-            # Calculate offset
-            offset = (page - 1) * page_size
-
             # Apply pagination
-            query = query.order_by(DBScheduledRecord.scheduled_time.desc()).offset(offset).limit(page_size)
-            result = await self.db_session.execute(query)
-            records = result.scalars().all()
-
-            return {
-                "records": records,
-                "page": page,
-                "page_size": page_size,
-                "total_pages": total_pages,
-                "total_records": total_records,
-            }
+            query = query.order_by(DBScheduledRecord.scheduled_time.desc())
+            return _records_page(await self.paginate(query, page, page_size, count))
         except SQLAlchemyError as error:
             raise HTTPException(status.HTTP_400_BAD_REQUEST, f"{error}: Failed to retrieve scheduled records.")
 
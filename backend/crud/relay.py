@@ -1,13 +1,12 @@
-import math
 from datetime import time
 from fastapi import HTTPException, status
-from sqlalchemy import func
 from sqlalchemy import delete
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from crud.base import CrudOperation
+from crud.loaders import list_options
 from crud.gate import GateOperation
 from models.gate import DBGate
 from models.relay import DBRelay
@@ -40,6 +39,7 @@ class RelayOperation(CrudOperation):
             self.db_session.add(new_relay)
             await self.db_session.commit()
             await self.db_session.refresh(new_relay)
+            await self.notify_change(new_relay.id)
 
             # Initialize keys for the relay
             await self.initialize_keys(new_relay.id, new_relay.number_of_keys)
@@ -73,6 +73,7 @@ class RelayOperation(CrudOperation):
             )
             self.db_session.add(key)
         await self.db_session.commit()
+        await self.notify_change(table="keys")
 
     async def update_relay(self, relay_id: int, relay: RelayUpdate):
         db_relay = await self.get_one_object_id(relay_id)
@@ -92,6 +93,7 @@ class RelayOperation(CrudOperation):
             self.db_session.add(db_relay)
             await self.db_session.commit()
             await self.db_session.refresh(db_relay)
+            await self.notify_change(relay_id)
             return db_relay
         except SQLAlchemyError as error:
             await self.db_session.rollback()
@@ -111,26 +113,6 @@ class RelayOperation(CrudOperation):
         return result.scalars().all()
 
 
-    async def get_relay_all_keys(self, relay_id: int, page: int=1, page_size: int=10):
-        total_query = await self.db_session.execute(select(func.count(DBRelayKey.id)).where(DBRelayKey.relay_id == relay_id))
-        total_records = total_query.scalar_one()
-
-        # Calculate total number of pages
-        total_pages = math.ceil(total_records / page_size) if page_size else 1
-
-        # Calculate offset
-        offset = (page - 1) * page_size
-
-        # Fetch the records
-        query = await self.db_session.execute(
-            select(DBRelayKey).where(DBRelayKey.relay_id == relay_id).order_by(DBRelayKey.created_at.desc()).offset(offset).limit(page_size)
-        )
-        objects = query.unique().scalars().all()
-
-        return {
-            "items": objects,
-            "total_records": total_records,
-            "total_pages": total_pages,
-            "current_page": page,
-            "page_size": page_size,
-        }
+    async def get_relay_all_keys(self, relay_id: int, page: int=1, page_size: int=10, count: str="exact"):
+        query = select(DBRelayKey).options(*list_options(DBRelayKey)).where(DBRelayKey.relay_id == relay_id).order_by(DBRelayKey.created_at.desc())
+        return await self.paginate(query, page, page_size, count)
@@ -19,6 +19,7 @@ class StatusOperation(CrudOperation):
         self.db_session.add(new_status)
         await self.db_session.commit()
         await self.db_session.refresh(new_status)
+        await self.notify_change(new_status.id)
         return new_status
 
     async def update_status(self, status_id: int, status_update: StatusUpdate):
@@ -32,6 +33,7 @@ class StatusOperation(CrudOperation):
             self.db_session.add(db_status)
             await self.db_session.commit()
             await self.db_session.refresh(db_status)
+            await self.notify_change(status_id)
 
             return db_status
         except SQLAlchemyError as error:
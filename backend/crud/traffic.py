@@ -1,10 +1,12 @@
 import base64
 import math
 import os
+from collections import Counter
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 from fastapi import HTTPException, status
-from sqlalchemy import func
+from sqlalchemy import delete, false, func, or_, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -13,10 +15,13 @@ from datetime import datetime
 from crud.base import CrudOperation
 from crud.gate import GateOperation
 from crud.camera import CameraOperation
-from models.traffic import DBTraffic
+from crud.loaders import column_options
+from models.traffic import DBTraffic, DBTrafficHourlyStat
 from schema.traffic import TrafficCreate, TrafficInDB
 from search_service.search_config import traffic_search
 from utils.vehicle_access import VehicleAccessChecker
+from utils.pagination import encode_cursor, decode_cursor, count_query
+from utils.plates import canonical_plate_key, segment_key_patterns, plate_search_pattern, LIKE_ESCAPE
 
 BASE_UPLOAD_DIR = Path("uploads/plate_images")
 BASE_UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
@@ -72,16 +77,24 @@ class TrafficOperation(CrudOperation):
                 mid_3 = traffic.mid_3,
                 suffix_2 = traffic.suffix_2,
                 plate_number = traffic.plate_number,
+                plate_key = canonical_plate_key(
+                    traffic.prefix_2, traffic.alpha, traffic.mid_3, traffic.suffix_2
+                ),
                 ocr_accuracy = traffic.ocr_accuracy,
                 vision_speed = traffic.vision_speed,
                 plate_image=plate_image,
                 full_image=full_image,
                 timestamp = naive_timestamp,
+                camera_id = db_camera.id,
+                gate_id = db_gate.id,
                 camera_name = db_camera.name,
                 gate_name = db_gate.name,
                 access_granted = is_accessible,
             )
             self.db_session.add(new_traffic)
+            await self.record_hourly_stats(
+                [(naive_timestamp, db_gate.id, db_camera.id, is_accessible)]
+            )
             await self.db_session.commit()
             await self.db_session.refresh(new_traffic)
             meilisearch_traffic = TrafficInDB.from_orm(new_traffic)
@@ -95,6 +108,46 @@ class TrafficOperation(CrudOperation):
 
 
 
+    async def record_hourly_stats(self, events, sign: int = 1):
+        """
+        Add traffic events to the hourly rollup (or remove them with sign=-1)
+        inside the current transaction. Each event is
+        (timestamp, gate_id, camera_id, access_granted).
+        """
+        counts = Counter()
+        for timestamp, gate_id, camera_id, access_granted in events:
+            if timestamp is None or gate_id is None or camera_id is None:
+                continue
+            bucket = timestamp.replace(minute=0, second=0, microsecond=0)
+            counts[(bucket, gate_id, camera_id, bool(access_granted))] += sign
+        if not counts:
+            return
+
+        stmt = pg_insert(DBTrafficHourlyStat).values([
+            {
+                "bucket": bucket,
+                "gate_id": gate_id,
+                "camera_id": camera_id,
+                "access_granted": access_granted,
+                "count": delta,
+            }
+            for (bucket, gate_id, camera_id, access_granted), delta in counts.items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["bucket", "gate_id", "camera_id", "access_granted"],
+            set_={"count": DBTrafficHourlyStat.count + stmt.excluded.count},
+        )
+        await self.db_session.execute(stmt)
+
+        if sign < 0:
+            buckets = {bucket for bucket, _, _, _ in counts}
+            await self.db_session.execute(
+                delete(DBTrafficHourlyStat).where(
+                    DBTrafficHourlyStat.bucket.in_(buckets),
+                    DBTrafficHourlyStat.count <= 0,
+                )
+            )
+
     async def get_all_traffics(
         self,
         page: int = 1,
@@ -105,112 +158,230 @@ class TrafficOperation(CrudOperation):
         alpha: str = None,
         mid_3: str = None,
         suffix_2: str = None,
+        plate: str = None,
         start_date: datetime = None,
         end_date: datetime = None,
+        cursor: str = None,
+        count: str = "exact",
+        fields: tuple = None,
     ):
         """
         Retrieve all traffic data with optional filters for gate_id, camera_id, plate_number, and date range, with pagination.
+
+        Pages are ordered by (timestamp, id) descending. When a cursor is given
+        the page is read by keyset instead of OFFSET, so deep pages cost the
+        same as the first one. count is "exact", "estimated" (planner
+        estimate) or "none" (no total is computed). fields limits the
+        columns selected for each row.
         """
         try:
-            if camera_id is not None:
-                db_camera = await CameraOperation(self.db_session).get_one_object_id(camera_id)
-                camera_name = db_camera.name
-            if gate_id is not None:
-                db_gate = await GateOperation(self.db_session).get_one_object_id(gate_id)
-                gate_name = db_gate.name
-            # Base query
-            query = select(self.db_table).order_by(self.db_table.timestamp.desc())
-
-            # Apply filters
-            if gate_id is not None:
-                query = query.where(self.db_table.gate_name == gate_name)
-            if camera_id is not None:
-                query = query.where(self.db_table.camera_name == camera_name)
-            if prefix_2 is not None:
-                query = query.where(self.db_table.prefix_2.like(f"%{prefix_2}%"))
-            if alpha is not None:
-                query = query.where(self.db_table.alpha == alpha)
-            if mid_3 is not None:
-                query = query.where(self.db_table.mid_3.like(f"%{mid_3}%"))
-            if suffix_2 is not None:
-                query = query.where(self.db_table.suffix_2.like(f"%{suffix_2}%"))
-            # if plate_number is not None:
-            #     query = query.where(self.db_table.plate_number.ilike(f"%{plate_number}%"))
-            if start_date is not None:
-                query = query.where(self.db_table.timestamp >= start_date)
-            if end_date is not None:
-                query = query.where(self.db_table.timestamp <= end_date)
+            query = self.build_traffic_query(
+                gate_id=gate_id,
+                camera_id=camera_id,
+                prefix_2=prefix_2,
+                alpha=alpha,
+                mid_3=mid_3,
+                suffix_2=suffix_2,
+                plate=plate,
+                start_date=start_date,
+                end_date=end_date,
+            )
 
             # Total records query
-            total_query = await self.db_session.execute(select(func.count()).select_from(query.subquery()))
-            total_records = total_query.scalar_one()
+            total_records = await count_query(self.db_session, query, count)
+            total_pages = None
+            # A cursor page has no page number
+            current_page = page if cursor is None else None
 
             # Handle no results
             if total_records == 0:
                 return {
                     "items": [],
                     "total_records": 0,
-                    "total_pages": 0,
-                    "current_page": page,
+                    "total_pages": 0 if cursor is None else None,
+                    "current_page": current_page,
                     "page_size": page_size,
+                    "has_next": False,
+                    "next_cursor": None,
                 }
 
             # Calculate pagination
-            total_pages = math.ceil(total_records / page_size) if page_size else 1
-            offset = (page - 1) * page_size if page_size else None
+            if total_records is not None and cursor is None:
+                total_pages = math.ceil(total_records / page_size) if page_size else 1
 
-            # Paginated query
+            # Paginated query: keyset after the cursor, OFFSET otherwise
+            if cursor is not None:
+                cursor_timestamp, cursor_id = decode_cursor(cursor)
+                query = query.where(
+                    tuple_(self.db_table.timestamp, self.db_table.id) < (cursor_timestamp, cursor_id)
+                )
+            elif page_size:
+                query = query.offset((page - 1) * page_size)
             if page_size:
-                query = query.offset(offset).limit(page_size)
+                query = query.limit(page_size + 1)
+            if fields is not None:
+                query = query.options(column_options(self.db_table, fields))
 
             # Fetch results
             result_query = await self.db_session.execute(query)
             objects = result_query.scalars().all()
 
+            next_cursor = None
+            if page_size and len(objects) > page_size:
+                objects = objects[:page_size]
+                next_cursor = encode_cursor(objects[-1].timestamp, objects[-1].id)
+
             # Return response
             return {
                 "items": objects,
                 "total_records": total_records,
                 "total_pages": total_pages,
-                "current_page": page,
+                "current_page": current_page,
                 "page_size": page_size,
+                "has_next": next_cursor is not None,
+                "next_cursor": next_cursor,
             }
 
+        except HTTPException:
+            raise
         except Exception as e:
             print(f"[ERROR] Failed to fetch traffic data: {e}")
             raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Failed to fetch traffic data.")
 
 
-    async def get_traffics_by_camera_and_date(
+    def build_traffic_query(
         self,
+        gate_id: int = None,
+        camera_id: int = None,
+        prefix_2: str = None,
+        alpha: str = None,
+        mid_3: str = None,
+        suffix_2: str = None,
+        plate: str = None,
+        start_date: datetime = None,
+        end_date: datetime = None,
+    ):
+        """
+        Filtered traffic query ordered by (timestamp, id) descending, shared
+        by listing and export.
+        """
+        query = select(self.db_table).order_by(
+            self.db_table.timestamp.desc(), self.db_table.id.desc()
+        )
+        if gate_id is not None:
+            query = query.where(self.db_table.gate_id == gate_id)
+        if camera_id is not None:
+            query = query.where(self.db_table.camera_id == camera_id)
+        query = self.apply_plate_filters(
+            query,
+            prefix_2=prefix_2,
+            alpha=alpha,
+            mid_3=mid_3,
+            suffix_2=suffix_2,
+            plate=plate,
+        )
+        if start_date is not None:
+            query = query.where(self.db_table.timestamp >= start_date)
+        if end_date is not None:
+            query = query.where(self.db_table.timestamp <= end_date)
+        return query
+
+    def apply_plate_filters(self, query, plate: str = None, **segments):
+        """
+        Add plate filters that can use the plate key indexes: segment filters
+        become positional LIKEs on plate_key (one per placement of a partial
+        segment), and a free pattern (? and * wildcards) becomes a
+        trigram-backed LIKE.
+        """
+        key_patterns = segment_key_patterns(segments)
+        if key_patterns is not None:
+            query = query.where(or_(false(), *(
+                self.db_table.plate_key.like(key_pattern, escape=LIKE_ESCAPE)
+                for key_pattern in key_patterns
+            )))
+        if plate:
+            query = query.where(
+                self.db_table.plate_key.like(plate_search_pattern(plate), escape=LIKE_ESCAPE)
+            )
+        return query
+
+    def _purge_filters(self, start_date: datetime, end_date: datetime, camera_id: int = None):
+        filters = [self.db_table.timestamp >= start_date, self.db_table.timestamp < end_date]
+        if camera_id is not None:
+            filters.append(self.db_table.camera_id == camera_id)
+        return filters
+
+    async def get_id_bounds(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        camera_id: int = None
+    ) -> tuple[Optional[int], Optional[int]]:
+        """
+        Smallest and largest traffic id in a purge range.
+        """
+        result = await self.db_session.execute(
+            select(func.min(self.db_table.id), func.max(self.db_table.id)).where(
+                *self._purge_filters(start_date, end_date, camera_id)
+            )
+        )
+        return tuple(result.one())
+
+    async def delete_traffic_chunk(
+        self,
+        first_id: int,
+        last_id: int,
         start_date: datetime,
         end_date: datetime,
-        camera_id: int=None
+        camera_id: int = None,
+        before_commit=None
     ):
-        if camera_id:
-            # Get camera details
-            camera = await CameraOperation(self.db_session).get_one_object_id(camera_id)
+        """
+        Set-based delete of the matching rows in [first_id, last_id], committed
+        on its own together with the matching hourly rollup decrements.
+        Returns id, plate_image and full_image of the deleted rows.
+
+        before_commit, if given, is awaited with the deleted rows before the
+        commit, so the caller can record them first; if it raises, the chunk
+        is rolled back.
+        """
+        try:
             result = await self.db_session.execute(
-                select(self.db_table).where(
-                    self.db_table.camera_name == camera.name,
-                    self.db_table.timestamp >= start_date,
-                    self.db_table.timestamp < end_date
+                delete(self.db_table)
+                .where(
+                    self.db_table.id >= first_id,
+                    self.db_table.id <= last_id,
+                    *self._purge_filters(start_date, end_date, camera_id),
                 )
-            )
-        else:
-            result = await self.db_session.execute(
-                select(self.db_table).where(
-                    self.db_table.timestamp >= start_date,
-                    self.db_table.timestamp < end_date
+                .returning(
+                    self.db_table.id,
+                    self.db_table.plate_image,
+                    self.db_table.full_image,
+                    self.db_table.timestamp,
+                    self.db_table.gate_id,
+                    self.db_table.camera_id,
+                    self.db_table.access_granted,
                 )
+                .execution_options(synchronize_session=False)
             )
-        return result.scalars().all()
-
-    async def delete_traffic_batch(self, traffics):
-        try:
-            for traffic in traffics:
-                await self.db_session.delete(traffic)
+            rows = result.all()
+            await self.record_hourly_stats(
+                [(row.timestamp, row.gate_id, row.camera_id, row.access_granted) for row in rows],
+                sign=-1,
+            )
+            if before_commit is not None:
+                await before_commit(rows)
             await self.db_session.commit()
+            return rows
         except SQLAlchemyError as error:
             await self.db_session.rollback()
             raise HTTPException(status.HTTP_400_BAD_REQUEST, f"Delete failed: {error}")
+        except Exception:
+            await self.db_session.rollback()
+            raise
+
+    async def traffic_exists(self, traffic_id: int) -> bool:
+        result = await self.db_session.execute(
+            select(self.db_table.id).where(self.db_table.id == traffic_id)
+        )
+        return result.scalar_one_or_none() is not None
@@ -88,6 +88,7 @@ class UserOperation(CrudOperation):
             self.db_session.add(new_user)
             await self.db_session.commit()
             await self.db_session.refresh(new_user)
+            await self.notify_change(new_user.id)
             meilisearch_data = UserInDB.from_orm(new_user)
             await user_search.sync_document(meilisearch_data)
             return new_user
@@ -108,6 +109,7 @@ class UserOperation(CrudOperation):
             self.db_session.add(db_user)
             await self.db_session.commit()
             await self.db_session.refresh(db_user)
+            await self.notify_change(user_id)
             meilisearch_data = UserInDB.from_orm(db_user)
             await user_search.sync_document(meilisearch_data)
             return db_user
@@ -128,6 +130,7 @@ class UserOperation(CrudOperation):
             self.db_session.add(db_user)
             await self.db_session.commit()
             await self.db_session.refresh(db_user)
+            await self.notify_change(user_id)
             return db_user
         except SQLAlchemyError as error:
             await self.db_session.rollback()
@@ -146,6 +149,7 @@ class UserOperation(CrudOperation):
             self.db_session.add(db_user)
             await self.db_session.commit()
             await self.db_session.refresh(db_user)
+            await self.notify_change(user_id)
             status_message = f"User {db_user.id} deleted"
             return {"message": status_message}
         except SQLAlchemyError as error:
@@ -173,7 +177,12 @@ class UserOperation(CrudOperation):
             # Update user model
             user.profile_image = saved_path
             self.db_session.add(user)
-            await self.db_session.commit()
+            try:
+                await self.db_session.commit()
+            except SQLAlchemyError:
+                # Nothing references the new image after all
+                await self.storage.delete_images([saved_path])
+                raise
             await self.db_session.refresh(user)
             return user
 
@@ -279,6 +288,7 @@ class UserOperation(CrudOperation):
             if users_to_create:
                 self.db_session.add_all(users_to_create)
                 await self.db_session.commit()
+                await self.notify_change()
             return {"message": f"{len(users_to_create)} users created successfully"}
 
         except pd.errors.EmptyDataError:
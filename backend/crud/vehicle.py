@@ -1,4 +1,3 @@
-import math
 from pathlib import Path
 from fastapi import HTTPException, UploadFile, status
 from sqlalchemy import func
@@ -8,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from models.user import DBGuest, DBUser
 from crud.base import CrudOperation
+from crud.loaders import list_options
 from crud.user import UserOperation
 from models.vehicle import DBVehicle
 from schema.vehicle import VehicleCreate, VehicleInDB
@@ -28,30 +28,12 @@ class VehicleOperation(CrudOperation):
         self.image_type = "car_images"
         self.storage = StorageFactory.get_instance(settings.STORAGE_BACKEND)
 
-    async def get_vehicles_by_user(self, user_id: int, page: int = 1, page_size: int = 10):
+    async def get_vehicles_by_user(self, user_id: int, page: int = 1, page_size: int = 10, count: str = "exact"):
         """
         Retrieve vehicles of a specific user with pagination.
         """
-        offset = (page - 1) * page_size
-        query = select(self.db_table).where(self.db_table.owner_id == user_id).order_by(self.db_table.created_at.desc()).offset(offset).limit(page_size)
-        result = await self.db_session.execute(query)
-        items = result.scalars().all()
-
-        # Count total records
-        total_query = await self.db_session.execute(select(func.count()).where(self.db_table.owner_id == user_id))
-        total_records = total_query.scalar_one()
-
-        # Calculate total pages
-        # total_pages = (total_records + page_size - 1) // page_size if page_size > 0 else 1
-        total_pages = math.ceil(total_records / page_size) if page_size else 1
-
-        return {
-            "items": items,
-            "total_records": total_records,
-            "total_pages": total_pages,
-            "current_page": page,
-            "page_size": page_size,
-        }
+        query = select(self.db_table).options(*list_options(self.db_table)).where(self.db_table.owner_id == user_id).order_by(self.db_table.created_at.desc())
+        return await self.paginate(query, page, page_size, count)
 
     async def get_one_vehcile_plate(self, plate: str):
         result = await self.db_session.execute(
@@ -107,6 +89,7 @@ class VehicleOperation(CrudOperation):
             self.db_session.add(new_vehicle)
             await self.db_session.commit()
             await self.db_session.refresh(new_vehicle)
+            await self.notify_change(new_vehicle.id)
             meilisearch_data = VehicleInDB.from_orm(new_vehicle)
             await vehicle_search.sync_document(meilisearch_data)
             return new_vehicle
@@ -135,7 +118,12 @@ class VehicleOperation(CrudOperation):
             # Update user model
             vehicle.car_image = saved_path
             self.db_session.add(vehicle)
-            await self.db_session.commit()
+            try:
+                await self.db_session.commit()
+            except SQLAlchemyError:
+                # Nothing references the new image after all
+                await self.storage.delete_images([saved_path])
+                raise
             await self.db_session.refresh(vehicle)
             return vehicle
 
@@ -161,6 +149,7 @@ class VehicleOperation(CrudOperation):
                 self.db_session.add(db_vehicle)
                 await self.db_session.commit()
                 await self.db_session.refresh(db_vehicle)
+                await self.notify_change(vehicle_id)
                 status_message = f"Vehicle {db_vehicle.id} deleted"
                 return {"message": status_message}
             except SQLAlchemyError as error:
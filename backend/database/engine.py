@@ -1,5 +1,5 @@
 from typing import AsyncGenerator
-from sqlalchemy import inspect
+from sqlalchemy import inspect, text
 from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
 from sqlalchemy.ext.asyncio.session import AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
@@ -67,6 +67,8 @@ async def ensure_tables_exist():
     """Ensure all tables defined in Base are created."""
     try:
         async with engine.begin() as conn:
+            # Trigram index support for partial plate search
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
             await conn.run_sync(Base.metadata.create_all)
             print("All tables created successfully.")
     except SQLAlchemyError as e:
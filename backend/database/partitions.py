@@ -0,0 +1,202 @@
+import logging
+import re
+from datetime import date, datetime, timezone
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from settings import settings
+from database.engine import engine
+from image_storage.storage_management import StorageFactory
+
+
+logger = logging.getLogger(__name__)
+
+TRAFFIC_TABLE = "traffics"
+DEFAULT_PARTITION = f"{TRAFFIC_TABLE}_default"
+PARTITION_NAME = re.compile(rf"^{TRAFFIC_TABLE}_p(\d{{4}})_(\d{{2}})$")
+
+
+def month_start(value: date, offset: int = 0) -> date:
+    """
+    First day of the month of `value`, shifted by `offset` months.
+    """
+    month_index = value.year * 12 + value.month - 1 + offset
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def partition_name(start: date, table_name: str = TRAFFIC_TABLE) -> str:
+    return f"{table_name}_p{start.year:04d}_{start.month:02d}"
+
+
+def create_partition_sql(start: date, table_name: str = TRAFFIC_TABLE) -> str:
+    """
+    DDL for the monthly range partition starting at `start`.
+    """
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(start, table_name)} "
+        f"PARTITION OF {table_name} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{month_start(start, 1).isoformat()}')"
+    )
+
+
+def create_default_partition_sql(table_name: str = TRAFFIC_TABLE) -> str:
+    """
+    DDL for the partition catching rows outside every monthly range (camera
+    clock skew, late or backfilled events).
+    """
+    return f"CREATE TABLE IF NOT EXISTS {table_name}_default PARTITION OF {table_name} DEFAULT"
+
+
+async def is_partitioned(conn, table_name: str = TRAFFIC_TABLE) -> bool:
+    result = await conn.execute(
+        text(
+            "SELECT 1 FROM pg_partitioned_table p "
+            "JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = :table_name"
+        ),
+        {"table_name": table_name},
+    )
+    return result.scalar() is not None
+
+
+def utc_today() -> date:
+    """
+    Today in UTC, the clock traffic timestamps and rollups are kept in.
+    """
+    return datetime.now(timezone.utc).date()
+
+
+def is_expired(name: str, cutoff: date) -> bool:
+    match = PARTITION_NAME.match(name)
+    if not match:
+        return False
+    start = date(int(match.group(1)), int(match.group(2)), 1)
+    return month_start(start, 1) <= cutoff
+
+
+async def split_default_partition(conn) -> list[date]:
+    """
+    Move the rows that landed in the default partition into monthly
+    partitions of their own, creating them as needed. The default partition
+    is detached meanwhile, since a range can't be created while it holds
+    rows for it; inserts wait on the table lock until the transaction ends.
+    Returns the months split out.
+    """
+    result = await conn.execute(
+        text(f"SELECT DISTINCT date_trunc('month', timestamp)::date FROM {DEFAULT_PARTITION}")
+    )
+    months = sorted(result.scalars().all())
+    if not months:
+        return []
+
+    await conn.execute(text(f"ALTER TABLE {TRAFFIC_TABLE} DETACH PARTITION {DEFAULT_PARTITION}"))
+    for start in months:
+        await conn.execute(text(create_partition_sql(start)))
+        bounds = {"start": start, "end": month_start(start, 1)}
+        await conn.execute(
+            text(
+                f"INSERT INTO {TRAFFIC_TABLE} SELECT * FROM {DEFAULT_PARTITION} "
+                "WHERE timestamp >= :start AND timestamp < :end"
+            ),
+            bounds,
+        )
+        await conn.execute(
+            text(f"DELETE FROM {DEFAULT_PARTITION} WHERE timestamp >= :start AND timestamp < :end"),
+            bounds,
+        )
+    await conn.execute(text(f"ALTER TABLE {TRAFFIC_TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+    return months
+
+
+async def ensure_traffic_partitions(db_engine: AsyncEngine = engine, months_ahead: int = None) -> None:
+    """
+    Create the partitions for the current month and the next `months_ahead`
+    months, plus the default partition catching rows outside them, and split
+    any rows that reached the default partition out into monthly ones.
+    """
+    if months_ahead is None:
+        months_ahead = settings.TRAFFIC_PARTITION_MONTHS_AHEAD
+    current = month_start(utc_today())
+    async with db_engine.begin() as conn:
+        if not await is_partitioned(conn):
+            logger.warning(f"{TRAFFIC_TABLE} is not partitioned; run the migrations to enable partitioning.")
+            return
+        await conn.execute(text(create_default_partition_sql()))
+        split = await split_default_partition(conn)
+        for offset in range(months_ahead + 1):
+            await conn.execute(text(create_partition_sql(month_start(current, offset))))
+    if split:
+        logger.info(
+            f"Split {DEFAULT_PARTITION} into {', '.join(partition_name(start) for start in split)}"
+        )
+    logger.info(f"Ensured {TRAFFIC_TABLE} partitions through {month_start(current, months_ahead)}")
+
+
+async def drop_expired_traffic_partitions(db_engine: AsyncEngine = engine, retention_months: int = None) -> list[str]:
+    """
+    Detach whole monthly partitions older than the retention window, remove
+    the images their rows referenced, then drop them.
+
+    Detaching commits first, so the partitions leave the traffic table at
+    once; their images are then streamed in PURGE_CHUNK_SIZE batches. A
+    partition left detached by an interrupted run is picked up again on the
+    next one.
+    """
+    if retention_months is None:
+        retention_months = settings.TRAFFIC_RETENTION_MONTHS
+    if retention_months <= 0:
+        return []
+
+    cutoff = month_start(utc_today(), -retention_months)
+    async with db_engine.begin() as conn:
+        if not await is_partitioned(conn):
+            return []
+        attached = await conn.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = CAST(:table_name AS regclass)"
+            ),
+            {"table_name": TRAFFIC_TABLE},
+        )
+        for name in attached.scalars().all():
+            if is_expired(name, cutoff):
+                await conn.execute(text(f"ALTER TABLE {TRAFFIC_TABLE} DETACH PARTITION {name}"))
+
+        detached = await conn.execute(
+            text(
+                "SELECT c.relname FROM pg_class c "
+                "WHERE c.relkind = 'r' AND c.relname LIKE :pattern "
+                "AND NOT EXISTS (SELECT 1 FROM pg_inherits i WHERE i.inhrelid = c.oid)"
+            ),
+            {"pattern": f"{TRAFFIC_TABLE}\\_p%"},
+        )
+        expired = [name for name in detached.scalars().all() if is_expired(name, cutoff)]
+
+    storage = StorageFactory.get_instance(settings.STORAGE_BACKEND)
+    dropped = []
+    for name in expired:
+        async with db_engine.connect() as conn:
+            rows = await conn.stream(text(f"SELECT plate_image, full_image FROM {name}"))
+            async for chunk in rows.partitions(settings.PURGE_CHUNK_SIZE):
+                image_paths = [path for row in chunk for path in row if path]
+                for error in await storage.delete_images(image_paths):
+                    logger.error(f"Failed to delete image {error}")
+        async with db_engine.begin() as conn:
+            await conn.execute(text(f"DROP TABLE {name}"))
+        dropped.append(name)
+
+    if dropped:
+        logger.info(f"Dropped expired {TRAFFIC_TABLE} partitions: {', '.join(dropped)}")
+    return dropped
+
+
+async def maintain_traffic_partitions() -> None:
+    """
+    Scheduled job: create upcoming partitions and apply partition retention.
+    """
+    try:
+        await ensure_traffic_partitions()
+        await drop_expired_traffic_partitions()
+    except Exception as e:
+        logger.error(f"Traffic partition maintenance failed: {e}")
@@ -0,0 +1,76 @@
+import hashlib
+from pathlib import Path
+
+from redis_cache import RedisCache, redis_cache
+from settings import settings
+
+
+# Directory, under each image type, holding content-addressed images
+CAS_DIR = "cas"
+
+IMMUTABLE_CACHE_CONTROL = f"public, max-age={settings.IMAGE_IMMUTABLE_MAX_AGE}, immutable"
+
+# KEYS[1] = refcount hash, ARGV[1] = image path. Returns the remaining count,
+# or -1 when the image has no count (stored before counting, or Redis lost
+# it), in which case it is kept.
+RELEASE_REF_LUA = """
+if redis.call('HEXISTS', KEYS[1], ARGV[1]) == 0 then
+    return -1
+end
+local count = redis.call('HINCRBY', KEYS[1], ARGV[1], -1)
+if count <= 0 then
+    redis.call('HDEL', KEYS[1], ARGV[1])
+    return 0
+end
+return count
+"""
+
+
+def content_path(image_type: str, byte_array: bytes) -> tuple[Path, str]:
+    """
+    Directory and file name of an image stored by content: the SHA-256 of its
+    bytes, fanned out over two directory levels so none grows too large
+    (plate_images/cas/3f/a2/3fa2....jpg).
+    """
+    digest = hashlib.sha256(byte_array).hexdigest()
+    return Path(image_type) / CAS_DIR / digest[:2] / digest[2:4], f"{digest}.jpg"
+
+
+def is_content_addressed(image_path) -> bool:
+    return f"/{CAS_DIR}/" in str(image_path).replace("\\", "/")
+
+
+class ImageRefCounts:
+    """
+    Number of records referencing each content-addressed image, in a Redis
+    hash shared by the API and the NATS consumer. An image is written on its
+    first reference and deleted when its last one is released.
+    """
+    KEY = "image:refs"
+
+    def __init__(self, cache: RedisCache) -> None:
+        self.cache = cache
+
+    async def acquire(self, image_path: str) -> int:
+        async with self.cache.get_connection() as conn:
+            return await conn.hincrby(self.KEY, image_path, 1)
+
+    async def release(self, image_paths) -> list[str]:
+        """
+        Drop one reference per path (a path listed twice loses two) and return
+        the paths nothing references any more.
+        """
+        image_paths = list(image_paths)
+        if not image_paths:
+            return []
+        async with self.cache.get_connection() as conn:
+            async with conn.pipeline(transaction=False) as pipe:
+                for image_path in image_paths:
+                    pipe.eval(RELEASE_REF_LUA, 1, self.KEY, image_path)
+                counts = await pipe.execute()
+        return list(dict.fromkeys(
+            image_path for image_path, count in zip(image_paths, counts) if count == 0
+        ))
+
+
+image_refs = ImageRefCounts(redis_cache)
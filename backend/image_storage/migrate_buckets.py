@@ -0,0 +1,91 @@
+"""
+Move MinIO objects from the legacy per-camera-per-hour buckets into the
+typed layout (one bucket per image type).
+
+Object keys don't change, only the bucket holding them, so paths stored in
+the database stay valid. Run it once when switching MINIO_BUCKET_LAYOUT from
+"legacy" to "typed"; it is safe to rerun after an interruption.
+
+    cd backend && python -m image_storage.migrate_buckets [--dry-run] [--workers 8]
+"""
+import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from minio.commonconfig import CopySource
+from minio.error import S3Error
+
+from image_storage.storage_management import StorageFactory
+from settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+def legacy_buckets(storage) -> list[str]:
+    """
+    Buckets under the storage prefix that are not typed-layout buckets.
+    """
+    typed = {storage.typed_bucket_name(image_type) for image_type in storage.image_types}
+    prefix = f"{storage.bucket_prefix}-"
+    return sorted(
+        bucket.name for bucket in storage.minio_client.list_buckets()
+        if bucket.name.startswith(prefix) and bucket.name not in typed
+    )
+
+
+def move_object(storage, source_bucket: str, object_name: str, dry_run: bool) -> bool:
+    image_type = object_name.split("/", 1)[0]
+    if image_type not in storage.image_types:
+        logger.warning(f"Skipping {source_bucket}/{object_name}: unknown image type '{image_type}'")
+        return False
+
+    target_bucket = storage.typed_bucket_name(object_name)
+    if dry_run:
+        logger.info(f"Would move {source_bucket}/{object_name} -> {target_bucket}")
+        return True
+
+    storage.ensure_bucket(target_bucket)
+    storage.minio_client.copy_object(target_bucket, object_name, CopySource(source_bucket, object_name))
+    storage.minio_client.remove_object(source_bucket, object_name)
+    return True
+
+
+def migrate(dry_run: bool = False, workers: int = 8) -> dict:
+    storage = StorageFactory.get_instance("minio")
+    summary = {"buckets": 0, "moved": 0, "skipped": 0, "removed_buckets": 0}
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for bucket_name in legacy_buckets(storage):
+            summary["buckets"] += 1
+            object_names = [
+                obj.object_name
+                for obj in storage.minio_client.list_objects(bucket_name, recursive=True)
+            ]
+            results = list(executor.map(
+                lambda object_name: move_object(storage, bucket_name, object_name, dry_run),
+                object_names,
+            ))
+            moved = sum(results)
+            summary["moved"] += moved
+            summary["skipped"] += len(results) - moved
+            logger.info(f"{bucket_name}: {moved} of {len(results)} objects moved")
+
+            if dry_run or moved < len(results):
+                continue
+            try:
+                storage.minio_client.remove_bucket(bucket_name)
+                summary["removed_buckets"] += 1
+            except S3Error as e:
+                logger.warning(f"Could not remove bucket '{bucket_name}': {e}")
+
+    return summary
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="List the moves without copying anything")
+    parser.add_argument("--workers", type=int, default=settings.MINIO_IO_WORKERS)
+    args = parser.parse_args()
+    print(migrate(dry_run=args.dry_run, workers=args.workers))
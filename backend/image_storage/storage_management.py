@@ -1,5 +1,10 @@
+import asyncio
 import datetime
+import functools
 import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 from starlette.datastructures import UploadFile as StarletteUploadFile
 import numpy as np
@@ -11,9 +16,12 @@ import aiofiles
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 from minio import Minio, S3Error
+from minio.deleteobjects import DeleteObject
 import os
 from settings import settings
 from fastapi import UploadFile
+from image_storage.url_cache import PresignedUrlCache
+from image_storage.content_store import IMMUTABLE_CACHE_CONTROL, content_path, image_refs, is_content_addressed
 
 import os
 import logging
@@ -63,6 +71,16 @@ class ImageStorage:
         self.minio_client = minio_client
         self.base_upload_dir = Path(base_upload_dir) if base_upload_dir else Path("/default/path")
         self.bucket_prefix = bucket_prefix
+        self.url_cache = PresignedUrlCache(
+            max_size=settings.PRESIGNED_URL_CACHE_SIZE,
+            min_remaining=settings.PRESIGNED_URL_MIN_REMAINING,
+        )
+        # Buckets known to exist, so uploads skip bucket_exists round trips
+        self._known_buckets = set()
+        self._executor = (
+            ThreadPoolExecutor(max_workers=settings.MINIO_IO_WORKERS, thread_name_prefix="minio")
+            if storage_backend == "minio" else None
+        )
 
         image_types_env = settings.IMAGE_TYPES
         self.image_types = [image_type.strip() for image_type in image_types_env.split(",")]
@@ -86,6 +104,22 @@ class ImageStorage:
         if image_type not in self.image_dirs:
             raise ValueError(f"Invalid image type: {image_type}. Allowed types: {list(self.image_dirs.keys())}")
 
+        if isinstance(image_input, list):
+            image_input = bytes(image_input)
+
+        if isinstance(image_input, (UploadFile, StarletteUploadFile)):
+            byte_array = await image_input.read()
+        elif isinstance(image_input, (bytes, bytearray)):
+            byte_array = image_input
+        elif isinstance(image_input, str) or isinstance(image_input, Path):
+            async with aiofiles.open(image_input, mode="rb") as f:
+                byte_array = await f.read()
+        else:
+            raise ValueError("Unsupported image input type. Must be UploadFile, bytearray, or file path.")
+
+        if settings.IMAGE_CONTENT_ADDRESSED:
+            return await self._save_content_addressed(image_type, byte_array)
+
         # Determine directory path
         if image_type in ["plate_images", "traffic_images"]:  # High-volume types
             if not timestamp:
@@ -98,11 +132,9 @@ class ImageStorage:
             db_path = Path(image_type) / str(camera_id) / str(year) / month / day / hour
             dir_path = self.base_upload_dir / db_path
             dir_path.mkdir(parents=True, exist_ok=True)
-            bucket_name = f"{self.bucket_prefix}-{image_type}-{camera_id}-{year}-{month}-{day}-{hour}"
         else:  # Low-volume types
             dir_path = self.image_dirs[image_type]  # Changed line
             dir_path.mkdir(parents=True, exist_ok=True)
-            bucket_name = f"{self.bucket_prefix}-{image_type}"
             db_path = Path(image_type)
             # db_path = Path(image_type)
             # dir_path = self.base_upload_dir / db_path
@@ -114,19 +146,6 @@ class ImageStorage:
         # Generate unique image name
         image_name = self.generate_unique_image_name(image_type)
 
-        if isinstance(image_input, list):
-            image_input = bytes(image_input)
-
-        if isinstance(image_input, (UploadFile, StarletteUploadFile)):
-            byte_array = await image_input.read()
-        elif isinstance(image_input, (bytes, bytearray)):
-            byte_array = image_input
-        elif isinstance(image_input, str) or isinstance(image_input, Path):
-            async with aiofiles.open(image_input, mode="rb") as f:
-                byte_array = await f.read()
-        else:
-            raise ValueError("Unsupported image input type. Must be UploadFile, bytearray, or file path.")
-
         # Save the image based on the storage backend
         if self.storage_backend == "hard":
             file_path = dir_path / image_name
@@ -134,11 +153,60 @@ class ImageStorage:
             return str(settings.BASE_UPLOAD_DIR/db_path / image_name)
         elif self.storage_backend == "minio":
             minio_path = self._sanitize_minio_path(db_path / image_name)
-            await self._save_image_minio(byte_array, bucket_name, minio_path)
+            await self._save_image_minio(byte_array, self._bucket_name(minio_path), minio_path)
             return minio_path
         else:
             raise ValueError("Unsupported storage backend")
 
+    async def _save_content_addressed(self, image_type, byte_array):
+        """
+        Store an image under the hash of its bytes. Identical images share one
+        stored copy: it is written unless already there, and the reference is
+        counted in image_refs only once the copy is stored, so the path never
+        points at a missing or half-written image. A failed write raises: a
+        path without a counted reference must not be handed out.
+        """
+        db_path, image_name = content_path(image_type, byte_array)
+        if self.storage_backend == "hard":
+            image_path = str(settings.BASE_UPLOAD_DIR / db_path / image_name)
+        elif self.storage_backend == "minio":
+            image_path = self._sanitize_minio_path(db_path / image_name)
+        else:
+            raise ValueError("Unsupported storage backend")
+
+        try:
+            if self.storage_backend == "hard":
+                file_path = self.base_upload_dir / db_path / image_name
+                if not file_path.exists():
+                    file_path.parent.mkdir(parents=True, exist_ok=True)
+                    # Written aside and renamed, so readers never see a partial file
+                    temp_path = file_path.with_name(f"{image_name}.{uuid.uuid4().hex}.tmp")
+                    try:
+                        async with aiofiles.open(temp_path, mode="wb") as f:
+                            await f.write(byte_array)
+                        os.replace(temp_path, file_path)
+                    finally:
+                        temp_path.unlink(missing_ok=True)
+            else:
+                bucket_name = self._bucket_name(image_path)
+                if not await self.run_blocking(self._content_exists, bucket_name, image_path):
+                    await self.run_blocking(
+                        self._put_image, byte_array, bucket_name, image_path,
+                        metadata={"Cache-Control": IMMUTABLE_CACHE_CONTROL},
+                    )
+        except Exception as e:
+            logger.error(f"Failed to save image {image_path}: {e}")
+            raise
+
+        await image_refs.acquire(image_path)
+        logger.info(f"Image saved successfully to {image_path}")
+        return image_path
+
+    def _content_exists(self, bucket_name, object_name):
+        if bucket_name not in self._known_buckets and not self.minio_client.bucket_exists(bucket_name):
+            return False
+        return self.object_exists(bucket_name, object_name)
+
     def _sanitize_minio_path(self, path):
 
         sanitized_path = str(path).replace("\\", "/")  # Standardize separators
@@ -172,37 +240,47 @@ class ImageStorage:
         except Exception as e:
             logger.error(f"Failed to save image: {e}")
 
-    async def _save_image_minio(self, byte_array, bucket_name, minio_path):
-        bucket_name = bucket_name.replace("_", "-")
+    async def run_blocking(self, func, *args, **kwargs):
+        """
+        Run a blocking MinIO call on the storage thread pool, sized to stay
+        within the client's connection pool.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
 
-        try:
-            # Check if bucket exists and create it if necessary
-            if not self.minio_client.bucket_exists(bucket_name):
+    def ensure_bucket(self, bucket_name):
+        """
+        Create a bucket unless it is already known to exist (blocking).
+        """
+        if bucket_name in self._known_buckets:
+            return
+        if not self.minio_client.bucket_exists(bucket_name):
+            try:
                 self.minio_client.make_bucket(bucket_name)
                 logger.info(f"Bucket '{bucket_name}' created successfully.")
+            except S3Error as e:
+                # Another worker created it first
+                if e.code not in ("BucketAlreadyOwnedByYou", "BucketAlreadyExists"):
+                    raise
+        self._known_buckets.add(bucket_name)
+
+    def _put_image(self, byte_array, bucket_name, minio_path, metadata=None):
+        self.ensure_bucket(bucket_name)
+        self.minio_client.put_object(
+            bucket_name=bucket_name,
+            object_name=minio_path,
+            data=io.BytesIO(byte_array),
+            length=len(byte_array),
+            content_type="image/jpeg",
+            metadata=metadata
+        )
 
-            byte_stream = io.BytesIO(byte_array)
-
-            self.minio_client.put_object(
-                bucket_name=bucket_name,
-                object_name=minio_path,
-                data=byte_stream,
-                length=len(byte_array),
-                content_type="image/jpeg"
-            )
-
-
+    async def _save_image_minio(self, byte_array, bucket_name, minio_path):
+        try:
+            await self.run_blocking(self._put_image, byte_array, bucket_name, minio_path)
             logger.info(f"Image saved successfully to MinIO at {minio_path} in bucket '{bucket_name}'")
-
         except Exception as e:
             logger.error(f"Failed to save image to MinIO: {e}")
-            try:
-                # Cleanup only if bucket exists
-                if self.minio_client.bucket_exists(bucket_name):
-                    self.minio_client.remove_bucket(bucket_name)
-                    logger.warning(f"Bucket '{bucket_name}' removed after failure.")
-            except Exception as cleanup_error:
-                logger.error(f"Failed to clean up bucket '{bucket_name}': {cleanup_error}")
 
     def object_exists(self, bucket_name, object_name):
         try:
@@ -214,6 +292,35 @@ class ImageStorage:
             else:
                 raise
 
+    @contextmanager
+    def open_image(self, image_path):
+        """
+        Open a stored image for streaming reads (blocking; call from a worker
+        thread). Yields a readable file object, or None when it is missing.
+        """
+        if self.storage_backend == "hard":
+            file_path = Path(image_path)
+            if not file_path.exists():
+                yield None
+                return
+            with open(file_path, "rb") as image_file:
+                yield image_file
+        elif self.storage_backend == "minio":
+            bucket_name, object_name = self._parse_minio_path(image_path)
+            try:
+                response = self.minio_client.get_object(bucket_name, object_name)
+            except S3Error as e:
+                logger.warning(f"MinIO object not available: {object_name} in bucket {bucket_name}: {e}")
+                yield None
+                return
+            try:
+                yield response
+            finally:
+                response.close()
+                response.release_conn()
+        else:
+            raise ValueError("Unsupported storage backend")
+
     async def get_full_path(self, dir_path, expire_time=3600):
         """
         Returns the full path or MinIO download link based on the storage backend.
@@ -225,40 +332,89 @@ class ImageStorage:
         if dir_path is None:
             return None
 
-        dir_path = Path(dir_path)
-        if self.storage_backend == "hard":
-            return str(dir_path)
-        elif self.storage_backend == "minio":
-            try:
-                # Parse bucket name and object name from dir_path
-                bucket_name, object_name = self._parse_minio_path(dir_path)
-
-                if not isinstance(expire_time, int):
-                    raise ValueError("expire_time must be an integer.")
+        return (await self.get_full_paths([dir_path], expire_time))[0]
 
-                minio_path = self.minio_client.presigned_get_object(
-                    bucket_name=bucket_name,
-                    object_name=object_name,
-                    expires=datetime.timedelta(seconds=3600)
-                )
+    async def get_full_paths(self, dir_paths, expire_time=3600) -> list:
+        """
+        get_full_path for many images at once, in the same order (None stays
+        None). MinIO links still cached with enough time left are reused; the
+        rest are signed together in one worker thread instead of one by one
+        on the event loop.
+        """
+        if self.storage_backend == "hard":
+            return [str(Path(dir_path)) if dir_path is not None else None for dir_path in dir_paths]
+        elif self.storage_backend != "minio":
+            raise ValueError("Unsupported storage backend")
 
-                # Return the URL
-                return minio_path
+        if not isinstance(expire_time, int):
+            raise ValueError("expire_time must be an integer.")
+
+        keys = [self._sanitize_minio_path(dir_path) if dir_path is not None else None for dir_path in dir_paths]
+        urls, missing = {}, []
+        for key in keys:
+            if key is None or key in urls:
+                continue
+            urls[key] = self.url_cache.get(key)
+            if urls[key] is None:
+                missing.append(key)
+
+        if missing:
+            def sign(object_paths):
+                return [
+                    self.minio_client.presigned_get_object(
+                        *self._parse_minio_path(object_path),
+                        expires=datetime.timedelta(seconds=expire_time)
+                    )
+                    for object_path in object_paths
+                ]
 
+            try:
+                signed = await asyncio.to_thread(sign, missing)
             except Exception as e:
                 logger.error(f"Failed to generate presigned URL: {e}")
                 raise
-        else:
-            raise ValueError("Unsupported storage backend")
+            for key, url in zip(missing, signed):
+                self.url_cache.put(key, url, expire_time)
+                urls[key] = url
+
+        return [urls[key] if key is not None else None for key in keys]
+
+    async def resolve_image_urls(self, objects, *attributes) -> None:
+        """
+        Replace the given image attributes of each object with its full path
+        or MinIO link, signing the whole batch at once. Empty attributes are
+        left alone.
+        """
+        targets = [(obj, name) for obj in objects for name in attributes if getattr(obj, name)]
+        urls = await self.get_full_paths([getattr(obj, name) for obj, name in targets])
+        for (obj, name), url in zip(targets, urls):
+            setattr(obj, name, url)
+
+    def _bucket_name(self, object_name):
+        """
+        Bucket holding an object. The "typed" layout keeps one bucket per
+        image type, with camera and date in the object key
+        (plate_images/3/2024/01/02/05/image_x.jpg lives in {prefix}-plate-images).
+        The "legacy" layout made a bucket of the whole directory, i.e. one
+        per camera per hour.
+        """
+        if settings.MINIO_BUCKET_LAYOUT == "legacy":
+            return self.legacy_bucket_name(object_name)
+        return self.typed_bucket_name(object_name)
+
+    def typed_bucket_name(self, object_name):
+        image_type = object_name.split("/", 1)[0]
+        return f"{self.bucket_prefix}-{image_type}".replace("_", "-")
+
+    def legacy_bucket_name(self, object_name):
+        main_path = os.path.dirname(object_name)
+        bucket_name = main_path.replace("/", "-").replace("_", "-")
+        return f"{self.bucket_prefix}-{bucket_name}"
 
     def _parse_minio_path(self, file_path):
         try:
-            main_path = os.path.dirname(file_path)
-            bucket_name = main_path.replace("/", "-").replace("\\", "-")
-            bucket_name = bucket_name.replace("_", "-")
-            bucket_name = f"{self.bucket_prefix}-{bucket_name}"
             file_path = self._sanitize_minio_path(file_path)
-            return bucket_name, file_path
+            return self._bucket_name(file_path), file_path
         except ValueError:
             raise ValueError(f"Invalid MinIO path format: {file_path}")
 
@@ -269,10 +425,16 @@ class ImageStorage:
         Args:
             image_path (str): The path to the image (local path or MinIO object path).
 
+        Content-addressed images are only deleted once nothing else
+        references them.
+
         Raises:
             ValueError: If the storage backend is invalid.
             Exception: If the deletion fails.
         """
+        if is_content_addressed(image_path) and not await image_refs.release([image_path]):
+            return
+
         try:
             if self.storage_backend == "hard":
                 # Local storage deletion
@@ -287,6 +449,7 @@ class ImageStorage:
                 # MinIO storage deletion
                 bucket_name, object_name = self._parse_minio_path(image_path)
 
+                self.url_cache.discard(self._sanitize_minio_path(image_path))
                 if self.object_exists(bucket_name, object_name):
                     self.minio_client.remove_object(bucket_name, object_name)
                     logger.info(f"Deleted MinIO object: {object_name} from bucket {bucket_name}")
@@ -300,6 +463,55 @@ class ImageStorage:
             logger.error(f"Failed to delete image: {e}")
             raise Exception(f"Failed to delete image: {e}")
 
+    async def delete_images(self, image_paths) -> list[str]:
+        """
+        Delete many images concurrently: parallel unlinks for local storage,
+        one batched remove_objects call per bucket for MinIO.
+        Returns the error messages of the images that could not be removed.
+        Content-addressed images still referenced elsewhere are kept.
+        """
+        image_paths = [path for path in image_paths if path]
+        shared = [path for path in image_paths if is_content_addressed(path)]
+        if shared:
+            unreferenced = await image_refs.release(shared)
+            image_paths = [path for path in image_paths if not is_content_addressed(path)] + unreferenced
+        if not image_paths:
+            return []
+
+        if self.storage_backend == "hard":
+            def unlink(path):
+                try:
+                    Path(path).unlink(missing_ok=True)
+                except OSError as e:
+                    return f"{path}: {e}"
+
+            results = await asyncio.gather(*(asyncio.to_thread(unlink, path) for path in image_paths))
+            return [error for error in results if error]
+
+        elif self.storage_backend == "minio":
+            objects_by_bucket = defaultdict(list)
+            for path in image_paths:
+                bucket_name, object_name = self._parse_minio_path(path)
+                objects_by_bucket[bucket_name].append(DeleteObject(object_name))
+
+            def remove(bucket_name, objects):
+                try:
+                    # remove_objects is lazy; iterating it performs the deletes
+                    return [
+                        f"{bucket_name}/{error.name}: {error.message}"
+                        for error in self.minio_client.remove_objects(bucket_name, objects)
+                    ]
+                except S3Error as e:
+                    return [f"{bucket_name}: {e}"]
+
+            results = await asyncio.gather(*(
+                asyncio.to_thread(remove, bucket_name, objects)
+                for bucket_name, objects in objects_by_bucket.items()
+            ))
+            return [error for errors in results for error in errors]
+
+        else:
+            raise ValueError(f"Unsupported storage backend: {self.storage_backend}")
 
 
 
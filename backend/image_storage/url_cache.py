@@ -0,0 +1,36 @@
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+class PresignedUrlCache:
+    """
+    LRU of presigned MinIO links keyed by object path. A link is handed out
+    again only while it stays valid for at least min_remaining seconds, so a
+    page (or a cached response embedding it) never gets a link that is about
+    to expire.
+    """
+    def __init__(self, max_size: int = 10000, min_remaining: int = 900) -> None:
+        self.max_size = max_size
+        self.min_remaining = min_remaining
+        self._urls: OrderedDict[str, tuple[str, float]] = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._urls.get(key)
+        if entry is None:
+            return None
+        url, expires_at = entry
+        if expires_at - time.monotonic() < self.min_remaining:
+            del self._urls[key]
+            return None
+        self._urls.move_to_end(key)
+        return url
+
+    def put(self, key: str, url: str, expire_time: int) -> None:
+        self._urls[key] = (url, time.monotonic() + expire_time)
+        self._urls.move_to_end(key)
+        while len(self._urls) > self.max_size:
+            self._urls.popitem(last=False)
+
+    def discard(self, key: str) -> None:
+        self._urls.pop(key, None)
@@ -6,6 +6,9 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from utils.recording_processor import process_scheduled_recordings
 
 from database.engine import async_session, engine, ensure_tables_exist
+from database.partitions import ensure_traffic_partitions, maintain_traffic_partitions
+from utils.traffic_export import cleanup_expired_exports
+from utils.traffic_purge import resume_traffic_purges
 from utils.db_utils import create_default_admin, initialize_defaults
 from socket_managment_nats_ import connect_to_nats, heartbeatManager
 from search_service.search_config import (
@@ -16,7 +19,10 @@ from search_service.search_config import (
     guest_search, vehicle_search
 )
 from redis_cache import redis_cache
+from auth.principal import principal_cache
+from utils.invalidation_bus import invalidation_bus
 from utils.middlewares import security_middleware
+from logging_package.logging_script import start_log_shipping, stop_log_shipping
 
 
 async def initialize_search_services():
@@ -35,9 +41,14 @@ async def initialize_search_services():
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("[INFO] Starting lifespan")
+    start_log_shipping()
+
+    # Principals are cached per worker; writes from any process evict them
+    invalidation_bus.register(principal_cache.invalidate)
 
     await redis_cache.init_cache()
     await ensure_tables_exist()
+    await ensure_traffic_partitions()
     await initialize_search_services()
 
     # Initialize database
@@ -49,6 +60,9 @@ async def lifespan(app: FastAPI):
     # Setup Redis for SecurityMiddleware
     await security_middleware.setup_redis()
 
+    # Pick up traffic purges interrupted by a restart
+    await resume_traffic_purges()
+
     # Start NATS connection
     nats_task = asyncio.create_task(connect_to_nats())
 
@@ -56,6 +70,8 @@ async def lifespan(app: FastAPI):
     scheduler = AsyncIOScheduler()
     scheduler.add_job(process_scheduled_recordings, "interval", seconds=60)
     scheduler.add_job(heartbeatManager.check_disconnected_clients, "interval", seconds=120)
+    scheduler.add_job(maintain_traffic_partitions, "interval", hours=24)
+    scheduler.add_job(cleanup_expired_exports, "interval", hours=1)
     scheduler.start()
 
     try:
@@ -69,3 +85,4 @@ async def lifespan(app: FastAPI):
         await engine.dispose()
         print("[INFO] Database connection closed")
         print("[INFO] Lifespan ended")
+        await stop_log_shipping()
@@ -1,5 +1,7 @@
 import logging
 import os
+import json
+import queue
 import asyncio
 from dotenv import load_dotenv
 import httpx
@@ -73,7 +75,7 @@ def setup_logging():
                 "()": AsyncLoggingHandler,
                 "backend": "loki",
                 "hosts": [os.getenv("LOKI_URL", "http://localhost:3100")],
-                "labels": '{job="application"}',
+                "labels": {"job": "application"},
                 "formatter": "json",
                 "level": "INFO",
                 "filters": ["sensitive_data", "slow_operations"],
@@ -107,70 +109,173 @@ def setup_logging():
 
 
 class AsyncLoggingHandler(logging.Handler):
-    """Unified asynchronous logging handler for Elasticsearch, Loki, and Splunk."""
+    """
+    Unified batched logging handler for Elasticsearch, Loki, and Splunk.
 
-    def __init__(self, backend, hosts, index=None, auth=None, auth_token=None, labels=None):
+    emit() only formats the record and puts it on a bounded queue; a
+    background task started from the application lifespan drains the queue
+    and ships batches (Elasticsearch _bulk, one Loki push, concatenated
+    Splunk HEC events). When the queue is full new records are dropped and
+    counted instead of blocking the caller.
+    """
+    instances = []
+
+    def __init__(self, backend, hosts, index=None, auth=None, auth_token=None, labels=None,
+                 queue_size=10000, batch_size=500, flush_interval=1.0):
         """
         :param backend: Logging backend ('elasticsearch', 'loki', 'splunk').
-        :param hosts: List of host URLs (e.g., ['http://localhost:9200']).
+        :param hosts: List of host URLs or a comma separated string.
         :param index: For Elasticsearch, the index name (e.g., 'application_logs').
         :param auth: (username, password) tuple for basic authentication.
         :param auth_token: Token for Splunk HEC.
-        :param labels: For Loki, the label set (e.g., '{job="application"}').
+        :param labels: For Loki, the stream labels (e.g., {"job": "application"}).
+        :param queue_size: Maximum number of records waiting to be shipped.
+        :param batch_size: Maximum number of records per request.
+        :param flush_interval: Seconds between queue drains.
         """
         super().__init__()
         self.backend = backend
-        self.hosts = hosts
+        self.hosts = [host.strip() for host in hosts.split(",")] if isinstance(hosts, str) else hosts
         self.index = index
         self.auth = auth
         self.auth_token = auth_token
-        self.labels = labels
-        self.client = httpx.AsyncClient()
+        self.labels = labels or {}
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.client = None
+        self.task = None
+        AsyncLoggingHandler.instances.append(self)
 
-    async def emit(self, record):
-        """Dispatch logs to the appropriate backend."""
-        log_entry = self.format(record)
+    def emit(self, record):
+        """Queue the formatted record; never blocks and never does I/O."""
         try:
-            if self.backend == "elasticsearch":
-                await self._send_to_elasticsearch(log_entry)
-            elif self.backend == "loki":
-                await self._send_to_loki(log_entry, record)
-            elif self.backend == "splunk":
-                await self._send_to_splunk(log_entry)
-            else:
-                print(f"Unsupported backend: {self.backend}")
-        except Exception as e:
-            print(f"Failed to send log to {self.backend}: {e}")
-
-    async def _send_to_elasticsearch(self, log_entry):
-        """Send logs to Elasticsearch."""
+            self.queue.put_nowait((record.created, self.format(record)))
+        except queue.Full:
+            self.dropped += 1
+        except Exception:
+            self.handleError(record)
+
+    def start(self):
+        """Start the background shipper on the running event loop."""
+        if self.task is None:
+            self.client = httpx.AsyncClient(timeout=10.0)
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the shipper and flush whatever is still queued."""
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        if self.client is not None:
+            await self.flush()
+            await self.client.aclose()
+            self.client = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def _take_batch(self):
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    async def flush(self):
+        """Ship everything currently queued, one batch per request."""
+        if self.dropped:
+            print(f"Log queue full, dropped {self.dropped} records for {self.backend}")
+            self.dropped = 0
+        batch = self._take_batch()
+        while batch:
+            try:
+                if self.backend == "elasticsearch":
+                    await self._send_to_elasticsearch(batch)
+                elif self.backend == "loki":
+                    await self._send_to_loki(batch)
+                elif self.backend == "splunk":
+                    await self._send_to_splunk(batch)
+                else:
+                    print(f"Unsupported backend: {self.backend}")
+            except Exception as e:
+                print(f"Failed to send {len(batch)} logs to {self.backend}: {e}")
+            batch = self._take_batch()
+
+    async def _send_to_elasticsearch(self, batch):
+        """Send logs to Elasticsearch with a single _bulk request."""
         if not self.index:
             raise ValueError("Elasticsearch requires an index name.")
-        url = f"{self.hosts[0]}/{self.index}/_doc"
-        payload = {"message": log_entry, "level": "INFO"}
-        await self.client.post(url, json=payload, auth=self.auth)
+        url = f"{self.hosts[0]}/_bulk"
+        action = json.dumps({"index": {"_index": self.index}})
+        lines = []
+        for _, log_entry in batch:
+            lines.append(action)
+            lines.append(json.dumps({"message": log_entry, "level": "INFO"}))
+        response = await self.client.post(
+            url,
+            content="\n".join(lines) + "\n",
+            headers={"Content-Type": "application/x-ndjson"},
+            auth=self.auth,
+        )
+        response.raise_for_status()
 
-    async def _send_to_loki(self, log_entry, record):
-        """Send logs to Loki."""
+    async def _send_to_loki(self, batch):
+        """Send logs to Loki as one stream push."""
         url = f"{self.hosts[0]}/loki/api/v1/push"
         payload = {
             "streams": [
                 {
-                    "labels": self.labels,
-                    "entries": [{"ts": str(int(record.created * 1e9)), "line": log_entry}],
+                    "stream": self.labels,
+                    "values": [[str(int(created * 1e9)), log_entry] for created, log_entry in batch],
                 }
             ]
         }
-        await self.client.post(url, json=payload)
+        response = await self.client.post(url, json=payload)
+        response.raise_for_status()
 
-    async def _send_to_splunk(self, log_entry):
-        """Send logs to Splunk."""
+    async def _send_to_splunk(self, batch):
+        """Send logs to Splunk HEC as concatenated events."""
         if not self.auth_token:
             raise ValueError("Splunk requires an authentication token.")
         url = self.hosts[0]
         headers = {"Authorization": f"Splunk {self.auth_token}"}
-        payload = {"event": log_entry}
-        await self.client.post(url, json=payload, headers=headers)
+        content = "".join(
+            json.dumps({"time": created, "event": log_entry}) for created, log_entry in batch
+        )
+        response = await self.client.post(url, content=content, headers=headers)
+        response.raise_for_status()
+
+
+def _active_handlers():
+    """Remote handlers that are actually attached to a logger."""
+    loggers = [logging.getLogger()] + [
+        item for item in logging.Logger.manager.loggerDict.values()
+        if isinstance(item, logging.Logger)
+    ]
+    attached = {id(handler) for log in loggers for handler in log.handlers}
+    return [handler for handler in AsyncLoggingHandler.instances if id(handler) in attached]
+
+
+def start_log_shipping():
+    """Start the background shippers of all configured remote handlers."""
+    for handler in _active_handlers():
+        handler.start()
+
+
+async def stop_log_shipping():
+    """Flush and stop the background shippers."""
+    for handler in AsyncLoggingHandler.instances:
+        await handler.stop()
 
 
 class SensitiveDataFilter(logging.Filter):
@@ -1,71 +1,104 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from fastapi.security.utils import get_authorization_scheme_param
-
-from database.engine import get_db
-from auth.authorization import get_current_user
-from logging_package.user_logging import get_user_from_token
+from starlette.datastructures import Headers
+from urllib.parse import parse_qsl
 import logging
+import random
 import time
 import uuid
 import json
 
+from settings import settings
+
 logger = logging.getLogger("api_logs")
 
-class CentralizedLoggingMiddleware(BaseHTTPMiddleware):
+class CentralizedLoggingMiddleware:
+    """
+    Pure ASGI request logging. Request bodies are streamed through untouched;
+    only the first MAX_CAPTURED_BODY bytes of sampled JSON bodies are kept for
+    the log record. The user is taken from the principal that the auth
+    dependency stores on the request state, so no extra DB lookup is done.
+    """
     SENSITIVE_KEYS = {"password", "api_key", "token"}
     SLOW_REQUEST_THRESHOLD = 2.0  # Threshold for slow requests in seconds
     MAX_PAYLOAD_SIZE = 1024 * 1024  # 1MB
+    CAPTURED_CONTENT_TYPES = ("application/json",)
 
     def __init__(self, app, api_prefix: str = "/v1/"):
-        super().__init__(app)
+        self.app = app
         self.api_prefix = api_prefix
+        self.max_captured_body = settings.LOG_MAX_CAPTURED_BODY
+        self.body_sample_rate = settings.LOG_BODY_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.api_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        # Generate a correlation ID for the request
+        correlation_id = str(uuid.uuid4())
+        state = scope.setdefault("state", {})
+        state["correlation_id"] = correlation_id
+
+        start_time = time.time()
+        headers = Headers(scope=scope)
+        method = scope["method"]
+        path = scope["path"]
+        action = self.infer_action(method, path)
+
+        content_type = headers.get("content-type", "")
+        capture_body = (
+            self.max_captured_body > 0
+            and content_type.startswith(self.CAPTURED_CONTENT_TYPES)
+            and random.random() < self.body_sample_rate
+        )
+        captured = bytearray()
+        request_size = 0
+        response_status = 500
+        response_size = 0
+
+        async def receive_wrapper():
+            nonlocal request_size
+            message = await receive()
+            if message["type"] == "http.request":
+                chunk = message.get("body", b"")
+                request_size += len(chunk)
+                if capture_body and len(captured) < self.max_captured_body:
+                    captured.extend(chunk[:self.max_captured_body - len(captured)])
+            return message
+
+        async def send_wrapper(message):
+            nonlocal response_status, response_size
+            if message["type"] == "http.response.start":
+                response_status = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
 
-    async def dispatch(self, request: Request, call_next):
-        if request.url.path.startswith(self.api_prefix):
-            # Generate a correlation ID for the request
-            correlation_id = str(uuid.uuid4())
-            request.state.correlation_id = correlation_id
-
-            start_time = time.time()
-            user_info = {"username": "Anonymous", "id": None}
-            action = self.infer_action(request)
-
-            # Extract user information from the token, if available
-            auth_header = request.headers.get("Authorization")
-            if auth_header:
-                scheme, token = get_authorization_scheme_param(auth_header)
-                if scheme.lower() == "bearer" and token:
-                    db_generator = get_db()
-                    try:
-                        db_session = await db_generator.__anext__()
-                        user = await get_user_from_token(token, db_session)
-                        if user:
-                            user_info = {"username": user.username, "id": user.id}
-                    except Exception as e:
-                        logger.error(f"[{correlation_id}] Error retrieving user: {e}", exc_info=True)
-
-            # Log the incoming request
-            await self.log_request(request, user_info, action, correlation_id)
-
-            try:
-                # Call the next middleware or route handler
-                response = await call_next(request)
-                response_status = response.status_code
-            except Exception as e:
-                response_status = 500
-                logger.error(f"[{correlation_id}] Unhandled exception: {e}", exc_info=True)
-                raise
-
-            # Log the response details
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        except Exception as e:
+            response_status = 500
+            logger.error(f"[{correlation_id}] Unhandled exception: {e}", exc_info=True)
+            raise
+        finally:
             duration = time.time() - start_time
+            client = scope.get("client")
+            client_ip = client[0] if client else None
+            user_info = self.get_user_info(state.get("principal"))
+            payload = self.describe_body(captured, request_size, capture_body)
+            query_params = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
 
             # Create log record with additional context
-            message = f"{request.method} {request.url.path} - {response_status}"
+            message = (
+                f"[{correlation_id}] {user_info} performed action: {action} "
+                f"with query params: {query_params}, payload: {payload}, "
+                f"status={response_status}, request size: {request_size} bytes, "
+                f"response size: {response_size} bytes, duration={duration:.2f}s "
+                f"(User-Agent: {headers.get('user-agent', 'Unknown User-Agent')}, IP: {client_ip})"
+            )
             record = logging.LogRecord(
                 name="api_logs",
                 level=logging.INFO,
-                pathname=request.url.path,
+                pathname=path,
                 lineno=0,
                 msg=message,
                 args=(),
@@ -74,88 +107,58 @@ class CentralizedLoggingMiddleware(BaseHTTPMiddleware):
 
             # Add custom properties
             record.correlation_id = correlation_id
-            record.method = request.method
-            record.path = str(request.url.path)
+            record.method = method
+            record.path = path
             record.status_code = response_status
             record.duration = duration
-            record.client_ip = request.client.host if request.client else None
-            record.user = {
-                "username": user_info["username"],
-                "id": user_info["id"]
-            }
+            record.client_ip = client_ip
+            record.user = user_info
             record.action = action
-
-            # Send to OpenSearch
             logger.handle(record)
 
-            return response
-        else:
-            return await call_next(request)
-
+            if request_size > self.MAX_PAYLOAD_SIZE:
+                logger.warning(f"[{correlation_id}] Large request payload: {request_size} bytes")
+            if response_size > self.MAX_PAYLOAD_SIZE:
+                logger.warning(f"[{correlation_id}] Large response payload: {response_size} bytes")
+            if duration > self.SLOW_REQUEST_THRESHOLD:
+                logger.warning(f"[{correlation_id}] Slow request: {duration:.2f}s for {action}")
 
     @staticmethod
-    def infer_action(request: Request) -> str:
+    def infer_action(method: str, path: str) -> str:
         """Determine the action type based on the HTTP method and URL path."""
-        if "/login" in request.url.path and request.method == "POST":
+        if "/login" in path and method == "POST":
             return "Login"
-        if "/change-password" in request.url.path and request.method == "PUT":
+        if "/change-password" in path and method == "PUT":
             return "Change Password"
-        if request.method == "POST":
-            return f"Creating resource at {request.url.path}"
-        elif request.method == "PUT":
-            return f"Updating resource at {request.url.path}"
-        elif request.method == "DELETE":
-            return f"Deleting resource at {request.url.path}"
-        elif request.method == "GET":
-            return f"Fetching resource from {request.url.path}"
+        if method == "POST":
+            return f"Creating resource at {path}"
+        elif method == "PUT":
+            return f"Updating resource at {path}"
+        elif method == "DELETE":
+            return f"Deleting resource at {path}"
+        elif method == "GET":
+            return f"Fetching resource from {path}"
         return "Unknown action"
 
-    async def log_request(self, request: Request, user_info: dict, action: str, correlation_id: str):
-        """Log details of the incoming request, masking sensitive data."""
-        client_details = self.get_client_details(request)
-        query_params = dict(request.query_params)
-        try:
-            body = await self.get_request_body(request)
-            masked_body = self.mask_sensitive_data(body)
-            request_size = len(json.dumps(masked_body).encode("utf-8"))
-            logger.info(
-                f"[{correlation_id}] {user_info} is performing action: {action} "
-                f"with query params: {query_params}, payload: {masked_body}, size: {request_size} bytes {client_details}"
-            )
-            if request_size > self.MAX_PAYLOAD_SIZE:
-                logger.warning(f"[{correlation_id}] Large request payload: {request_size} bytes")
-        except Exception:
-            logger.warning(f"[{correlation_id}] Failed to parse request payload {client_details}")
-
-    def log_response(self, request: Request, response, user_info: str, action: str, correlation_id: str, duration: float, response_status: int):
-        """Log details of the response."""
-        client_details = f"from IP {request.client.host}"
-        response_size = len(response.body) if hasattr(response, "body") else 0
-        logger.info(
-            f"[{correlation_id}] {user_info} completed action: {action} "
-            f"Response: status={response_status}, size: {response_size} bytes, duration={duration:.2f}s {client_details}"
-        )
-        if response_size > self.MAX_PAYLOAD_SIZE:
-            logger.warning(f"[{correlation_id}] Large response payload: {response_size} bytes")
-        if duration > self.SLOW_REQUEST_THRESHOLD:
-            logger.warning(f"[{correlation_id}] Slow request: {duration:.2f}s for {action}")
-
-    @staticmethod
-    def get_client_details(request: Request) -> str:
-        """Retrieve client User-Agent and IP address."""
-        user_agent = request.headers.get("User-Agent", "Unknown User-Agent")
-        client_ip = request.client.host
-        return f"(User-Agent: {user_agent}, IP: {client_ip})"
-
     @staticmethod
-    async def get_request_body(request: Request) -> dict:
-        """Retrieve and cache the request body as a dictionary."""
-        if not hasattr(request.state, "cached_body"):
-            request.state.cached_body = await request.body()
-        try:
-            return json.loads(request.state.cached_body.decode("utf-8"))
-        except json.JSONDecodeError:
+    def get_user_info(principal) -> dict:
+        """Build the user part of the log record from the request principal."""
+        if principal is None:
+            return {"username": "Anonymous", "id": None}
+        return {"username": principal.personal_number, "id": principal.id}
+
+    def describe_body(self, captured: bytearray, request_size: int, capture_body: bool):
+        """Return the masked captured body, or a short note when it was not kept."""
+        if not request_size:
             return {}
+        if not capture_body:
+            return "<not captured>"
+        if request_size > len(captured):
+            return f"<truncated, {request_size} bytes>"
+        try:
+            return self.mask_sensitive_data(json.loads(captured.decode("utf-8")))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            return "<unparsed>"
 
     def mask_sensitive_data(self, data: dict) -> dict:
         """Recursively mask sensitive fields in the data."""
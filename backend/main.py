@@ -4,7 +4,6 @@ import socketio
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
 from pathlib import Path
 
 from logging_package.logging_script import logging_main
@@ -27,7 +26,13 @@ from router.traffic import traffic_router
 from router.record import record_router
 from router.search import search_router
 from router.camerapolygon import polygon_router
-from utils.middlewares import security_middleware
+from router.cache import cache_router
+from utils.middlewares import RateLimitMiddleware, security_middleware
+from utils.query_counter import QueryCountMiddleware, install_query_counter
+from utils.compression import CompressionMiddleware
+from utils.static_files import ImageStaticFiles
+from database.engine import engine
+from settings import settings
 
 logging_main()
 logger = logging.getLogger("api_logs")
@@ -38,7 +43,11 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-app.add_middleware(BaseHTTPMiddleware, dispatch=security_middleware)
+if settings.QUERY_COUNT_HEADER:
+    install_query_counter(engine)
+    app.add_middleware(QueryCountMiddleware)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(RateLimitMiddleware, limiter=security_middleware)
 app.add_middleware(CentralizedLoggingMiddleware)
 app.add_middleware(
     CORSMiddleware,
@@ -65,11 +74,11 @@ CRUD_IMAGE_DIR = BASE_UPLOAD_DIR / "crud_images"
 CRUD_IMAGE_DIR.mkdir(parents=True, exist_ok=True)
 
 # Serve static files for profile and plate images
-app.mount("/uploads/profile_images", StaticFiles(directory=str(PROFILE_IMAGE_DIR)), name="profile_images")
-app.mount("/uploads/car_images", StaticFiles(directory=str(CAR_IMAGE_DIR)), name="car_images")
-app.mount("/uploads/plate_images", StaticFiles(directory=str(PLATE_IMAGE_DIR)), name="plate_images")
-app.mount("/uploads/traffic_images", StaticFiles(directory=str(TRAFFIC_IMAGE_DIR)), name="traffic_images")
-app.mount("/uploads/crud_images", StaticFiles(directory=str(CRUD_IMAGE_DIR)), name="crud_images")
+app.mount("/uploads/profile_images", ImageStaticFiles(directory=str(PROFILE_IMAGE_DIR)), name="profile_images")
+app.mount("/uploads/car_images", ImageStaticFiles(directory=str(CAR_IMAGE_DIR)), name="car_images")
+app.mount("/uploads/plate_images", ImageStaticFiles(directory=str(PLATE_IMAGE_DIR)), name="plate_images")
+app.mount("/uploads/traffic_images", ImageStaticFiles(directory=str(TRAFFIC_IMAGE_DIR)), name="traffic_images")
+app.mount("/uploads/crud_images", ImageStaticFiles(directory=str(CRUD_IMAGE_DIR)), name="crud_images")
 app.mount("/uploads/recordings", StaticFiles(directory=str(RECORDINGS_DIR)), name="recordings")
 app.mount("/uploads/zips", StaticFiles(directory=str(ZIP_FILE_DIR)), name="zips")
 
@@ -89,6 +98,7 @@ include_router(app, vehicle_router)
 include_router(app, traffic_router)
 include_router(app, record_router)
 include_router(app, search_router)
+include_router(app, cache_router)
 
 @app.get("/")
 async def root():
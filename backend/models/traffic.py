@@ -1,22 +1,58 @@
-from sqlalchemy import Column, String, Integer, Float,ForeignKey, DateTime, Boolean, func
+from sqlalchemy import Column, String, Integer, Float,ForeignKey, DateTime, Boolean, Index, func
 
 from database.engine import Base
 
 
 class DBTraffic(Base):
     __tablename__ = "traffics"
+    __table_args__ = (
+        # Supports keyset pagination ordered by (timestamp, id)
+        Index("ix_traffics_timestamp_id", "timestamp", "id"),
+        # Cheap range index, inherited by every monthly partition
+        Index("ix_traffics_timestamp_brin", "timestamp", postgresql_using="brin"),
+        # Partial/wildcard plate lookups (LIKE on the canonical key, needs pg_trgm)
+        Index(
+            "ix_traffics_plate_key_trgm", "plate_key",
+            postgresql_using="gin", postgresql_ops={"plate_key": "gin_trgm_ops"},
+        ),
+        # Monthly partitions are managed by database.partitions
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    # The partition key has to be part of the primary key
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     prefix_2 = Column(String(2), nullable=False)
     alpha = Column(String(1), nullable=False)
     mid_3 = Column(String(3), nullable=False)
     suffix_2 = Column(String(2), nullable=False)
     plate_number = Column(String, index=True, nullable=False)
-    timestamp = Column(DateTime, default=func.now())
+    # prefix_2 + alpha + mid_3 + suffix_2, normalized at ingest (utils.plates)
+    plate_key = Column(String(8), index=True, nullable=True)
+    timestamp = Column(DateTime, primary_key=True, nullable=False, default=func.now())
     ocr_accuracy = Column(Float, nullable=True)
     vision_speed = Column(Float, nullable=True)
+    # Ids are used for filtering and joins; names are kept for display
+    camera_id = Column(Integer, ForeignKey("cameras.id", ondelete="SET NULL"), index=True, nullable=True)
+    gate_id = Column(Integer, ForeignKey("gates.id", ondelete="SET NULL"), index=True, nullable=True)
     camera_name = Column(String, index=True)
     gate_name = Column(String, index=True)
     plate_image = Column(String, nullable=True)
     full_image = Column(String, nullable=True)
     access_granted = Column(Boolean, nullable=True)
+
+
+class DBTrafficHourlyStat(Base):
+    """
+    Traffic counts per hour, gate, camera and access outcome, kept up to date
+    at ingest so statistics never have to scan traffics.
+    """
+    __tablename__ = "traffic_hourly_stats"
+    __table_args__ = (
+        Index("ix_traffic_hourly_stats_gate_bucket", "gate_id", "bucket"),
+    )
+
+    bucket = Column(DateTime, primary_key=True)
+    gate_id = Column(Integer, ForeignKey("gates.id", ondelete="CASCADE"), primary_key=True)
+    camera_id = Column(Integer, ForeignKey("cameras.id", ondelete="CASCADE"), primary_key=True)
+    access_granted = Column(Boolean, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
@@ -27,6 +27,7 @@ from schema.traffic import TrafficCreate
 from models.record import DBRecord
 from models.lpr import DBLpr
 from image_storage.storage_management import StorageFactory
+from nats_consumer.owner_cache import OwnerCache
 
 
 # Get the root directory of the project
@@ -130,7 +131,13 @@ async def crud_image(message: Msg):
                     setting.value = str(image.shape[0])  # Update image height setting
                     db_session.add(setting)
 
-            await db_session.commit()
+            try:
+                await db_session.commit()
+            except Exception:
+                await db_session.rollback()
+                # The camera keeps its old image: drop the new one's reference
+                await storagefactory.delete_images([crud_image_path])
+                raise
             await db_session.refresh(db_camera)
 
             logger.info(f"Camera with ID {camera_id} updated with new image path.")
@@ -443,6 +450,28 @@ async def handle_heartbeat(message: dict, emit_to_requested_sids) -> None:
         print(f"[ERROR] Failed to handle heartbeat message: {e}")
 
 
+owner_cache = OwnerCache(ttl=settings.OWNER_CACHE_TTL)
+
+
+async def _lookup_owner(session, plate_number: str) -> dict:
+    """
+    Name and type of the user or guest a plate is registered to (all None
+    for unknown plates).
+    """
+    db_vehicle = await VehicleOperation(session).get_one_vehcile_plate(plate_number)
+    if not db_vehicle:
+        return {"first_name": None, "last_name": None, "user_type": None}
+    if db_vehicle.owner_id:
+        db_owner = await UserOperation(session).get_one_object_id(db_vehicle.owner_id)
+    else:
+        db_owner = await GuestOperation(session).get_one_object_id(db_vehicle.guest_id)
+    return {
+        "first_name": db_owner.first_name,
+        "last_name": db_owner.last_name,
+        "user_type": db_owner.user_type,
+    }
+
+
 async def handle_plates_data(msg: Msg, nats_client: NATS) -> None:
     """
     Handle plates_data messages from JetStream.
@@ -463,6 +492,8 @@ async def handle_plates_data(msg: Msg, nats_client: NATS) -> None:
         upload_timestamp = datetime.datetime.strptime(timestamp, '%Y-%m-%dT%H:%M:%S.%fZ')
 
         # save_plates_data_to_db.delay(camera_id, timestamp, cars)
+        stroragefactory = StorageFactory.get_instance(settings.STORAGE_BACKEND)
+        saved_images = []
         try:
             batch = []
             for car in cars:
@@ -479,9 +510,10 @@ async def handle_plates_data(msg: Msg, nats_client: NATS) -> None:
 
                 prefix_2, alpha, mid_3, suffix_2 = match.groups()
 
-                stroragefactory = StorageFactory.get_instance(settings.STORAGE_BACKEND)
                 plate_image = await stroragefactory.save_image("plate_images", plate_image_array, camera_id=camera_id,timestamp=upload_timestamp)
+                saved_images.append(plate_image)
                 full_image = await stroragefactory.save_image("traffic_images", full_image_array, camera_id=camera_id,timestamp=upload_timestamp)
+                saved_images.append(full_image)
 
                 # Create a TrafficCreate object
                 traffic_data = TrafficCreate(
@@ -499,30 +531,24 @@ async def handle_plates_data(msg: Msg, nats_client: NATS) -> None:
                 )
 
                 # Enqueue the traffic data for batch processing
-                batch.append(traffic_data)
+                batch.append((traffic_data, [plate_image, full_image]))
             print(f"[INFO] Enqueued {len(cars)} traffic records for batch processing.")
             if batch:
                 async with nats_session() as session:
                     traffic_operation = TrafficOperation(session)
                     try:
-                        for traffic_data in batch:
-                            db_vehicle = await VehicleOperation(session).get_one_vehcile_plate(traffic_data.plate_number)
-                            if db_vehicle:
-                                if db_vehicle.owner_id:
-                                    db_owner = await UserOperation(session).get_one_object_id(db_vehicle.owner_id)
-                                    first_name = db_owner.first_name
-                                    last_name = db_owner.last_name
-                                    user_type = db_owner.user_type
-                                else:
-                                    db_guest = await GuestOperation(session).get_one_object_id(db_vehicle.guest_id)
-                                    first_name = db_guest.first_name
-                                    last_name = db_guest.last_name
-                                    user_type = db_guest.user_type
-                            else:
-                                first_name = None
-                                last_name = None
-                                user_type = None
+                        for traffic_data, row_images in batch:
+                            owner_data = owner_cache.get(traffic_data.plate_number)
+                            if owner_data is None:
+                                owner_data = await _lookup_owner(session, traffic_data.plate_number)
+                                owner_cache.set(traffic_data.plate_number, owner_data)
+                            first_name = owner_data["first_name"]
+                            last_name = owner_data["last_name"]
+                            user_type = owner_data["user_type"]
                             await traffic_operation.create_traffic(traffic_data)
+                            # create_traffic commits each row: its images are now referenced
+                            for image_path in row_images:
+                                saved_images.remove(image_path)
                         await session.commit()
                         print(f"[INFO] Successfully stored {len(batch)} traffic records.")
                     except Exception as e:
@@ -532,6 +558,9 @@ async def handle_plates_data(msg: Msg, nats_client: NATS) -> None:
                         await session.close()
         except Exception as e:
             print(f"[ERROR] Failed to handle plates data: {e}")
+        # Images of records that were not stored: drop their references
+        if saved_images:
+            await stroragefactory.delete_images(saved_images)
 
         socketio_message = {
             "messageType": "plates_data",
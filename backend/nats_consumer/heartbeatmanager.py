@@ -1,6 +1,5 @@
 import uuid
 from redis import asyncio as aioredis
-import json
 import time
 import asyncio
 
@@ -63,7 +62,7 @@ class HeartbeatManager:
                     # Emit the message using emit_to_requested_sids
                     await self.emit_to_requested_sids(
                         event_name="heartbeat",  # Event name
-                        data=json.dumps(heartbeat_message).encode(),  # Data
+                        data=heartbeat_message,  # Data
                         camera_id=None  # Optionally pass camera_id if required
                     )
 
@@ -0,0 +1,43 @@
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+class OwnerCache:
+    """
+    In-memory plate -> owner data for plates_data, so repeated sightings of
+    the same vehicle skip the vehicle/user/guest lookups. Entries expire after
+    `ttl` seconds and are dropped early when the invalidation bus reports a
+    write to one of the owner tables.
+    """
+    TABLES = ("vehicles", "users", "guests")
+
+    def __init__(self, ttl: int = 300, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # plate_number -> (expires_at, owner_data)
+
+    def get(self, plate_number: str) -> Optional[dict]:
+        entry = self.entries.get(plate_number)
+        if entry is None:
+            return None
+        expires_at, owner_data = entry
+        if expires_at <= time.monotonic():
+            self.entries.pop(plate_number, None)
+            return None
+        self.entries.move_to_end(plate_number)
+        return owner_data
+
+    def set(self, plate_number: str, owner_data: dict) -> None:
+        self.entries[plate_number] = (time.monotonic() + self.ttl, owner_data)
+        self.entries.move_to_end(plate_number)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, table_name: str, object_id: Optional[int] = None) -> None:
+        """
+        Invalidation bus handler: any write to an owner table may change the
+        owner of a cached plate, so the whole map is dropped.
+        """
+        if table_name in self.TABLES:
+            self.entries.clear()
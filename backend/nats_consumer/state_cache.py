@@ -0,0 +1,62 @@
+from collections import deque
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class StateCache:
+    """
+    In-memory last-known state per camera/LPR, replayed to a socket client
+    right after it subscribes so dashboards don't wait for the next event.
+    """
+    LATEST_ONLY_EVENTS = ("heartbeat", "camera_connection", "resources")
+    HISTORY_EVENTS = ("plates_data",)
+
+    def __init__(self, plate_history_size: int = 20):
+        self.plate_history_size = plate_history_size
+        self.latest_state = {}  # (event_name, key) -> last payload
+        self.history_state = {}  # (event_name, key) -> deque of payloads
+
+    @staticmethod
+    def _state_key(event_name, key):
+        return event_name, str(key)
+
+    def record(self, event_name: str, key, data) -> None:
+        """
+        Store the payload of an emitted event under its room key.
+        """
+        if key is None:
+            return
+
+        state_key = self._state_key(event_name, key)
+        if event_name in self.LATEST_ONLY_EVENTS:
+            self.latest_state[state_key] = data
+        elif event_name in self.HISTORY_EVENTS:
+            history = self.history_state.get(state_key)
+            if history is None:
+                history = deque(maxlen=self.plate_history_size)
+                self.history_state[state_key] = history
+            history.append(data)
+
+    def snapshot(self, event_name: str, key) -> list:
+        """
+        Return the cached payloads for an event/key, oldest first.
+        """
+        state_key = self._state_key(event_name, key)
+        if event_name in self.LATEST_ONLY_EVENTS:
+            data = self.latest_state.get(state_key)
+            return [data] if data is not None else []
+        if event_name in self.HISTORY_EVENTS:
+            return list(self.history_state.get(state_key, ()))
+        return []
+
+    def forget(self, key, event_names=None) -> None:
+        """
+        Drop the cached state of a camera/LPR (e.g. after it is deleted).
+        Camera and LPR ids share the key space, so pass the events keyed by
+        that kind of id to leave the other alone.
+        """
+        key = str(key)
+        for state in (self.latest_state, self.history_state):
+            for state_key in [k for k in state if k[1] == key and (event_names is None or k[0] in event_names)]:
+                state.pop(state_key, None)
@@ -7,10 +7,14 @@ from nats_consumer.nats_setup import create_ssl_context, connect_to_nats_server,
 from nats_consumer.auth import authenticate_client
 from nats_consumer.handlers import (
     handle_lpr_settings_request,
-    handle_plates_data, crud_image
+    handle_plates_data, crud_image,
+    owner_cache
 )
 from nats_consumer.record_handling import handle_recording
 from settings import settings
+from database.engine import nats_engine
+from database.partitions import ensure_traffic_partitions
+from utils.invalidation_bus import invalidation_bus
 
 async def main():
     PROJECT_ROOT = Path(Path(__file__).resolve().parents[1])
@@ -84,6 +88,12 @@ async def main():
         for sig in (signal.SIGINT, signal.SIGTERM):
             loop.add_signal_handler(sig, lambda s=sig: asyncio.create_task(handle_signal(sig.name)))
 
+    # Make sure incoming plates have a traffic partition to land in
+    try:
+        await ensure_traffic_partitions(nats_engine)
+    except Exception as e:
+        print(f"Failed to ensure traffic partitions: {e}")
+
     # Set up subscriptions
     try:
         await nc.subscribe("alpr.settings.request", cb=on_lpr_settings_request)
@@ -98,6 +108,11 @@ async def main():
         await nc.subscribe("message.recording.*", cb=handle_recording)
         print("Subscribed to 'recording.*' subject pattern.")
 
+        # Evict cached plate owners when the API changes users or vehicles
+        invalidation_bus.register(owner_cache.invalidate)
+        await invalidation_bus.attach(nc)
+        print(f"Subscribed to '{settings.INVALIDATION_SUBJECT}' subject.")
+
         js = nc.jetstream()
         await setup_jetstream_stream(js)
 
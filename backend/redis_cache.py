@@ -1,15 +1,33 @@
 from redis import asyncio as aioredis
 from contextlib import asynccontextmanager
-from typing import Optional
+from typing import Any, Awaitable, Callable, Optional
+import asyncio
 import json
 import hashlib
+import logging
 import os
+import time
+import uuid
 
 from settings import settings
 
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1] = lock key, ARGV[1] = owner token; only the owner releases the lock.
+RELEASE_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
 class RedisCache:
     def __init__(self):
         self.redis = None
+        # key -> in-flight computation shared by concurrent callers in this process
+        self._inflight: dict[str, asyncio.Future] = {}
 
     async def init_cache(self):
         self.redis = await aioredis.from_url(
@@ -28,6 +46,19 @@ class RedisCache:
         key_str = ":".join(str(arg) for arg in args)
         return hashlib.md5(key_str.encode()).hexdigest()
 
+    @staticmethod
+    def generation_key(model: str) -> str:
+        return f"search:{model}:generation"
+
+    async def model_key(self, model: str, *args) -> str:
+        """
+        Cache key for a model's entry under its current generation. Bumping the
+        generation orphans every older key; those then age out by TTL.
+        """
+        async with self.get_connection() as conn:
+            generation = await conn.get(self.generation_key(model)) or 0
+        return f"search:{model}:{generation}:{await self.generate_key(model, *args)}"
+
     async def get(self, key: str) -> Optional[dict]:
         async with self.get_connection() as conn:
             data = await conn.get(key)
@@ -41,10 +72,83 @@ class RedisCache:
                 ex=ttl or settings.CACHE_TTL
             )
 
-    async def invalidate_model(self, model: str):
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: int = None,
+        grace: int = None,
+        refresh: bool = False,
+    ) -> Any:
+        """
+        Read-through cache with stale-while-revalidate and single-flight.
+
+        A value is fresh for ttl seconds and then served stale for another
+        grace seconds while one caller refreshes it in the background. On a
+        miss, concurrent callers in this process share one computation and
+        other processes wait on a Redis lock for its result instead of
+        computing it again. refresh=True skips the read and recomputes.
+        """
+        ttl = ttl or settings.CACHE_TTL
+        grace = settings.CACHE_STALE_GRACE if grace is None else grace
+
+        if not refresh:
+            entry = await self.get(key)
+            if entry is not None:
+                if entry["fresh_until"] <= time.time():
+                    self._single_flight(key, compute, ttl, grace, wait=False)
+                return entry["value"]
+
+        return await asyncio.shield(self._single_flight(key, compute, ttl, grace, wait=True))
+
+    def _single_flight(self, key: str, compute, ttl: int, grace: int, wait: bool) -> asyncio.Future:
+        # Background refreshes are tracked apart from misses: a refresh that
+        # loses the lock to another process returns nothing to wait on.
+        flight_key = key if wait else f"{key}:refresh"
+        flight = self._inflight.get(flight_key)
+        if flight is None:
+            flight = asyncio.ensure_future(self._compute_locked(key, compute, ttl, grace, wait))
+            self._inflight[flight_key] = flight
+            flight.add_done_callback(lambda done: self._on_flight_done(flight_key, done, wait))
+        return flight
+
+    def _on_flight_done(self, flight_key: str, flight: asyncio.Future, wait: bool) -> None:
+        self._inflight.pop(flight_key, None)
+        # Background refreshes have no awaiting caller to surface errors to
+        if not wait and not flight.cancelled() and flight.exception() is not None:
+            logger.warning(f"Background refresh of {flight_key} failed: {flight.exception()}")
+
+    async def _compute_locked(self, key: str, compute, ttl: int, grace: int, wait: bool) -> Any:
+        lock_key = f"{key}:lock"
+        token = uuid.uuid4().hex
+        async with self.get_connection() as conn:
+            locked = await conn.set(lock_key, token, nx=True, ex=settings.CACHE_LOCK_TTL)
+
+        if not locked:
+            if not wait:
+                # Another process is already refreshing this entry
+                return None
+            deadline = time.monotonic() + settings.CACHE_LOCK_WAIT
+            while time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+                entry = await self.get(key)
+                if entry is not None and entry["fresh_until"] > time.time():
+                    return entry["value"]
+
+        try:
+            value = await compute()
+            await self.set(key, {"value": value, "fresh_until": time.time() + ttl}, ttl=ttl + grace)
+            return value
+        finally:
+            if locked:
+                async with self.get_connection() as conn:
+                    await conn.eval(RELEASE_LOCK_LUA, 1, lock_key, token)
+
+    async def invalidate_model(self, model: str) -> int:
+        """
+        Invalidate every cached entry of a model with a single INCR.
+        """
         async with self.get_connection() as conn:
-            keys = await conn.keys(f"search:{model}:*")
-            if keys:
-                await conn.delete(*keys)
+            return await conn.incr(self.generation_key(model))
 
 redis_cache = RedisCache()
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from auth.authorization import get_current_active_user, get_admin_user, get_admin_or_staff_user
@@ -8,6 +8,8 @@ from schema.user import UserInDB
 from schema.building import BuildingCreate, BuildingUpdate, BuildingInDB, BuildingPagination
 from crud.building import BuildingOperation
 from utils.middlewares import check_password_changed
+from utils.pagination import COUNT_PATTERN
+from utils.response_cache import cached_response
 
 
 building_router = APIRouter(
@@ -22,21 +24,24 @@ async def api_create_building(building: BuildingCreate, db: AsyncSession = Depen
     return await building_op.create_building(building)
 
 @building_router.get("/", response_model=BuildingPagination, status_code=status.HTTP_200_OK, dependencies=[Depends(check_password_changed)])
-async def api_get_all_buildings(page: int = 1, page_size: int = 10, db: AsyncSession = Depends(get_db), current_user: UserInDB = Depends(get_admin_or_staff_user)):
+@cached_response(BuildingPagination, tags=("buildings", "gates"))
+async def api_get_all_buildings(page: int = 1, page_size: int = 10, count: str = Query("exact", pattern=COUNT_PATTERN), db: AsyncSession = Depends(get_db), current_user: UserInDB = Depends(get_admin_or_staff_user)):
     building_op = BuildingOperation(db)
-    return await building_op.get_all_objects(page, page_size)
+    return await building_op.get_all_objects(page, page_size, count=count)
 
 
 @building_router.get("/{building_id}", response_model=BuildingInDB, status_code=status.HTTP_200_OK, dependencies=[Depends(check_password_changed)])
+@cached_response(BuildingInDB, tags=("buildings", "gates"))
 async def api_get_building(building_id: int, db: AsyncSession = Depends(get_db), current_user: UserInDB = Depends(get_admin_or_staff_user)):
     building_op = BuildingOperation(db)
     return await building_op.get_one_object_id(building_id)
 
 
 @building_router.get("/{building_id}/gates", response_model=GatePagination, status_code=status.HTTP_200_OK, dependencies=[Depends(check_password_changed)])
-async def api_get_building_all_gates(building_id: int, page: int = 1, page_size: int = 10, db: AsyncSession = Depends(get_db), current_user: UserInDB = Depends(get_admin_or_staff_user)):
+@cached_response(GatePagination, tags=("gates", "cameras", "users"))
+async def api_get_building_all_gates(building_id: int, page: int = 1, page_size: int = 10, count: str = Query("exact", pattern=COUNT_PATTERN), db: AsyncSession = Depends(get_db), current_user: UserInDB = Depends(get_admin_or_staff_user)):
     building_op = BuildingOperation(db)
-    return await building_op.get_building_all_gates(building_id, page, page_size)
+    return await building_op.get_building_all_gates(building_id, page, page_size, count=count)
 
 
 @building_router.put("/{building_id}", response_model=BuildingInDB, status_code=status.HTTP_200_OK, dependencies=[Depends(check_password_changed)])
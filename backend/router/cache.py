@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends, status
+
+from auth.authorization import get_admin_user
+from schema.user import UserInDB
+from utils.middlewares import check_password_changed
+from utils.response_cache import response_cache
+
+
+cache_router = APIRouter(
+    prefix="/v1/cache",
+    tags=["cache"],
+)
+
+
+@cache_router.get("/stats", status_code=status.HTTP_200_OK, dependencies=[Depends(check_password_changed)])
+async def api_get_cache_stats(current_user: UserInDB = Depends(get_admin_user)):
+    """
+    Hit, miss and invalidation counters of the response cache, across all workers.
+    """
+    return await response_cache.stats()
@@ -1,6 +1,6 @@
 from pathlib import Path
 
-from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi import APIRouter, Depends, status, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from auth.authorization import get_current_active_user, get_admin_user, get_admin_or_staff_user, get_admin_staff_viewer_user
@@ -13,6 +13,8 @@ from schema.camera_setting import CameraSettingInstanceUpdate, CameraSettingInst
 from crud.camera import CameraOperation
 from settings import settings
 from utils.middlewares import check_password_changed
+from utils.pagination import COUNT_PATTERN
+from utils.response_cache import cached_response
 
 
 camera_router = APIRouter(
@@ -27,9 +29,11 @@ async def api_create_camera(camera: CameraCreate, db: AsyncSession = Depends(get
     return await camera_op.create_camera(camera)
 
 @camera_router.get("/", response_model=CameraPagination, status_code=status.HTTP_200_OK, dependencies=[Depends(check_password_changed)])
+@cached_response(CameraPagination, tags=("cameras", "camera_setting_instances"))
 async def api_get_all_cameras(
     page: int = 1,
     page_size: int = 10,
+    count: str = Query("exact", pattern=COUNT_PATTERN),
     db: AsyncSession = Depends(get_db),
     current_user: UserInDB = Depends(get_current_active_user),
 ):
@@ -37,11 +41,11 @@ async def api_get_all_cameras(
 
     if current_user.user_type in [UserType.ADMIN, UserType.STAFF]:
         # Admins and staff get all cameras
-        result = await camera_op.get_all_objects(page, page_size)
+        result = await camera_op.get_all_objects(page, page_size, count=count)
     elif current_user.user_type == UserType.VIEWER:
         # Viewers get cameras associated with their accessible gates
-        accessible_gate_ids = [gate.id for gate in current_user.gates]
-        result = await camera_op.get_objects_by_gate_ids(accessible_gate_ids, page, page_size)
+        accessible_gate_ids = list(current_user.gate_ids)
+        result = await camera_op.get_objects_by_gate_ids(accessible_gate_ids, page, page_size, count=count)
     else:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -49,14 +53,14 @@ async def api_get_all_cameras(
         )
 
     stroragefactory = StorageFactory.get_instance(settings.STORAGE_BACKEND)
-    for cam in result["items"]:
-        cam.crud_image = await stroragefactory.get_full_path(cam.crud_image)
+    await stroragefactory.resolve_image_urls(result["items"], "crud_image")
 
 
     return result
 
 
 @camera_router.get("/{camera_id}", response_model=CameraInDB, status_code=status.HTTP_200_OK, dependencies=[Depends(check_password_changed)])
+@cached_response(CameraInDB, tags=("cameras", "camera_setting_instances"))
 async def api_get_camera(camera_id: int, db: AsyncSession = Depends(get_db), current_user: UserInDB = Depends(get_admin_staff_viewer_user)):
     camera_op = CameraOperation(db)
     camera_detials = await camera_op.get_one_object_id(camera_id)
@@ -86,14 +90,16 @@ async def api_change_activation(
     return await camera_op.change_activation_status(camera_id)
 
 @camera_router.get("/{camera_id}/settings", response_model=CameraSettingInstancePagination, status_code=status.HTTP_200_OK, dependencies=[Depends(check_password_changed)])
+@cached_response(CameraSettingInstancePagination, tags=("camera_setting_instances",))
 async def api_get_camera_all_settings(
     camera_id: int,page: int = 1,
     page_size: int = 10,
+    count: str = Query("exact", pattern=COUNT_PATTERN),
     db: AsyncSession = Depends(get_db),
     current_user: UserInDB = Depends(get_admin_or_staff_user)
 ):
     camera_op = CameraOperation(db)
-    return await camera_op.get_camera_all_settings(camera_id, page, page_size)
+    return await camera_op.get_camera_all_settings(camera_id, page, page_size, count=count)
 
 @camera_router.post("/{camera_id}/settings", response_model=CameraSettingInstanceInDB, status_code=status.HTTP_201_CREATED, dependencies=[Depends(check_password_changed)])
 async def api_add_camera_setting(
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from auth.authorization import get_current_active_user, get_admin_user, get_admin_or_staff_user
@@ -7,6 +7,8 @@ from schema.user import UserInDB
 from schema.camera_setting import CameraSettingCreate, CameraSettingUpdate, CameraSettingInDB, CameraSettingPagination
 from crud.camera_setting import CameraSettingOperation
 from utils.middlewares import check_password_changed
+from utils.pagination import COUNT_PATTERN
+from utils.response_cache import cached_response
 
 
 
@@ -23,12 +25,14 @@ async def api_create_setting(setting: CameraSettingCreate, db: AsyncSession = De
     return await setting_op.create_setting(setting)
 
 @camera_setting_router.get("/", response_model=CameraSettingPagination, status_code=status.HTTP_200_OK, dependencies=[Depends(check_password_changed)])
-async def api_get_settings(page: int = 1, page_size: int = 10, db: AsyncSession = Depends(get_db), current_user: UserInDB=Depends(get_admin_or_staff_user)):
+@cached_response(CameraSettingPagination, tags=("camera_settings",))
+async def api_get_settings(page: int = 1, page_size: int = 10, count: str = Query("exact", pattern=COUNT_PATTERN), db: AsyncSession = Depends(get_db), current_user: UserInDB=Depends(get_admin_or_staff_user)):
     setting_op = CameraSettingOperation(db)
-    return await setting_op.get_all_objects(page, page_size)
+    return await setting_op.get_all_objects(page, page_size, count=count)
 
 
 @camera_setting_router.get("/{setting_id}", response_model=CameraSettingInDB, status_code=status.HTTP_200_OK, dependencies=[Depends(check_password_changed)])
+@cached_response(CameraSettingInDB, tags=("camera_settings",))
 async def api_get_setting(setting_id: int, db: AsyncSession = Depends(get_db), current_user: UserInDB=Depends(get_admin_or_staff_user)):
     setting_op = CameraSettingOperation(db)
     return await setting_op.get_one_object_id(setting_id)
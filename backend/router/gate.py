@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
+from datetime import datetime
 
 from auth.authorization import get_current_active_user, get_admin_user, get_admin_or_staff_user
 from database.engine import get_db
@@ -9,6 +10,8 @@ from schema.camera import CameraPagination
 from schema.gate import GateCreate, GateUpdate, GateInDB, GatePagination, GateTrafficStats, TimeIntervalCount
 from crud.gate import GateOperation
 from utils.middlewares import check_password_changed
+from utils.pagination import COUNT_PATTERN
+from utils.response_cache import cached_response
 
 
 gate_router = APIRouter(
@@ -23,31 +26,41 @@ async def api_create_gate(gate: GateCreate, db: AsyncSession = Depends(get_db),
     return await gate_op.create_gate(gate)
 
 @gate_router.get("/", response_model=GatePagination, status_code=status.HTTP_200_OK, dependencies=[Depends(check_password_changed)])
-async def api_get_all_gates(page: int = 1, page_size: int = 10, db: AsyncSession = Depends(get_db), current_user: UserInDB = Depends(get_admin_or_staff_user)):
+@cached_response(GatePagination, tags=("gates", "cameras", "users"))
+async def api_get_all_gates(page: int = 1, page_size: int = 10, count: str = Query("exact", pattern=COUNT_PATTERN), db: AsyncSession = Depends(get_db), current_user: UserInDB = Depends(get_admin_or_staff_user)):
     gate_op = GateOperation(db)
-    return await gate_op.get_all_objects(page, page_size)
+    return await gate_op.get_all_objects(page, page_size, count=count)
 
 
 @gate_router.get("/stats", response_model=List[GateTrafficStats], status_code=status.HTTP_200_OK, dependencies=[Depends(check_password_changed)])
 async def get_gate_traffic_stats(
     gate_type: str = Query("all", enum=["all", "ENTRANCE", "EXIT", "BOTH"]),
+    start_date: datetime = Query(None, description="Window start (UTC, default 24 hours before end_date)"),
+    end_date: datetime = Query(None, description="Window end (UTC, default now)"),
     db: AsyncSession = Depends(get_db),
     current_user: UserInDB=Depends(get_admin_or_staff_user)
 ):
+    if start_date is not None and end_date is not None and end_date <= start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="End date must be greater than start date."
+        )
     gate_ops = GateOperation(db)
-    return await gate_ops.get_gate_traffic_stats(gate_type)
+    return await gate_ops.get_gate_traffic_stats(gate_type, start_date, end_date)
 
 
 @gate_router.get("/{gate_id}", response_model=GateInDB, status_code=status.HTTP_200_OK, dependencies=[Depends(check_password_changed)])
+@cached_response(GateInDB, tags=("gates", "cameras", "users"))
 async def api_get_gate(gate_id: int, db: AsyncSession = Depends(get_db), current_user: UserInDB = Depends(get_admin_or_staff_user)):
     gate_op = GateOperation(db)
     return await gate_op.get_one_object_id(gate_id)
 
 
 @gate_router.get("/{gate_id}/cameras", response_model=CameraPagination, status_code=status.HTTP_200_OK, dependencies=[Depends(check_password_changed)])
-async def api_get_gate_all_cameras(gate_id: int, page: int = 1, page_size: int = 10, db: AsyncSession = Depends(get_db), current_user: UserInDB = Depends(get_admin_or_staff_user)):
+@cached_response(CameraPagination, tags=("cameras", "camera_setting_instances"))
+async def api_get_gate_all_cameras(gate_id: int, page: int = 1, page_size: int = 10, count: str = Query("exact", pattern=COUNT_PATTERN), db: AsyncSession = Depends(get_db), current_user: UserInDB = Depends(get_admin_or_staff_user)):
     gate_op = GateOperation(db)
-    return await gate_op.get_gate_all_cameras(gate_id, page, page_size)
+    return await gate_op.get_gate_all_cameras(gate_id, page, page_size, count=count)
 
 
 @gate_router.put("/{gate_id}", response_model=GateInDB, status_code=status.HTTP_200_OK, dependencies=[Depends(check_password_changed)])
@@ -76,8 +89,9 @@ async def api_change_activation(
 async def get_gate_time_series(
     gate_id: int,
     interval: str = Query(..., enum=["daily", "weekly", "monthly"]),
+    end_date: datetime = Query(None, description="End of the day/week/month window (UTC, default now)"),
     db: AsyncSession = Depends(get_db),
     current_user: UserInDB=Depends(get_admin_or_staff_user)
 ):
     gate_ops = GateOperation(db)
-    return await gate_ops.get_gate_time_series(gate_id, interval)
+    return await gate_ops.get_gate_time_series(gate_id, interval, end_date)
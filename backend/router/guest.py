@@ -1,5 +1,5 @@
 import logging
-from fastapi import APIRouter, Depends, status, HTTPException, UploadFile, File, Request
+from fastapi import APIRouter, Depends, status, HTTPException, UploadFile, File, Request, Query
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from pathlib import Path
@@ -15,6 +15,7 @@ from crud.guest import GuestOperation
 from auth.auth import verify_password, get_password_hash
 from auth.authorization import get_admin_user, get_admin_or_staff_user, get_self_or_admin_or_staff_user, get_self_or_admin_user, get_self_user_only
 from utils.middlewares import check_password_changed
+from utils.pagination import COUNT_PATTERN
 
 
 # Define the base URL for serving uploaded files
@@ -60,6 +61,7 @@ async def api_get_all_guest(
     request: Request,
     page: int = 1,
     page_size: int = 10,
+    count: str = Query("exact", pattern=COUNT_PATTERN),
     db: AsyncSession = Depends(get_db),
     current_user: UserInDB=Depends(get_admin_or_staff_user)
 ):
@@ -67,7 +69,7 @@ async def api_get_all_guest(
     Retrieve all users with pagination.
     """
     guest_op = GuestOperation(db)
-    result = await guest_op.get_all_objects(page, page_size)
+    result = await guest_op.get_all_objects(page, page_size, count=count)
 
     return result
 
@@ -11,6 +11,8 @@ from utils.middlewares import check_password_changed
 from schema.user import UserInDB
 from crud.key import KeyOperation
 from schema.key import KeyCreate, KeyUpdate, KeyInDB, KeyPagination
+from utils.pagination import COUNT_PATTERN
+from utils.response_cache import cached_response
 
 
 
@@ -34,12 +36,14 @@ async def api_create_relay_key(
     return await key_op.create_relay_key(relay_key)
 
 @relay_key_router.get("/", response_model=KeyPagination, status_code=status.HTTP_200_OK)
-async def api_get_all_relay_keys(page: int = 1, page_size: int = 10, db: AsyncSession = Depends(get_db), current_user: UserInDB = Depends(get_admin_or_staff_user)):
+@cached_response(KeyPagination, tags=("keys", "relays", "cameras", "statuses"))
+async def api_get_all_relay_keys(page: int = 1, page_size: int = 10, count: str = Query("exact", pattern=COUNT_PATTERN), db: AsyncSession = Depends(get_db), current_user: UserInDB = Depends(get_admin_or_staff_user)):
     key_op = KeyOperation(db)
-    return await key_op.get_all_objects(page, page_size)
+    return await key_op.get_all_objects(page, page_size, count=count)
 
 
 @relay_key_router.get("/{key_id}", response_model=KeyInDB)
+@cached_response(KeyInDB, tags=("keys", "relays", "cameras", "statuses"))
 async def api_get_relay_key_by_id(
     key_id: int,
     db: AsyncSession = Depends(get_db),
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from auth.authorization import get_current_active_user, get_admin_user, get_admin_or_staff_user
@@ -9,6 +9,8 @@ from schema.lpr import LprCreate, LprUpdate, LprInDB, LprPagination
 from schema.lpr_setting import LprSettingInstanceCreate, LprSettingInstanceUpdate, LprSettingInstanceInDB, LprSettingInstancePagination
 from crud.lpr import LprOperation
 from utils.middlewares import check_password_changed
+from utils.pagination import COUNT_PATTERN
+from utils.response_cache import cached_response
 
 # Create an APIRouter for user-related routes
 lpr_router = APIRouter(
@@ -30,16 +32,19 @@ async def api_create_lpr(
     return new_lpr
 
 @lpr_router.get("/", response_model=LprPagination, status_code=status.HTTP_200_OK, dependencies=[Depends(check_password_changed)])
+@cached_response(LprPagination, tags=("lprs", "lpr_setting_instances", "cameras"))
 async def api_get_all_lprs(
     page: int=1,
     page_size: int=10,
+    count: str = Query("exact", pattern=COUNT_PATTERN),
     db: AsyncSession=Depends(get_db),
     current_user:UserInDB=Depends(get_admin_or_staff_user)
 ):
     lpr_op = LprOperation(db)
-    return await lpr_op.get_all_objects(page, page_size)
+    return await lpr_op.get_all_objects(page, page_size, count=count)
 
 @lpr_router.get("/{lpr_id}", response_model=LprInDB, status_code=status.HTTP_200_OK, dependencies=[Depends(check_password_changed)])
+@cached_response(LprInDB, tags=("lprs", "lpr_setting_instances", "cameras"))
 async def api_get_lpr(
     lpr_id: int,
     db: AsyncSession=Depends(get_db),
@@ -50,9 +55,10 @@ async def api_get_lpr(
 
 
 @lpr_router.get("/{lpr_id}/cameras", response_model=CameraPagination, status_code=status.HTTP_200_OK, dependencies=[Depends(check_password_changed)])
-async def api_get_lpr_all_cameras(lpr_id: int, page: int = 1, page_size: int = 10, db: AsyncSession = Depends(get_db), current_user: UserInDB = Depends(get_admin_or_staff_user)):
+@cached_response(CameraPagination, tags=("cameras", "camera_setting_instances"))
+async def api_get_lpr_all_cameras(lpr_id: int, page: int = 1, page_size: int = 10, count: str = Query("exact", pattern=COUNT_PATTERN), db: AsyncSession = Depends(get_db), current_user: UserInDB = Depends(get_admin_or_staff_user)):
     lpr_op = LprOperation(db)
-    return await lpr_op.get_lpr_all_cameras(lpr_id, page, page_size)
+    return await lpr_op.get_lpr_all_cameras(lpr_id, page, page_size, count=count)
 
 
 @lpr_router.put("/{lpr_id}", response_model=LprInDB, status_code=status.HTTP_200_OK, dependencies=[Depends(check_password_changed)])
@@ -90,9 +96,10 @@ async def api_change_activation(
         return status
 
 @lpr_router.get("/{lpr_id}/settings", response_model=LprSettingInstancePagination, status_code=status.HTTP_200_OK, dependencies=[Depends(check_password_changed)])
-async def api_get_lpr_all_settings(lpr_id: int, page: int = 1, page_size: int = 10, db: AsyncSession = Depends(get_db), current_user: UserInDB = Depends(get_admin_or_staff_user)):
+@cached_response(LprSettingInstancePagination, tags=("lpr_setting_instances",))
+async def api_get_lpr_all_settings(lpr_id: int, page: int = 1, page_size: int = 10, count: str = Query("exact", pattern=COUNT_PATTERN), db: AsyncSession = Depends(get_db), current_user: UserInDB = Depends(get_admin_or_staff_user)):
     lpr_op = LprOperation(db)
-    return await lpr_op.get_lpr_all_settings(lpr_id, page, page_size)
+    return await lpr_op.get_lpr_all_settings(lpr_id, page, page_size, count=count)
 
 @lpr_router.post("/{lpr_id}/settings", response_model=LprSettingInstanceInDB, status_code=status.HTTP_201_CREATED, dependencies=[Depends(check_password_changed)])
 async def api_add_lpr_setting(
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from auth.authorization import get_current_active_user, get_admin_user, get_admin_or_staff_user
@@ -7,6 +7,8 @@ from schema.user import UserInDB
 from schema.lpr_setting import LprSettingCreate, LprSettingUpdate, LprSettingInDB, LprSettingPagination
 from crud.lpr_setting import LprSettingOperation
 from utils.middlewares import check_password_changed
+from utils.pagination import COUNT_PATTERN
+from utils.response_cache import cached_response
 
 
 
@@ -23,12 +25,14 @@ async def api_create_setting(setting: LprSettingCreate, db: AsyncSession = Depen
     return await setting_op.create_setting(setting)
 
 @lpr_setting_router.get("/", response_model=LprSettingPagination, status_code=status.HTTP_200_OK, dependencies=[Depends(check_password_changed)])
-async def api_get_settings(page: int = 1, page_size: int = 10, db: AsyncSession = Depends(get_db), current_user: UserInDB=Depends(get_admin_or_staff_user)):
+@cached_response(LprSettingPagination, tags=("lpr_settings",))
+async def api_get_settings(page: int = 1, page_size: int = 10, count: str = Query("exact", pattern=COUNT_PATTERN), db: AsyncSession = Depends(get_db), current_user: UserInDB=Depends(get_admin_or_staff_user)):
     setting_op = LprSettingOperation(db)
-    return await setting_op.get_all_objects(page, page_size)
+    return await setting_op.get_all_objects(page, page_size, count=count)
 
 
 @lpr_setting_router.get("/{setting_id}", response_model=LprSettingInDB, status_code=status.HTTP_200_OK, dependencies=[Depends(check_password_changed)])
+@cached_response(LprSettingInDB, tags=("lpr_settings",))
 async def api_get_setting(setting_id: int, db: AsyncSession = Depends(get_db), current_user: UserInDB=Depends(get_admin_or_staff_user)):
     setting_op = LprSettingOperation(db)
     return await setting_op.get_one_object_id(setting_id)
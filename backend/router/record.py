@@ -1,7 +1,7 @@
 import os
 from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi import APIRouter, HTTPException, Depends, Request, status
+from fastapi import APIRouter, HTTPException, Depends, Request, status, Query
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
 from pathlib import Path
@@ -18,6 +18,7 @@ from schema.user import UserInDB
 from schema.record import RecordCreate, RecordInDB, RecordPagination
 from schema.schedule_record import ScheduleRecordCreate, ScheduleRecordUpdate, ScheduleRecordInDB
 from socket_managment_nats_ import publish_message_to_nats
+from utils.pagination import COUNT_PATTERN
 
 # Directory for recordings
 BASE_UPLOAD_DIR = Path("uploads")
@@ -33,6 +34,7 @@ async def get_records(
     request: Request,
     page: int = 1,
     page_size: int = 10,
+    count: str = Query("exact", pattern=COUNT_PATTERN),
     camera_id: Optional[int] = None,
     db: AsyncSession = Depends(get_db),
     current_user: UserInDB=Depends(get_admin_or_staff_user),
@@ -41,7 +43,7 @@ async def get_records(
     Get recorded video information.
     """
     record_op = RecordOperation(db)
-    records = await record_op.get_all_records(page, page_size, camera_id)
+    records = await record_op.get_all_records(page, page_size, camera_id, count=count)
 
     # Dynamically construct the base URL based on the request
     proto = request.headers.get("X-Forwarded-Proto", "http")
@@ -206,11 +208,12 @@ async def get_scheduled_recordings(
     request: Request,
     page: int = 1,
     page_size: int = 10,
+    count: str = Query("exact", pattern=COUNT_PATTERN),
     db: AsyncSession = Depends(get_db),
     current_user: UserInDB=Depends(get_admin_or_staff_user),
 ):
     schedule_record_op = ScheduledRecordOperation(db)
-    records = await schedule_record_op.get_all_scheduled_records(page, page_size)
+    records = await schedule_record_op.get_all_scheduled_records(page, page_size, count=count)
 
     # Dynamically construct the base URL based on the request
     proto = request.headers.get("X-Forwarded-Proto", "http")
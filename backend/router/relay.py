@@ -10,6 +10,8 @@ from schema.user import UserInDB
 from schema.relay import RelayCreate, RelayPagination, RelayUpdate, RelayInDB
 from schema.key import KeyPagination
 from utils.middlewares import check_password_changed
+from utils.pagination import COUNT_PATTERN
+from utils.response_cache import cached_response
 
 
 relay_router = APIRouter(
@@ -32,12 +34,14 @@ async def api_create_relay(
 
 
 @relay_router.get("/", response_model=RelayPagination, status_code=status.HTTP_200_OK, dependencies=[Depends(check_password_changed)])
-async def api_get_all_relays(page: int = 1, page_size: int = 10, db: AsyncSession = Depends(get_db), current_user: UserInDB = Depends(get_admin_or_staff_user)):
+@cached_response(RelayPagination, tags=("relays", "gates", "keys"))
+async def api_get_all_relays(page: int = 1, page_size: int = 10, count: str = Query("exact", pattern=COUNT_PATTERN), db: AsyncSession = Depends(get_db), current_user: UserInDB = Depends(get_admin_or_staff_user)):
     relay_op = RelayOperation(db)
-    return await relay_op.get_all_objects(page, page_size)
+    return await relay_op.get_all_objects(page, page_size, count=count)
 
 
 @relay_router.get("/{relay_id}", response_model=RelayInDB, dependencies=[Depends(check_password_changed)])
+@cached_response(RelayInDB, tags=("relays", "gates", "keys"))
 async def api_get_relay(
     relay_id: int,
     db: AsyncSession = Depends(get_db),
@@ -102,6 +106,7 @@ async def api_change_activation(
     return await relay_op.change_activation_status(relay_id)
 
 @relay_router.get("/{relay_id}/keys", response_model=KeyPagination, status_code=status.HTTP_200_OK, dependencies=[Depends(check_password_changed)])
-async def api_get_gate_all_cameras(relay_id: int, page: int = 1, page_size: int = 10, db: AsyncSession = Depends(get_db), current_user: UserInDB = Depends(get_admin_or_staff_user)):
+@cached_response(KeyPagination, tags=("keys", "relays", "cameras", "statuses"))
+async def api_get_gate_all_cameras(relay_id: int, page: int = 1, page_size: int = 10, count: str = Query("exact", pattern=COUNT_PATTERN), db: AsyncSession = Depends(get_db), current_user: UserInDB = Depends(get_admin_or_staff_user)):
     gate_op = RelayOperation(db)
-    return await gate_op.get_relay_all_keys(relay_id, page, page_size)
+    return await gate_op.get_relay_all_keys(relay_id, page, page_size, count=count)
@@ -11,7 +11,6 @@ from search_service.search_config import (
     traffic_search, vehicle_search,
 )
 from schema.user import UserInDB
-from redis_cache import redis_cache
 from utils.middlewares import check_password_changed
 
 search_router = APIRouter(
@@ -48,9 +47,6 @@ async def model_search(
     if model not in service_map:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Model not searchable")
 
-    if nocache:
-        await redis_cache.invalidate_model(model)
-
     # Calculate offset from page number
     offset = (page - 1) * page_size
 
@@ -59,7 +55,8 @@ async def model_search(
         query=query,
         filters=filters,
         limit=page_size,
-        offset=offset
+        offset=offset,
+        use_cache=not nocache
     )
 
     # Prepare pagination metadata
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
@@ -8,6 +8,8 @@ from schema.status import StatusCreate, StatusUpdate, StatusInDB, StatusPaginati
 from auth.authorization import get_admin_or_staff_user
 from utils.middlewares import check_password_changed
 from schema.user import UserInDB
+from utils.pagination import COUNT_PATTERN
+from utils.response_cache import cached_response
 
 
 status_router = APIRouter(
@@ -26,6 +28,7 @@ async def create_status(
     return await status_crud.create_status(status)
 
 @status_router.get("/{status_id}", response_model=StatusInDB)
+@cached_response(StatusInDB, tags=("statuses",))
 async def read_status(
     status_id: int,
     db: AsyncSession = Depends(get_db),
@@ -57,11 +60,13 @@ async def delete_status(
     return deleted_status
 
 @status_router.get("/", response_model=StatusPagination)
+@cached_response(StatusPagination, tags=("statuses",))
 async def read_all_status(
     page: int = 1,
     page_size: int = 10,
+    count: str = Query("exact", pattern=COUNT_PATTERN),
     db: AsyncSession = Depends(get_db),
     current_user: UserInDB = Depends(get_admin_or_staff_user)
 ):
     status_crud = StatusOperation(db)
-    return await status_crud.get_all_objects(page, page_size)
+    return await status_crud.get_all_objects(page, page_size, count=count)
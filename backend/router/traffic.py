@@ -1,37 +1,28 @@
-import tempfile
-
-import openpyxl
-import shutil
-from zipfile import ZipFile
-from io import BytesIO
 from fastapi import APIRouter, Depends, status, HTTPException, Query, Request, BackgroundTasks
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 from fastapi.responses import FileResponse, JSONResponse
 from pathlib import Path
-from tempfile import TemporaryDirectory
 from typing import Optional
+from urllib.parse import quote
 
 from image_storage.storage_management import StorageFactory
 from settings import settings
 from database.engine import get_db
-from schema.traffic import TrafficCreate, TrafficInDB, TrafficPagination, DeleteTrafficResponse
+from schema.traffic import TrafficCreate, TrafficInDB, TrafficPagination
 from crud.traffic import TrafficOperation
 from schema.user import UserInDB
 from auth.authorization import get_admin_user, get_admin_or_staff_user, get_self_or_admin_or_staff_user, get_self_or_admin_user, get_self_user_only
 from utils.middlewares import check_password_changed
+from utils.traffic_export import ZIP_FILE_DIR, start_traffic_export, get_traffic_export
+from utils.traffic_purge import start_traffic_purge, get_traffic_purge
+from utils.pagination import COUNT_PATTERN
+from utils.fast_json import fast_response, shape_rows
+from utils.sparse_fields import FIELDS_DESCRIPTION, parse_fields, sparse_model
+from models.user import UserType
 from logging_package import logging_script
 
 
-BASE_UPLOAD_DIR = Path("uploads")
-ZIP_FILE_DIR = BASE_UPLOAD_DIR / "zips"
-ZIP_FILE_DIR.mkdir(parents=True, exist_ok=True)
-
-dict_char_alpha = {
-    'a':'ا', 'b': "ب", 'c': 'ص', 'd':'د', 'e': 'ژ', 'f':'ف', 'g':'گ', 'h':'ه', 'i':'ع','j': 'ج',
-    'k':'ک', 'l':'ل', 'm':'م','n':'ن','o':'ث','q':'ق', 's':'س', 't':'ت','v':'و' , 'w':'ط', 'y':'ی', 'x':'x',
-    'p':'پ', 'u':'ش' , 'z':'ز', 'D':'D', 'S':'S',
-}
 
 # Create an APIRouter for user-related routes
 traffic_router = APIRouter(
@@ -69,20 +60,25 @@ async def get_traffic_data(
     request: Request,
     page: int = Query(1, ge=1, description="Page number to retrieve"),
     page_size: int = Query(10, ge=1, le=100, description="Number of records per page"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor; takes precedence over page"),
+    count: str = Query("exact", pattern=COUNT_PATTERN, description="How total_records is computed: exact, estimated or none"),
     gate_id: int = Query(None, description="Filter by gate ID"),
     camera_id: int = Query(None, description="Filter by camera ID"),
     prefix_2: str = Query(None, description="First two digits of plate number"),
     alpha: str = Query(None, description="Alphabet character in plate number"),
     mid_3: str = Query(None, description="Three middle digits in plate number"),
     suffix_2: str = Query(None, description="Last two digits in plate number"),
+    plate: str = Query(None, description="Plate pattern: ? matches one character, * any run (e.g. 12?345)"),
     start_date: datetime = Query(None, description="Filter records from this date (ISO format)"),
     end_date: datetime = Query(None, description="Filter records up to this date (ISO format)"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     db: AsyncSession = Depends(get_db),
     current_user: UserInDB = Depends(get_admin_or_staff_user),
 ):
     """
     Retrieve traffic data with pagination.
     """
+    selected = parse_fields(fields, TrafficInDB)
     if end_date is not None and start_date is not None and end_date <= start_date:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -106,30 +102,25 @@ async def get_traffic_data(
         alpha=alpha,
         mid_3=mid_3,
         suffix_2=suffix_2,
+        plate=plate,
         start_date=start_date,
-        end_date=end_date
+        end_date=end_date,
+        cursor=cursor,
+        count=count,
+        fields=selected,
     )
 
     if not paginated_result["items"]:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No traffic data found for the given filters.")
 
     stroragefactory = StorageFactory.get_instance(settings.STORAGE_BACKEND)
+    image_fields = [name for name in ("plate_image", "full_image") if selected is None or name in selected]
     # Modify plate image URLs for display in the response
     for traffic in paginated_result["items"]:
         traffic.plate_image_url = None
-        if traffic.plate_image:
-
-            if settings.STORAGE_BACKEND == "minio":
-                filepath = await stroragefactory.get_full_path(Path(traffic.plate_image))
-                traffic.plate_image =filepath
-            #traffic.plate_image_url = f"{nginx_base_url}{traffic.plate_image}"
         traffic.full_image_url = None
-        if traffic.full_image:
-
-            if settings.STORAGE_BACKEND == "minio":
-                filepath = await stroragefactory.get_full_path(Path(traffic.full_image))
-                traffic.full_image = filepath
-            #traffic.full_image_url = f"{nginx_base_url}{traffic.full_image}"
+    if settings.STORAGE_BACKEND == "minio":
+        await stroragefactory.resolve_image_urls(paginated_result["items"], *image_fields)
 
     # Generate export link
     export_link = (
@@ -140,6 +131,7 @@ async def get_traffic_data(
         f"alpha={alpha or ''}&"
         f"mid_3={mid_3 or ''}&"
         f"suffix_2={suffix_2 or ''}&"
+        f"plate={quote(plate or '')}&"
         # f"plate_number={plate_number or ''}&"
         f"start_date={start_date.isoformat() if start_date else ''}&"
         f"end_date={end_date.isoformat() if end_date else ''}"
@@ -148,9 +140,11 @@ async def get_traffic_data(
     # Include export link in the response
     paginated_result["export_url"] = export_link
 
-    return paginated_result
+    # Rows are flat, so they go straight to orjson without a pydantic pass
+    paginated_result["items"] = shape_rows(paginated_result["items"], sparse_model(TrafficInDB, selected))
+    return fast_response(paginated_result)
 
-@traffic_router.get("/export", status_code=status.HTTP_200_OK)
+@traffic_router.get("/export", status_code=status.HTTP_202_ACCEPTED)
 async def export_traffic_data(
     request: Request,
     gate_id: int = Query(None, description="Filter by gate ID"),
@@ -159,134 +153,59 @@ async def export_traffic_data(
     alpha: str = Query(None, description="Alphabet character in plate number"),
     mid_3: str = Query(None, description="Three middle digits in plate number"),
     suffix_2: str = Query(None, description="Last two digits in plate number"),
+    plate: str = Query(None, description="Plate pattern: ? matches one character, * any run (e.g. 12?345)"),
     # plate_number: str = Query(None, description="Filter by partial or exact plate number"),
     start_date: datetime = Query(None, description="Filter records from this date (ISO format)"),
     end_date: datetime = Query(None, description="Filter records up to this date (ISO format)"),
-    db: AsyncSession = Depends(get_db),
+    format: str = Query("zip", pattern="^(zip|parquet)$", description="zip (XLSX and images) or parquet (typed columns, image keys)"),
     current_user: UserInDB = Depends(get_admin_or_staff_user),
 ):
     """
-    Generate a ZIP file containing traffic data and plate images (limited to 1000 records).
+    Start a background export of the matching traffic data, either as a ZIP
+    file with an XLSX sheet and images or as a Parquet file for analytics.
+    Poll the returned status URL for progress and the download link.
     """
-    proto = request.headers.get("X-Forwarded-Proto", "http")
-
-    # Extract the base URL and normalize it to include port 8000
-    raw_base_url = str(request.base_url).rstrip("/")
-    base_url_without_port = raw_base_url.split("//")[1].split(":")[0]
-    nginx_base_url = f"{proto}://{base_url_without_port}:8000/"
-
-    traffic_op = TrafficOperation(db)
-
-    # Get all matching data (limited to 1000 records)
-    all_data_result = await traffic_op.get_all_traffics(
-        page=1,
-        page_size=1000,
-        gate_id=gate_id,
-        camera_id=camera_id,
-        prefix_2=prefix_2,
-        alpha=alpha,
-        mid_3=mid_3,
-        suffix_2=suffix_2,
-        start_date=start_date,
-        end_date=end_date
-    )
-    all_items = all_data_result["items"]
-
-    if not all_items:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No traffic data found for the given filters.")
-
-    # Temporary directory for file creation
-    with TemporaryDirectory() as temp_dir:
-        temp_dir_path = Path(temp_dir)
-
-        # Generate Excel file
-        excel_path = temp_dir_path / "traffic_data.xlsx"
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Traffic Data"
-
-        # Write headers
-        headers = ["ID", "Plate Number", "OCR Accuracy", "Vision Speed", "Timestamp", "Camera", "Gate", "Plate Image", "Full Image"]
-        ws.append(headers)
-
-        def replace_with_persian_characters(plate_number: str, char_map: dict) -> str:
-            return ''.join(char_map.get(char, char) for char in plate_number)
-
-
-        # Write data rows
-        for item in all_items:
-            persian_plate_number = item.plate_number[3:]+dict_char_alpha[item.plate_number[2]]+item.plate_number[:2]
-            item.plate_image_url = None
-            if item.plate_image:
-                filename = Path(item.plate_image).name
-                item.plate_image_url = f"plate_images/{filename}"
-            item.full_image_url = None
-            if item.full_image:
-                filename = Path(item.full_image).name
-                item.full_image_url = f"full_images/{filename}"
-
-            row_data = [
-                item.id,
-                persian_plate_number,
-                # item.plate_number,
-                item.ocr_accuracy,
-                item.vision_speed,
-                item.timestamp.isoformat(),
-                item.camera_name,
-                item.gate_name,
-            ]
-            if item.plate_image_url:
-                # Create a hyperlink using the same unique name
-                hyperlink = f'=HYPERLINK("{item.plate_image_url}", "View Image")'
-                row_data.append(hyperlink)
-            else:
-                row_data.append(None)
-
-            if item.full_image_url:
-                # Create a hyperlink using the same unique name
-                hyperlink = f'=HYPERLINK("{item.full_image_url}", "View Image")'
-                row_data.append(hyperlink)
-            else:
-                row_data.append(None)
-
-            ws.append(row_data)
-        wb.save(excel_path)
-
-        # Copy plate images to folder
-        plate_images_dir = temp_dir_path / "plate_images"
-        plate_images_dir.mkdir(parents=True, exist_ok=True)
-        for item in all_items:
-            if item.plate_image:
-                source_image_path = Path(item.plate_image)
-                if source_image_path.exists():
-                    shutil.copyfile(source_image_path, plate_images_dir / source_image_path.name)
-        # Copy full images to folder
-        full_images_dir = temp_dir_path / "full_images"
-        full_images_dir.mkdir(parents=True, exist_ok=True)
-        for item in all_items:
-            if item.full_image:
-                source_image_path = Path(item.full_image)
-                if source_image_path.exists():
-                    shutil.copyfile(source_image_path, full_images_dir / source_image_path.name)
-
-        # Create ZIP file
-        zip_file_name = "traffic_data.zip"
-        temp_dir = tempfile.gettempdir()
-        persistent_zip_path = Path(temp_dir) / zip_file_name
-        with ZipFile(persistent_zip_path, "w") as zip_file:
-            zip_file.write(excel_path, arcname="traffic_data.xlsx")
-            for image_file in plate_images_dir.iterdir():
-                zip_file.write(image_file, arcname=f"plate_images/{image_file.name}")
-            for image_file in full_images_dir.iterdir():
-                zip_file.write(image_file, arcname=f"full_images/{image_file.name}")
-        # Copy the ZIP file to the permanent directory
-        permanent_zip_path = ZIP_FILE_DIR / zip_file_name
-        shutil.copyfile(persistent_zip_path, permanent_zip_path)
-
-    # Generate the download URL
-    zip_file_url = f"{nginx_base_url}{permanent_zip_path}"
-
-    return {"message": "Traffic data exported successfully.", "zip_file_url": zip_file_url}
+    filters = {
+        "gate_id": gate_id,
+        "camera_id": camera_id,
+        "prefix_2": prefix_2,
+        "alpha": alpha,
+        "mid_3": mid_3,
+        "suffix_2": suffix_2,
+        "plate": plate,
+        "start_date": start_date,
+        "end_date": end_date,
+    }
+    job = await start_traffic_export(filters, current_user.id, export_format=format)
+    status_url = str(request.url_for("get_traffic_export_status", job_id=job["job_id"]))
+    return {"message": "Traffic export started.", "job_id": job["job_id"], "status_url": status_url}
+
+
+@traffic_router.get("/export/{job_id}", status_code=status.HTTP_200_OK)
+async def get_traffic_export_status(
+    request: Request,
+    job_id: str,
+    current_user: UserInDB = Depends(get_admin_or_staff_user),
+):
+    """
+    Report the progress of an export job and its download link once completed.
+    """
+    job = await get_traffic_export(job_id)
+    if job is None or (
+        job["owner_id"] != current_user.id and current_user.user_type != UserType.ADMIN
+    ):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Export job not found.")
+
+    if job["status"] == "completed":
+        proto = request.headers.get("X-Forwarded-Proto", "http")
+        raw_base_url = str(request.base_url).rstrip("/")
+        base_url_without_port = raw_base_url.split("//")[1].split(":")[0]
+        nginx_base_url = f"{proto}://{base_url_without_port}:8000/"
+        job["file_url"] = f"{nginx_base_url}{ZIP_FILE_DIR / job['file_name']}"
+        if job["format"] == "zip":
+            # Older clients (the web frontend) read the ZIP link under this name
+            job["zip_file_url"] = job["file_url"]
+    return job
 
 
 @traffic_router.get("/{traffic_id}", response_model=TrafficInDB, status_code=status.HTTP_200_OK)
@@ -327,52 +246,38 @@ async def get_one_traffic_data(
     return traffic
 
 
-@traffic_router.delete("/delete", response_model=DeleteTrafficResponse)
+@traffic_router.delete("/delete", status_code=status.HTTP_202_ACCEPTED)
 async def delete_traffics(
+    request: Request,
     camera_id: int = Query(None, description="Camera ID to delete from"),
     start_date: datetime = Query(..., description="Start date (UTC)"),
     end_date: datetime = Query(..., description="End date (UTC)"),
-    db: AsyncSession = Depends(get_db)
+    current_user: UserInDB = Depends(get_admin_user),
 ):
-    try:
-
-        # Get matching traffics
-        traffic_op = TrafficOperation(db)
-        traffics = await traffic_op.get_traffics_by_camera_and_date(
-            start_date,
-            end_date,
-            camera_id
+    """
+    Start a background purge of the traffic rows and images in the range.
+    Rows are deleted in id-range chunks and the job resumes after a restart.
+    """
+    if end_date <= start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="End date must be greater than start date."
         )
 
-        if not traffics:
-            return DeleteTrafficResponse(
-                message="No matching records found",
-                deleted_count=0
-            )
-
-        # Delete images
-        storage = StorageFactory.get_instance(settings.STORAGE_BACKEND)
-        image_errors = []
-
-        for traffic in traffics:
-            try:
-                if traffic.plate_image:
-                    await storage.delete_image(traffic.plate_image)
-                if traffic.full_image:
-                    await storage.delete_image(traffic.full_image)
-            except Exception as e:
-                image_errors.append(f"Failed to delete images for {traffic.id}: {str(e)}")
-
-        # Delete database records
-        await traffic_op.delete_traffic_batch(traffics)
-
-        return DeleteTrafficResponse(
-            message=f"Deleted {len(traffics)} records",
-            deleted_count=len(traffics),
-            image_errors=image_errors
-        )
+    job = await start_traffic_purge(start_date, end_date, camera_id, current_user.id)
+    status_url = str(request.url_for("get_traffic_purge_status", job_id=job["job_id"]))
+    return {"message": "Traffic purge started.", "job_id": job["job_id"], "status_url": status_url}
 
-    except HTTPException as he:
-        raise he
-    except Exception as e:
-        raise HTTPException(500, f"Operation failed: {str(e)}")
+
+@traffic_router.get("/delete/{job_id}", status_code=status.HTTP_200_OK)
+async def get_traffic_purge_status(
+    job_id: str,
+    current_user: UserInDB = Depends(get_admin_user),
+):
+    """
+    Report the progress of a purge job.
+    """
+    job = await get_traffic_purge(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Purge job not found.")
+    return job
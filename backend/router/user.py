@@ -1,19 +1,24 @@
-from fastapi import APIRouter, Depends, status, HTTPException, UploadFile, File, Request
+from fastapi import APIRouter, Depends, status, HTTPException, UploadFile, File, Request, Query
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from pathlib import Path
 from minio.error import S3Error
 from datetime import timedelta
+from typing import Optional
 
 from image_storage.storage_management import StorageFactory
 from settings import settings
 from database.engine import get_db
 # from database.minio_engine import minio_client
 from schema.user import UserCreate, UserPagination, UserUpdate, SelfUserUpdate, UserInDB, ChangePasswordRequest, PasswordUpdate
+from schema.pagination import Pagination
 from crud.user import UserOperation
 from auth.auth import verify_password, get_password_hash
 from auth.authorization import get_admin_user, get_admin_or_staff_user, get_self_or_admin_or_staff_user, get_self_or_admin_user, get_self_user_only
 from utils.middlewares import check_password_changed
+from utils.pagination import COUNT_PATTERN
+from utils.fast_json import fast_response
+from utils.sparse_fields import FIELDS_DESCRIPTION, parse_fields, sparse_model
 
 
 # Define the base URL for serving uploaded files
@@ -84,23 +89,23 @@ async def api_get_all_users(
     request: Request,
     page: int = 1,
     page_size: int = 10,
+    count: str = Query("exact", pattern=COUNT_PATTERN),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     db: AsyncSession = Depends(get_db),
     current_user: UserInDB=Depends(get_admin_or_staff_user)
 ):
     """
     Retrieve all users with pagination.
     """
+    selected = parse_fields(fields, UserInDB)
     user_op = UserOperation(db)
-    result = await user_op.get_all_objects(page, page_size)
+    result = await user_op.get_all_objects(page, page_size, count=count, fields=selected)
     stroragefactory = StorageFactory.get_instance(settings.STORAGE_BACKEND)
-    for user in result["items"]:
-        if user.profile_image:
-            if settings.STORAGE_BACKEND == "minio":
-                filepath = await stroragefactory.get_full_path(Path(user.profile_image))
-                user.profile_image = filepath
-            # user.profile_image_url = f"{request.base_url}{user.profile_image}"
-
-    return result
+    if settings.STORAGE_BACKEND == "minio" and (selected is None or "profile_image" in selected):
+        await stroragefactory.resolve_image_urls(result["items"], "profile_image")
+        # user.profile_image_url = f"{request.base_url}{user.profile_image}"
+
+    return fast_response(result, Pagination[sparse_model(UserInDB, selected)])
 
 
 @user_router.put("/{user_id}", response_model=UserInDB, status_code=status.HTTP_200_OK, dependencies=[Depends(check_password_changed)])
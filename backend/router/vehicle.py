@@ -1,5 +1,5 @@
 from pathlib import Path
-from fastapi import APIRouter, Depends, Request, HTTPException, UploadFile, File, status
+from fastapi import APIRouter, Depends, Request, HTTPException, UploadFile, File, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 
@@ -12,6 +12,7 @@ from schema.user import UserInDB
 from auth.authorization import get_admin_or_staff_user, get_admin_user, get_admin_or_staff_user, get_self_or_admin_or_staff_user, get_self_or_admin_user, get_self_user_only, get_current_active_user
 from utils.middlewares import check_password_changed
 from models.user import UserType
+from utils.pagination import COUNT_PATTERN
 
 
 vehicle_router = APIRouter(
@@ -39,6 +40,7 @@ async def api_get_user_all_vehicles(
     request: Request,
     page: int = 1,
     page_size: int = 10,
+    count: str = Query("exact", pattern=COUNT_PATTERN),
     user_id: Optional[int] = None,
     db: AsyncSession = Depends(get_db),
     current_user: UserInDB=Depends(get_current_active_user)
@@ -51,7 +53,7 @@ async def api_get_user_all_vehicles(
     if user_id:
         # Fetch vehicles for a specific user
         if current_user.user_type in [UserType.ADMIN, UserType.STAFF] or current_user.id == user_id:
-            result = await vehicle_op.get_vehicles_by_user(user_id, page, page_size)
+            result = await vehicle_op.get_vehicles_by_user(user_id, page, page_size, count=count)
         else:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -60,7 +62,7 @@ async def api_get_user_all_vehicles(
     else:
         # Fetch all vehicles (admin/staff only)
         if current_user.user_type in [UserType.ADMIN, UserType.STAFF]:
-            result = await vehicle_op.get_all_objects(page, page_size)
+            result = await vehicle_op.get_all_objects(page, page_size, count=count)
         else:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -68,12 +70,9 @@ async def api_get_user_all_vehicles(
             )
 
     stroragefactory = StorageFactory.get_instance(settings.STORAGE_BACKEND)
-    for vehicle in result["items"]:
-        if vehicle.car_image:
-            if settings.STORAGE_BACKEND == "minio":
-                filepath = await stroragefactory.get_full_path(Path(vehicle.car_image))
-                vehicle.car_image = filepath
-            # vehicle.car_image_url = f"{request.base_url}{vehicle.car_image}"
+    if settings.STORAGE_BACKEND == "minio":
+        await stroragefactory.resolve_image_urls(result["items"], "car_image")
+        # vehicle.car_image_url = f"{request.base_url}{vehicle.car_image}"
     return result
 
 
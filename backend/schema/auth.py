@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 from models.user import UserType
 
@@ -11,3 +11,16 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     personal_number: str
+
+
+class Principal(BaseModel):
+    id: int
+    personal_number: str
+    user_type: UserType
+    is_active: bool
+    password_changed: bool
+    gate_ids: frozenset[int] = frozenset()
+    camera_ids: frozenset[int] = frozenset()
+    lpr_ids: frozenset[int] = frozenset()
+
+    model_config = ConfigDict(frozen=True)
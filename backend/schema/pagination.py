@@ -1,14 +1,15 @@
 from pydantic import BaseModel
-from typing import TypeVar, Generic, List
+from typing import TypeVar, Generic, List, Optional
 
 
 T = TypeVar('T')
 class Pagination(BaseModel, Generic[T]):
     items: List[T]
-    total_records: int
-    total_pages: int
-    current_page: int
+    total_records: Optional[int] = None
+    total_pages: Optional[int] = None
+    current_page: Optional[int] = None
     page_size: int
+    has_next: Optional[bool] = None
 
     class Config:
         from_attributes = True
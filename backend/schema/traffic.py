@@ -34,6 +34,8 @@ class TrafficMeilisearch(BaseModel):
     mid_3: str
     suffix_2: str
     plate_number: str
+    gate_id: Optional[int] = None
+    camera_id: Optional[int] = None
     gate_name: Optional[str] = None
     camera_name: Optional[str] = None
     timestamp: datetime
@@ -47,14 +49,10 @@ class TrafficMeilisearch(BaseModel):
         )
 
 
-class DeleteTrafficResponse(BaseModel):
-    message: str
-    deleted_count: int
-    image_errors: list[str] = []
-
-
 class TrafficInDB(TrafficBase):
     id: int
+    gate_id: Optional[int] = None
+    camera_id: Optional[int] = None
     gate_name: str
     camera_name: str
     plate_image_url: Optional[str] = None
@@ -1,3 +1,4 @@
+import asyncio
 from meilisearch import Client
 from meilisearch.errors import MeilisearchError
 from meilisearch.index import Index
@@ -73,46 +74,61 @@ class BaseSearchService(Generic[T]):
         except MeilisearchError as e:
             print(f"Meilisearch delete error for {self.index_name}: {e}")
 
+    async def delete_documents(self, doc_ids: List[int]) -> None:
+        if not doc_ids:
+            return
+        try:
+            index = await self._get_index()
+            index.delete_documents(doc_ids)
+            await redis_cache.invalidate_model(self.index_name)
+        except MeilisearchError as e:
+            print(f"Meilisearch delete error for {self.index_name}: {e}")
+
     async def search(
         self,
         query: str,
         filters: Optional[str] = None,
         limit: int = 10,
         offset: int = 0,
-        highlight: bool = True
+        highlight: bool = True,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
+        """
+        Search the index through the Redis cache. Expired entries are served
+        stale while one request refreshes them, and concurrent misses share a
+        single Meilisearch call. With use_cache=False the cached entry is
+        bypassed and replaced by the fresh result.
+        """
         try:
             if filters and ":" in filters:
                 filters = filters.replace(":", "=")
 
-            cache_key = await redis_cache.generate_key(
+            cache_key = await redis_cache.model_key(
                 self.index_name,
                 query,
                 filters,
                 limit,
-                offset
+                offset,
+                highlight
             )
 
-            # Try cache first
-            if cached := await redis_cache.get(cache_key):
-                return cached
-
-            index = await self._get_index()
-            params = {
-                "limit": limit,
-                "offset": offset,
-                "attributesToSearchOn": self.searchable_attributes,
-                "filter": filters,
-                "attributesToHighlight": ["*"] if highlight else []
-            }
-            result = index.search(query, params)
-            result_data = {
-                "items": [jsonable_encoder(self.schema_model(**hit)) for hit in result["hits"]],
-                "total": result["estimatedTotalHits"],
-                "query": result["query"]
-            }
-            await redis_cache.set(cache_key, result_data)
-            return result_data
+            async def run_search() -> Dict[str, Any]:
+                index = await self._get_index()
+                params = {
+                    "limit": limit,
+                    "offset": offset,
+                    "attributesToSearchOn": self.searchable_attributes,
+                    "filter": filters,
+                    "attributesToHighlight": ["*"] if highlight else []
+                }
+                result = await asyncio.to_thread(index.search, query, params)
+                return {
+                    "items": [jsonable_encoder(self.schema_model(**hit)) for hit in result["hits"]],
+                    "total": result["estimatedTotalHits"],
+                    "query": result["query"]
+                }
+
+            return await redis_cache.get_or_compute(cache_key, run_search, refresh=not use_cache)
 
         except MeilisearchError as e:
             print(f"Meilisearch search error for {self.index_name}: {e}")
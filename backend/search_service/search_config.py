@@ -139,6 +139,6 @@ traffic_search = BaseSearchService[TrafficInDB](
         "camera_name",
         "access_granted"
     ],
-    filterable_attributes=["gate_name", "camera_name"],
+    filterable_attributes=["gate_id", "camera_id", "gate_name", "camera_name"],
     sortable_attributes=["timestamp"]
 )
@@ -11,6 +11,7 @@ class Settings(BaseSettings):
     POSTGRES_PORT: int=5432
     SECRET_KEY: Optional[str] = None
     ACCESS_TOKEN_EXPIRE_MINUTES: int=120
+    PRINCIPAL_CACHE_TTL: int=60
     ALGORITHM: Optional[str] = None
     ADMIN_PERSONAL_NUMBER: Optional[str] = None
     ADMIN_NATIONAL_ID: Optional[str] = None
@@ -28,6 +29,18 @@ class Settings(BaseSettings):
     MINIO_PROFILE_IMAGE_BUCKET: Optional[str] = None
     MINIO_FULL_IMAGE_BUCKET: Optional[str] = None
     MINIO_PLATE_IMAGE_BUCKET: Optional[str] = None
+    # Presigned link cache: links are reused while valid this many more seconds
+    PRESIGNED_URL_CACHE_SIZE: int=10000
+    PRESIGNED_URL_MIN_REMAINING: int=900
+    # "legacy": one bucket per camera per hour; "typed": one per image type.
+    # Switch to "typed" only after image_storage.migrate_buckets has moved the
+    # existing objects, or their links break
+    MINIO_BUCKET_LAYOUT: str="legacy"
+    # Threads for blocking MinIO calls; keep below the client's pool of 10
+    MINIO_IO_WORKERS: int=8
+    # Store images under the SHA-256 of their bytes, deduplicated and refcounted
+    IMAGE_CONTENT_ADDRESSED: bool=False
+    IMAGE_IMMUTABLE_MAX_AGE: int=31536000
     CLIENT_KEY_PATH: Optional[str] = None
     CLIENT_CERT_PATH: Optional[str] = None
     CA_CERT_PATH: Optional[str] = None
@@ -37,6 +50,10 @@ class Settings(BaseSettings):
     NATS_KEY_PATH: str
     NATS_USER: str
     NATS_PASS: str
+    # Subject carrying committed-write events between API and NATS workers
+    INVALIDATION_SUBJECT: str="cache.invalidate"
+    # NATS worker: seconds a plate's owner lookup is reused
+    OWNER_CACHE_TTL: int=300
     NAT_SERVER: str
     TLS_HOSTNAME: str
     BASE_UPLOAD_DIR: str
@@ -49,22 +66,58 @@ class Settings(BaseSettings):
     MEILI_MASTER_KEY: str
     REDIS_URL: str
     CACHE_TTL: int
+    # Stale-while-revalidate: seconds a value is still served after CACHE_TTL,
+    # and the per-key refresh lock (seconds held / seconds waited for)
+    CACHE_STALE_GRACE: int=60
+    CACHE_LOCK_TTL: int=10
+    CACHE_LOCK_WAIT: float=3.0
+    # Read-through cache of configuration list endpoints (kept well below
+    # the one-hour MinIO presigned URL lifetime embedded in some responses)
+    CONFIG_CACHE_TTL: int=300
     MAX_REQUESTS_PER_MINUTE: int
     BLOCK_TIME: int
     MAX_FAILED_ATTEMPTS: int
     FAILED_ATTEMPTS_EXPIRATION: int
     REQUEST_EXPIRATION: int
+    RATE_LIMIT_LOCAL_BUCKET: bool=True
     ENV: str
     LOG_DIR: str
     LOG_BACKEND: str
     ELASTIC_HOSTS: str
     ELASTIC_INDEX: str
+    LOG_MAX_CAPTURED_BODY: int=4096
+    LOG_BODY_SAMPLE_RATE: float=1.0
     # OpenSearch Config
     OPENSEARCH_HOST: str
     OPENSEARCH_PORT: int=9200
     OPENSEARCH_USER: str
     OPENSEARCH_PASSWORD: str
     OPENSEARCH_INDEX: str
+    # Traffic partitioning: months created ahead, months kept (0 keeps everything)
+    TRAFFIC_PARTITION_MONTHS_AHEAD: int=2
+    TRAFFIC_RETENTION_MONTHS: int=0
+    # Paginated lists: "estimated" counts below this are recounted exactly
+    COUNT_ESTIMATE_EXACT_BELOW: int=1000
+    # Per-request SQL statement counting (X-Query-Count header)
+    QUERY_COUNT_HEADER: bool=False
+    QUERY_COUNT_WARN_THRESHOLD: int=20
+    # Response compression: bodies below this many bytes are sent as-is
+    RESPONSE_COMPRESSION_MIN_SIZE: int=1024
+    RESPONSE_GZIP_LEVEL: int=6
+    RESPONSE_BROTLI_QUALITY: int=4
+    # Traffic export jobs
+    EXPORT_BATCH_SIZE: int=500
+    EXPORT_PARQUET_ROW_GROUP_SIZE: int=100000
+    EXPORT_ARTIFACT_TTL: int=86400
+    # Running jobs heartbeat this often; silent for EXPORT_STALE_AFTER means failed
+    EXPORT_HEARTBEAT_INTERVAL: int=15
+    EXPORT_STALE_AFTER: int=120
+    # Traffic purge jobs
+    PURGE_CHUNK_SIZE: int=5000
+    PURGE_LOCK_TTL: int=300
+    PURGE_STATE_TTL: int=604800
+    # Socket.IO last-known state replay
+    SOCKET_PLATE_HISTORY_SIZE: int=20
 
     class Config:
         env_file = "backend/.env"
@@ -8,18 +8,23 @@ from nats.aio.client import Client as NATS
 from socketio import AsyncServer
 from datetime import datetime, timezone
 from heapq import heappush, heappop
+from sqlalchemy import or_
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
 
 from settings import settings
 # from database.engine import async_session
 from database.engine import nats_session
-from models.user import DBUser, UserType
+from models.user import UserType
+from auth.principal import principal_cache
+from utils.invalidation_bus import invalidation_bus
 from models.camera import DBCamera
+from models.gate import DBGate
 from shared_resources import connections
 from nats_consumer.nats_setup import create_ssl_context, connect_to_nats_server
 from nats_consumer.handlers import _create_command_message, handle_message
 from nats_consumer.heartbeatmanager import HeartbeatManager
+from nats_consumer.state_cache import StateCache
 
 heartbeatManager: HeartbeatManager =None
 
@@ -27,6 +32,28 @@ logger = logging.getLogger(__name__)
 
 nats_client: NATS = None
 
+state_cache = StateCache(plate_history_size=settings.SOCKET_PLATE_HISTORY_SIZE)
+
+# Events whose room key is a camera id, and those keyed by an LPR id
+CAMERA_STATE_EVENTS = ("camera_connection", "plates_data")
+LPR_STATE_EVENTS = ("resources", "heartbeat")
+
+
+def forget_state(table, object_id):
+    """
+    Invalidation handler: stop replaying state for a camera or LPR that was
+    changed or deleted; the next event from a live device records it again.
+    """
+    if object_id is None:
+        return
+    if table == "cameras":
+        state_cache.forget(object_id, CAMERA_STATE_EVENTS)
+    elif table == "lprs":
+        state_cache.forget(object_id, LPR_STATE_EVENTS)
+
+
+invalidation_bus.register(forget_state)
+
 async def connect_to_nats():
     ssl_ctx = await create_ssl_context(
         settings.NATS_CA_PATH,
@@ -46,6 +73,8 @@ async def connect_to_nats():
     await nats_client.subscribe("socketio.*", cb=on_message)
     print("Subscribed to 'authenticate' subject.")
 
+    await invalidation_bus.attach(nats_client)
+
 
 sio = AsyncServer(
     async_mode="asgi",  # Use ASGI mode for FastAPI compatibility
@@ -127,10 +156,7 @@ async def validate_and_get_user(token: str):
         if not personal_number:
             raise ValueError("Invalid token: Missing 'sub'")
         async with nats_session() as session:
-            query = await session.execute(
-                select(DBUser).where(DBUser.personal_number == personal_number)
-            )
-            user = query.scalar_one_or_none()
+            user = await principal_cache.get_or_load(session, personal_number)
             if not user:
                 raise ValueError("User not found")
             return user
@@ -194,6 +220,75 @@ async def disconnect(sid):
     logger.info(f"Client {sid} disconnected")
 
 
+# Room suffix and acknowledged data_type for every subscribable request_type
+ROOM_SUFFIXES = {
+    "resources": "resources",
+    "heartbeat": "heartbeat",
+    "camera_connection": "camera_connection",
+    "live": "live",
+    "plates_data": "plate",
+}
+# These rooms are keyed by LPR id rather than camera id
+LPR_REQUEST_TYPES = ("resources", "heartbeat", "camera_connection")
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple, set)):
+        return list(value)
+    return [value]
+
+
+def _parse_ids(data, plural_key, singular_key):
+    """Read a list of ids (or a single id) from the event payload."""
+    return {int(value) for value in _as_list(data.get(plural_key, data.get(singular_key)))}
+
+
+async def _expand_wildcards(gate_ids, building_ids):
+    """Resolve gate/building wildcards to (camera_id, lpr_id) pairs with a single query."""
+    if not gate_ids and not building_ids:
+        return []
+
+    conditions = []
+    if gate_ids:
+        conditions.append(DBCamera.gate_id.in_(gate_ids))
+    if building_ids:
+        conditions.append(DBGate.building_id.in_(building_ids))
+
+    async with nats_session() as session:
+        query = await session.execute(
+            select(DBCamera.id, DBCamera.lpr_id)
+            .join(DBGate, DBCamera.gate_id == DBGate.id)
+            .where(or_(*conditions))
+        )
+        return query.all()
+
+
+async def _resolve_subscription_targets(data):
+    """
+    Turn a (un)subscribe payload into {request_type: {ids}}.
+    Accepts single values or lists for request_type/camera_id and
+    gate_id/building_id wildcards that expand to every camera below them.
+    """
+    request_types = _as_list(data.get("request_types", data.get("request_type")))
+    camera_ids = _parse_ids(data, "camera_ids", "camera_id")
+    gate_ids = _parse_ids(data, "gate_ids", "gate_id")
+    building_ids = _parse_ids(data, "building_ids", "building_id")
+
+    wildcard_rows = await _expand_wildcards(gate_ids, building_ids)
+    wildcard_camera_ids = {camera_id for camera_id, _ in wildcard_rows}
+    wildcard_lpr_ids = {lpr_id for _, lpr_id in wildcard_rows if lpr_id is not None}
+
+    targets = {}
+    for request_type in request_types:
+        if request_type in LPR_REQUEST_TYPES:
+            targets[request_type] = (camera_ids, wildcard_lpr_ids)
+        else:
+            targets[request_type] = (camera_ids, wildcard_camera_ids)
+    return targets
+
+
 @sio.event
 async def subscribe(sid, data):
     if not await session_mgr.is_token_valid(sid):
@@ -206,95 +301,101 @@ async def subscribe(sid, data):
         await sio.emit("error", {"message": "Unauthorized"}, to=sid)
         await sio.disconnect(sid)
         return
-    request_type = data.get("request_type")
-    camera_id = data.get("camera_id")
-
 
-    if not camera_id and request_type in ["live", "plates_data"]:
-        await sio.emit("error", {"message": "camera_id is required for this request_type"}, to=sid)
-        return
+    # Re-read the cached principal so gate/camera changes apply to open sockets
+    async with nats_session() as session:
+        user = await principal_cache.get_or_load(session, user.personal_number) or user
 
-    if user.user_type == UserType.VIEWER:
-        async with nats_session() as session:
-            query = await session.execute(
-                select(DBCamera).where(DBCamera.id == int(camera_id)).options(selectinload(DBCamera.gate))
-            )
-            camera = query.scalar_one_or_none()
-            if not camera:
-                await sio.emit("error", {"message": "Camera not found"}, to=sid)
-                return
-            if camera.gate.id not in [gate.id for gate in user.gates]:
-                await sio.emit("error", {"message": "Access denied to this camera"}, to=sid)
-                return
-
-    # Use distinct rooms for different data types
-    if request_type == "resources":
-        await sio.enter_room(sid, f"camera-{camera_id}-resources")
-        logger.info(f"Client {sid} subscribed to resources")
-        await sio.emit("request_acknowledged", {"status": "subscribed", "data_type": "resources"}, to=sid)
+    try:
+        targets = await _resolve_subscription_targets(data)
+    except (TypeError, ValueError):
+        await sio.emit("error", {"message": "camera_id, gate_id and building_id must be integers"}, to=sid)
         return
 
-    elif request_type == "heartbeat":
-        await sio.enter_room(sid, f"camera-{camera_id}-heartbeat")
-        logger.info(f"Client {sid} subscribed to heartbeat data")
-        await sio.emit('request_acknowledged', {"status": "subscribed", "data_type": "heartbeat"}, to=sid)
+    if not targets:
+        await sio.emit('error', {'message': 'Invalid request_type'}, to=sid)
         return
 
+    for request_type, (explicit_ids, wildcard_ids) in targets.items():
+        if request_type == "recording":
+            logger.error("[ERROR] Cannot send command: Client not authenticated or connected.")
+            continue
+        if request_type not in ROOM_SUFFIXES:
+            await sio.emit('error', {'message': f'Invalid request_type: {request_type}'}, to=sid)
+            continue
+
+        if user.user_type == UserType.VIEWER:
+            permitted = user.lpr_ids if request_type in LPR_REQUEST_TYPES else user.camera_ids
+            denied = explicit_ids - permitted
+            if denied:
+                await sio.emit("error", {"message": "Access denied to this camera", "camera_ids": sorted(denied)}, to=sid)
+            # Wildcards silently narrow to what the viewer may see
+            ids = (explicit_ids | wildcard_ids) & permitted
+        else:
+            ids = explicit_ids | wildcard_ids
+
+        if not ids:
+            await sio.emit("error", {"message": "camera_id is required for this request_type"}, to=sid)
+            continue
+
+        if request_type == "live":
+            for camera_id in ids:
+                await _handle_camera_subscription(sid, camera_id, request_type, data)
+
+        suffix = ROOM_SUFFIXES[request_type]
+        await asyncio.gather(*(sio.enter_room(sid, f"camera-{camera_id}-{suffix}") for camera_id in ids))
+        logger.info(f"Client {sid} subscribed to {request_type} for {len(ids)} camera(s)")
+        await sio.emit(
+            "request_acknowledged",
+            {"status": "subscribed", "data_type": suffix, "camera_ids": sorted(ids)},
+            to=sid,
+        )
 
-
-    elif request_type == "camera_connection":
-        await sio.enter_room(sid, f"camera-{camera_id}-camera_connection")
-        logger.info(f"Client {sid} subscribed to camera_connection data")
-        await sio.emit('request_acknowledged', {"status": "subscribed", "data_type": "camera_connection"}, to=sid)
-
-    elif request_type == "live":
-        await _handle_camera_subscription(sid, camera_id, request_type, data)
-        await sio.enter_room(sid, f"camera-{camera_id}-live")
-        await sio.emit('request_acknowledged', {"status": "subscribed", "data_type": "live"}, to=sid)
-
-    elif request_type == "plates_data":
-        await sio.enter_room(sid, f"camera-{camera_id}-plate")
-        await sio.emit('request_acknowledged', {"status": "subscribed", "data_type": "plate"}, to=sid)
-
-    elif request_type == "recording":
-        logger.error("[ERROR] Cannot send command: Client not authenticated or connected.")
-
-    else:
-        await sio.emit('error', {'message': 'Invalid request_type'}, to=sid)
+        if request_type != "live":
+            for camera_id in ids:
+                await _replay_state(sid, request_type, camera_id)
 
 
 @sio.event
 async def unsubscribe(sid, data):
     """
-    Event triggered when a client wants to unsubscribe from a specific data stream.
+    Event triggered when a client wants to unsubscribe from one or more data streams.
     """
-    request_type = data.get("request_type")
-    camera_id = data.get("camera_id")
+    try:
+        targets = await _resolve_subscription_targets(data)
+    except (TypeError, ValueError):
+        await sio.emit("error", {"message": "camera_id, gate_id and building_id must be integers"}, to=sid)
+        return
 
-    if not request_type or not camera_id:
+    if not targets:
         await sio.emit("error", {"message": "Invalid request. 'request_type' and 'camera_id' are required."}, to=sid)
         return
 
-    # Determine the room name based on the request type
-    room_name = None
-    if request_type == "resources":
-        room_name = f"camera-{camera_id}-resources"
-    elif request_type == "heartbeat":
-        room_name = f"camera-{camera_id}-heartbeat"
-    elif request_type == "camera_connection":
-        room_name = f"camera-{camera_id}-camera_connection"
-    elif request_type == "live":
-        room_name = f"camera-{camera_id}-live"
-    elif request_type == "plates_data":
-        room_name = f"camera-{camera_id}-plate"
-    else:
-        await sio.emit("error", {"message": f"Unknown request_type: {request_type}"}, to=sid)
-        return
+    for request_type, (explicit_ids, wildcard_ids) in targets.items():
+        if request_type not in ROOM_SUFFIXES:
+            await sio.emit("error", {"message": f"Unknown request_type: {request_type}"}, to=sid)
+            continue
+
+        ids = explicit_ids | wildcard_ids
+        if not ids:
+            await sio.emit("error", {"message": "Invalid request. 'request_type' and 'camera_id' are required."}, to=sid)
+            continue
+
+        # Leave the rooms
+        suffix = ROOM_SUFFIXES[request_type]
+        await asyncio.gather(*(sio.leave_room(sid, f"camera-{camera_id}-{suffix}") for camera_id in ids))
+        logger.info(f"Client {sid} unsubscribed from {request_type} data for camera_ids {sorted(ids)}")
+        await sio.emit(
+            "unsubscribe_acknowledged",
+            {"status": "unsubscribed", "data_type": request_type, "camera_ids": sorted(ids)},
+            to=sid,
+        )
 
-    # Leave the room
-    await sio.leave_room(sid, room_name)
-    logger.info(f"Client {sid} unsubscribed from {request_type} data for camera_id {camera_id}")
-    await sio.emit("unsubscribe_acknowledged", {"status": "unsubscribed", "data_type": request_type}, to=sid)
+
+async def _replay_state(sid, event_name, camera_id):
+    """Send the last known state for a camera/LPR to a freshly subscribed client."""
+    for data in state_cache.snapshot(event_name, camera_id):
+        await sio.emit(event_name, data, to=sid)
 
 
 async def stop_workers():
@@ -304,27 +405,36 @@ async def stop_workers():
 
 
 async def emit_to_requested_sids(event_name, data, camera_id=None):
-    if event_name not in ["resources", "heartbeat"]:
+    if event_name == "camera_connection":
+        # Connection status is reported per LPR and carries no camera_id
+        camera_id = data.get("camera_id") or data.get("lpr_id")
+        if not camera_id:
+            return
+    elif event_name not in ["resources", "heartbeat"]:
         camera_id = data.get("camera_id")
         if not camera_id:
             return
 
     if event_name == "resources":
         lpr_id = data["lpr_id"]
+        state_cache.record("resources", lpr_id, data)
         await sio.emit("resources", data, room=f"camera-{lpr_id}-resources")
     elif event_name == "heartbeat":
         lpr_id = data["lpr_id"]
         await heartbeatManager.handle_heartbeat(data)
+        state_cache.record("heartbeat", lpr_id, data)
         await sio.emit("heartbeat", data, room=f"camera-{lpr_id}-heartbeat")
         logger.info(f"Emitted heartbeat to all subscribed clients")
 
     elif event_name == "camera_connection":
+        state_cache.record("camera_connection", camera_id, data)
         await sio.emit("camera_connection", data, room=f"camera-{camera_id}-camera_connection")
         logger.info(f"Emitted camera_connection to all subscribed clients")
     # Emit to the appropriate room based on data_type
     if event_name == "live":
         await sio.emit("live", data, room=f"camera-{camera_id}-live")
     elif event_name == "plates_data":
+        state_cache.record("plates_data", camera_id, data)
         await sio.emit("plates_data", data, room=f"camera-{camera_id}-plate")
     else:
         logger.warning(f"[WARNING] Unknown data_type {event_name}. No emission done.")
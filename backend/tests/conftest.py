@@ -0,0 +1,107 @@
+"""
+Database fixtures for checks that need PostgreSQL.
+
+Point TEST_DATABASE_URL at a migrated database (postgresql+asyncpg://...);
+tests using db_session are skipped without it. Every test runs inside a
+transaction that is rolled back, and commits made by crud methods become
+savepoints within it.
+"""
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from models.building import DBBuilding
+from models.camera import DBCamera
+from models.camera_setting import DBCameraSettingInstance
+from models.gate import DBGate
+from models.key import DBRelayKey
+from models.lpr import DBLpr
+from models.lpr_setting import DBLprSettingInstance
+from models.relay import DBRelay
+from models.status import DBStatus
+from models.user import DBGuest, DBUser, UserType
+from models.vehicle import DBVehicle
+from utils.query_counter import install_query_counter
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def db_session():
+    url = os.environ.get("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL is not set")
+
+    engine = create_async_engine(url)
+    install_query_counter(engine)
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        session = AsyncSession(bind=connection, expire_on_commit=False, join_transaction_mode="create_savepoint")
+        try:
+            yield session
+        finally:
+            await session.close()
+            await transaction.rollback()
+    await engine.dispose()
+
+
+@pytest.fixture
+async def seeded(db_session):
+    """
+    A small site with several rows behind every list relationship, so an
+    unbounded selectin fan-out shows up as extra statements. Returns the ids
+    the sub-list methods are called with.
+    """
+    status = DBStatus(name="test-open")
+    building = DBBuilding(name="test-building", latitude="0", longitude="0")
+    lpr = DBLpr(name="test-lpr", ip="10.0.0.1", port=1, auth_token="token", latitude="0", longitude="0")
+    gates = [DBGate(name=f"test-gate-{i}", building=building) for i in range(3)]
+    cameras = [
+        DBCamera(name=f"test-camera-{i}", latitude="0", longitude="0", gate=gates[i % 3], lpr=lpr)
+        for i in range(6)
+    ]
+    for camera in cameras:
+        camera.settings = [DBCameraSettingInstance(name=f"setting-{i}", value="1") for i in range(3)]
+    lpr.settings = [DBLprSettingInstance(name=f"setting-{i}", value="1") for i in range(3)]
+
+    users = [
+        DBUser(
+            personal_number=f"test-{i}", national_id=f"test-{i}", hashed_password="x",
+            user_type=UserType.USER, gates=gates, accessible_gates=gates,
+            vehicles=[DBVehicle(plate_number=f"test-{i}-{v}") for v in range(2)],
+        )
+        for i in range(5)
+    ]
+    guests = [
+        DBGuest(
+            inviting_user=users[0], end_date=datetime.now(timezone.utc) + timedelta(days=1), gates=gates,
+            vehicles=[DBVehicle(plate_number=f"test-guest-{i}")],
+        )
+        for i in range(3)
+    ]
+    relays = [DBRelay(name=f"test-relay-{i}", ip="10.0.0.2", port=1, number_of_keys=4, gate=gates[i]) for i in range(3)]
+    for relay in relays:
+        relay.keys = [
+            DBRelayKey(key_number=k, status=status, camera=cameras[k])
+            for k in range(4)
+        ]
+
+    db_session.add_all([status, building, lpr, *gates, *cameras, *users, *guests, *relays])
+    await db_session.flush()
+    ids = {
+        "building_id": building.id,
+        "gate_id": gates[0].id,
+        "gate_ids": [gate.id for gate in gates],
+        "camera_id": cameras[0].id,
+        "lpr_id": lpr.id,
+        "relay_id": relays[0].id,
+        "user_id": users[0].id,
+    }
+    # Start the measured calls from an empty identity map
+    db_session.expunge_all()
+    return ids
@@ -0,0 +1,40 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.future import select
+
+from crud.camera import CameraOperation
+from models.camera import DBCamera
+from utils.pagination import Explain, count_query
+
+
+def test_explain_binds_in_lists():
+    query = select(DBCamera).where(DBCamera.gate_id.in_([1, 2, 3]))
+    compiled = Explain(query).compile(
+        dialect=postgresql.dialect(), compile_kwargs={"render_postcompile": True}
+    )
+    sql = str(compiled)
+
+    assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT")
+    assert "POSTCOMPILE" not in sql
+    assert sorted(compiled.params.values()) == [1, 2, 3]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("count", ["exact", "estimated", "none"])
+async def test_viewer_camera_list_counts(db_session, seeded, count):
+    result = await CameraOperation(db_session).get_objects_by_gate_ids(seeded["gate_ids"], 1, 2, count=count)
+
+    assert len(result["items"]) == 2
+    assert result["has_next"] is True
+    if count == "none":
+        assert result["total_records"] is None
+    else:
+        # Below COUNT_ESTIMATE_EXACT_BELOW the estimate is recounted exactly
+        assert result["total_records"] == 6
+
+
+@pytest.mark.anyio
+async def test_estimated_count_with_in(db_session, seeded):
+    query = select(DBCamera).where(DBCamera.gate_id.in_(seeded["gate_ids"]))
+
+    assert await count_query(db_session, query, "estimated") == 6
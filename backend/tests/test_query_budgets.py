@@ -0,0 +1,81 @@
+"""
+Statement budgets for the list endpoints' crud methods.
+
+Each ceiling is COUNT(*) + the page itself + one statement per relationship
+the list profile eager-loads with selectin, so it holds for any number of
+rows. A relationship left to its model's lazy="selectin" default (or an N+1
+in a serializer) pushes a list over its budget. Validating the page against
+the endpoint's response schema checks that the profile still loads
+everything the response renders, since anything else raises.
+"""
+import pytest
+
+from crud.building import BuildingOperation
+from crud.camera import CameraOperation
+from crud.gate import GateOperation
+from crud.guest import GuestOperation
+from crud.key import KeyOperation
+from crud.lpr import LprOperation
+from crud.relay import RelayOperation
+from crud.status import StatusOperation
+from crud.user import UserOperation
+from crud.vehicle import VehicleOperation
+from schema.building import BuildingPagination
+from schema.camera import CameraPagination
+from schema.camera_setting import CameraSettingInstancePagination
+from schema.gate import GatePagination
+from schema.guest import GuestPagination
+from schema.key import KeyPagination
+from schema.lpr import LprPagination
+from schema.lpr_setting import LprSettingInstancePagination
+from schema.relay import RelayPagination
+from schema.status import StatusPagination
+from schema.user import UserPagination
+from schema.vehicle import VehiclePagination
+from utils.query_counter import count_queries
+
+
+pytestmark = pytest.mark.anyio
+
+# (name, call(session, ids), response schema, statement ceiling)
+LIST_BUDGETS = [
+    ("buildings", lambda db, ids: BuildingOperation(db).get_all_objects(1, 100), BuildingPagination, 3),
+    ("building gates", lambda db, ids: BuildingOperation(db).get_building_all_gates(ids["building_id"], 1, 100), GatePagination, 4),
+    ("gates", lambda db, ids: GateOperation(db).get_all_objects(1, 100), GatePagination, 4),
+    ("gate cameras", lambda db, ids: GateOperation(db).get_gate_all_cameras(ids["gate_id"], 1, 100), CameraPagination, 3),
+    ("cameras", lambda db, ids: CameraOperation(db).get_all_objects(1, 100), CameraPagination, 3),
+    ("viewer cameras", lambda db, ids: CameraOperation(db).get_objects_by_gate_ids(ids["gate_ids"], 1, 100), CameraPagination, 3),
+    ("camera settings", lambda db, ids: CameraOperation(db).get_camera_all_settings(ids["camera_id"], 1, 100), CameraSettingInstancePagination, 2),
+    ("lprs", lambda db, ids: LprOperation(db).get_all_objects(1, 100), LprPagination, 4),
+    ("lpr cameras", lambda db, ids: LprOperation(db).get_lpr_all_cameras(ids["lpr_id"], 1, 100), CameraPagination, 3),
+    ("lpr settings", lambda db, ids: LprOperation(db).get_lpr_all_settings(ids["lpr_id"], 1, 100), LprSettingInstancePagination, 2),
+    ("relays", lambda db, ids: RelayOperation(db).get_all_objects(1, 100), RelayPagination, 3),
+    ("relay keys", lambda db, ids: RelayOperation(db).get_relay_all_keys(ids["relay_id"], 1, 100), KeyPagination, 4),
+    ("keys", lambda db, ids: KeyOperation(db).get_all_objects(1, 100), KeyPagination, 4),
+    ("statuses", lambda db, ids: StatusOperation(db).get_all_objects(1, 100), StatusPagination, 2),
+    ("users", lambda db, ids: UserOperation(db).get_all_objects(1, 100), UserPagination, 5),
+    ("guests", lambda db, ids: GuestOperation(db).get_all_objects(1, 100), GuestPagination, 4),
+    ("vehicles", lambda db, ids: VehicleOperation(db).get_all_objects(1, 100), VehiclePagination, 2),
+    ("user vehicles", lambda db, ids: VehicleOperation(db).get_vehicles_by_user(ids["user_id"], 1, 100), VehiclePagination, 2),
+]
+
+
+@pytest.mark.parametrize(
+    "call, schema, budget",
+    [case[1:] for case in LIST_BUDGETS],
+    ids=[case[0] for case in LIST_BUDGETS],
+)
+async def test_list_query_budget(db_session, seeded, call, schema, budget):
+    with count_queries() as queries:
+        result = await call(db_session, seeded)
+
+    assert result["items"], "the seeded rows should be listed"
+    assert queries.count <= budget, f"{queries.count} statements, budget {budget}"
+    schema.model_validate(result)
+
+
+async def test_sparse_user_list_skips_unrequested_relationships(db_session, seeded):
+    with count_queries() as queries:
+        await UserOperation(db_session).get_all_objects(1, 100, fields=("id", "first_name", "vehicles"))
+
+    assert queries.count <= 3
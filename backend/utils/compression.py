@@ -0,0 +1,104 @@
+import gzip
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+from settings import settings
+
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    The preferred encoding we support from an Accept-Encoding header: br over
+    gzip at equal quality, None if the client accepts neither.
+    """
+    offered = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        offered[coding.strip().lower()] = quality
+
+    wildcard = offered.get("*", 0.0)
+    candidates = [("br", 2), ("gzip", 1)] if brotli is not None else [("gzip", 1)]
+    best, best_rank = None, (0.0, 0)
+    for coding, preference in candidates:
+        quality = offered.get(coding, wildcard)
+        if quality > 0 and (quality, preference) > best_rank:
+            best, best_rank = coding, (quality, preference)
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.RESPONSE_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.RESPONSE_GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI middleware compressing large response bodies with brotli or
+    gzip, whichever the client prefers.
+
+    Only responses sent in a single body message are compressed; streamed
+    responses (file downloads, exports) and bodies under
+    RESPONSE_COMPRESSION_MIN_SIZE pass through untouched.
+    """
+    def __init__(self, app, minimum_size: int = None) -> None:
+        self.app = app
+        self.minimum_size = minimum_size if minimum_size is not None else settings.RESPONSE_COMPRESSION_MIN_SIZE
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+
+        async def send_compressed(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=list(start.get("headers", ())))
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+            ):
+                await send(start)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send({**start, "headers": headers.raw})
+            await send({**message, "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
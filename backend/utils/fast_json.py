@@ -0,0 +1,32 @@
+from typing import Iterable, Optional, Type
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+def shape_row(obj, fields: Iterable[str]) -> dict:
+    """
+    Plain dict of the given attributes of an ORM row, with no validation.
+    Only for flat schemas whose fields are columns or simple attributes.
+    """
+    return {name: getattr(obj, name, None) for name in fields}
+
+
+def shape_rows(objects, schema: Type[BaseModel]) -> list[dict]:
+    fields = tuple(schema.model_fields)
+    return [shape_row(obj, fields) for obj in objects]
+
+
+def fast_response(content, response_model: Optional[Type[BaseModel]] = None, **kwargs) -> ORJSONResponse:
+    """
+    Serialize a response with orjson instead of FastAPI's default encoder.
+
+    With a response_model the content is validated and dumped once by
+    pydantic-core; without one it must already be shaped into dicts, lists
+    and orjson-native values (datetime, enum, UUID, ...). FastAPI passes a
+    returned Response through untouched, so a route can keep its
+    response_model for the OpenAPI schema without paying for it twice.
+    """
+    if response_model is not None:
+        content = response_model.model_validate(content).model_dump()
+    return ORJSONResponse(content, **kwargs)
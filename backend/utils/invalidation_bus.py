@@ -0,0 +1,70 @@
+import json
+import logging
+import uuid
+from typing import Callable, Optional
+
+from settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+# handler(table_name, object_id) evicting whatever a process caches from that table
+InvalidationHandler = Callable[[str, Optional[int]], None]
+
+
+class InvalidationBus:
+    """
+    Fan committed writes out to every process over a NATS subject.
+
+    A write is applied to this process's handlers straight away and then
+    published as {"table", "id", "origin"}; every other process subscribed to
+    the subject runs its own handlers when the event arrives. Without a NATS
+    connection (scripts, or before connect) only local handlers run.
+    """
+    def __init__(self, subject: str) -> None:
+        self.subject = subject
+        self.origin = uuid.uuid4().hex
+        self.handlers: list[InvalidationHandler] = []
+        self.nats_client = None
+
+    def register(self, handler: InvalidationHandler) -> None:
+        if handler not in self.handlers:
+            self.handlers.append(handler)
+
+    def _dispatch(self, table: str, object_id: Optional[int]) -> None:
+        for handler in self.handlers:
+            try:
+                handler(table, object_id)
+            except Exception as e:
+                logger.error(f"Invalidation handler {handler} failed for {table}:{object_id}: {e}")
+
+    async def attach(self, nats_client) -> None:
+        """
+        Publish through and listen on an established NATS connection.
+        """
+        self.nats_client = nats_client
+        await nats_client.subscribe(self.subject, cb=self._on_message)
+        logger.info(f"Listening for cache invalidations on '{self.subject}'.")
+
+    async def _on_message(self, msg) -> None:
+        try:
+            event = json.loads(msg.data.decode())
+        except ValueError:
+            logger.warning(f"Malformed invalidation event: {msg.data!r}")
+            return
+        if event.get("origin") == self.origin:
+            return
+        self._dispatch(event["table"], event.get("id"))
+
+    async def publish(self, table: str, object_id: Optional[int] = None) -> None:
+        self._dispatch(table, object_id)
+        if self.nats_client is None or not self.nats_client.is_connected:
+            return
+        payload = json.dumps({"table": table, "id": object_id, "origin": self.origin})
+        try:
+            await self.nats_client.publish(self.subject, payload.encode())
+        except Exception as e:
+            logger.error(f"Failed to publish invalidation for {table}:{object_id}: {e}")
+
+
+invalidation_bus = InvalidationBus(settings.INVALIDATION_SUBJECT)
@@ -1,12 +1,16 @@
-from fastapi import FastAPI, Request, HTTPException, Depends, status
-from slowapi.util import get_remote_address
+from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi.responses import JSONResponse
+from collections import OrderedDict
 from redis import asyncio as aioredis
 from dotenv import load_dotenv
 import os
+import math
+import time
+import uuid
 import logging
 
 from settings import settings
-from schema.user import UserInDB
+from schema.auth import Principal
 from auth.authorization import get_current_active_user
 
 
@@ -16,7 +20,7 @@ logger = logging.getLogger(__name__)
 
 
 
-async def check_password_changed(current_user: UserInDB = Depends(get_current_active_user)):
+async def check_password_changed(current_user: Principal = Depends(get_current_active_user)):
     """
     Restrict access to users who have not changed their password after the first login.
     """
@@ -27,6 +31,68 @@ async def check_password_changed(current_user: UserInDB = Depends(get_current_ac
         )
 
 
+# KEYS[1] = sliding-window sorted set, KEYS[2] = block flag
+# ARGV = now_ms, window_ms, limit, block_ms, unique member
+# Returns {1, remaining} when allowed, {0, retry_after_ms} when blocked.
+RATE_LIMIT_LUA = """
+local blocked_ttl = redis.call('PTTL', KEYS[2])
+if blocked_ttl > 0 then
+    return {0, blocked_ttl}
+end
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+local count = redis.call('ZCARD', KEYS[1])
+if count >= limit then
+    redis.call('SET', KEYS[2], '1', 'PX', ARGV[4])
+    redis.call('DEL', KEYS[1])
+    return {0, tonumber(ARGV[4])}
+end
+redis.call('ZADD', KEYS[1], now, ARGV[5])
+redis.call('PEXPIRE', KEYS[1], window)
+return {1, limit - count - 1}
+"""
+
+
+class LocalTokenBucket:
+    """
+    Per-process token bucket in front of the Redis limiter, so clients that
+    are already over the limit (or blocked) are rejected without a round trip.
+    """
+    def __init__(self, capacity: int, refill_per_second: float, max_clients: int = 10000):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.max_clients = max_clients
+        self.buckets = OrderedDict()  # client_id -> (tokens, last_refill)
+        self.blocked_until = {}  # client_id -> monotonic deadline
+
+    def block(self, client_id: str, until: float):
+        self.blocked_until[client_id] = until
+
+    def retry_after(self, client_id: str, now: float) -> int:
+        """
+        Take a token for the client; return 0 when allowed, otherwise the
+        number of seconds to wait.
+        """
+        until = self.blocked_until.get(client_id)
+        if until is not None:
+            if until > now:
+                return math.ceil(until - now)
+            del self.blocked_until[client_id]
+
+        tokens, last_refill = self.buckets.pop(client_id, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - last_refill) * self.refill_per_second)
+        if tokens < 1:
+            self.buckets[client_id] = (tokens, now)
+            return max(1, math.ceil((1 - tokens) / self.refill_per_second))
+
+        self.buckets[client_id] = (tokens - 1, now)
+        if len(self.buckets) > self.max_clients:
+            self.buckets.popitem(last=False)
+        return 0
+
+
 class SecurityMiddleware:
     def __init__(self):
         self.redis = None  # Async Redis client
@@ -37,6 +103,14 @@ class SecurityMiddleware:
         self.max_failed_attempts = int(os.getenv("MAX_FAILED_ATTEMPTS", 3))
         self.failed_attempts_expiration = int(os.getenv("FAILED_ATTEMPTS_EXPIRATION", 3600))
         self.request_expiration = int(os.getenv("REQUEST_EXPIRATION", 60))
+        self.rate_limit_script = None
+        self.local_bucket = (
+            LocalTokenBucket(
+                capacity=self.max_requests_per_minute,
+                refill_per_second=self.max_requests_per_minute / self.request_expiration,
+            )
+            if settings.RATE_LIMIT_LOCAL_BUCKET else None
+        )
 
     async def setup_redis(self):
         """Initialize async Redis connection."""
@@ -47,51 +121,52 @@ class SecurityMiddleware:
                 decode_responses=True
             )
             await self.redis.ping()
+            self.rate_limit_script = self.redis.register_script(RATE_LIMIT_LUA)
             logger.info("Connected to Redis successfully.")
         except Exception as e:
             logger.error(f"Failed to connect to Redis: {e}")
             self.redis = None  # Disable Redis if connection fails
 
-    async def __call__(self, request: Request, call_next):
-        """Global Rate Limiting Middleware"""
-        if not self.redis:
-            logger.warning("Redis unavailable, skipping rate limiting.")
-            return await call_next(request)
-
-        ip = get_remote_address(request)
-        user_id = request.headers.get("Authorization", f"ip:{ip}")  # Use user token if available
-        blocked_key = f"security:blocked:{user_id}"
-        requests_key = f"security:requests:{user_id}"
-
-        # Check if the user/IP is blocked
-        if await self.redis.exists(blocked_key):
-            time_left = await self.redis.ttl(blocked_key)
-            logger.warning(f"Blocked request from {user_id}. Time left: {time_left} seconds.")
-            raise HTTPException(
-                status_code=403,
-                detail=f"Too many requests. Try again in {time_left} seconds.",
-            )
-
-        # Get request count
-        request_count = await self.get_int_value(requests_key)
-
-        # If the user/IP exceeds rate limit, block them
-        if request_count >= self.max_requests_per_minute:
-            await self.redis.set(blocked_key, "1", ex=self.block_time)
-            logger.warning(f"User {user_id} blocked for {self.block_time} seconds due to rate limit.")
-            raise HTTPException(
-                status_code=403,
-                detail="Too many requests. Try again later.",
+    async def hit(self, client_id: str) -> tuple[bool, int]:
+        """
+        Count one request for a client against the sliding window.
+        Returns (allowed, retry_after_seconds).
+        """
+        now = time.monotonic()
+        if self.local_bucket is not None:
+            retry_after = self.local_bucket.retry_after(client_id, now)
+            if retry_after:
+                return False, retry_after
+
+        if not self.redis or not self.rate_limit_script:
+            return True, 0
+
+        requests_key = f"security:requests:{client_id}"
+        blocked_key = f"security:blocked:{client_id}"
+        now_ms = int(time.time() * 1000)
+        try:
+            allowed, value = await self.rate_limit_script(
+                keys=[requests_key, blocked_key],
+                args=[
+                    now_ms,
+                    self.request_expiration * 1000,
+                    self.max_requests_per_minute,
+                    self.block_time * 1000,
+                    f"{now_ms}-{uuid.uuid4().hex[:8]}",
+                ],
             )
+        except Exception as e:
+            logger.error(f"Rate limiter Redis error: {e}")
+            return True, 0  # Fail-safe mode
 
-        # Increment request count in Redis using a pipeline
-        async with self.redis.pipeline() as pipe:
-            pipe.incr(requests_key)
-            pipe.expire(requests_key, self.request_expiration)
-            await pipe.execute()
+        if int(allowed):
+            return True, 0
 
-        response = await call_next(request)
-        return response
+        retry_after = max(1, math.ceil(int(value) / 1000))
+        if self.local_bucket is not None:
+            self.local_bucket.block(client_id, now + retry_after)
+        logger.warning(f"Blocked request from {client_id}. Time left: {retry_after} seconds.")
+        return False, retry_after
 
     async def is_locked(self, username: str) -> bool:
         """Check if a user is locked due to too many failed login attempts."""
@@ -139,3 +214,37 @@ class SecurityMiddleware:
             return 0  # Fail-safe mode
 
 security_middleware = SecurityMiddleware()
+
+
+class RateLimitMiddleware:
+    """
+    Pure ASGI rate limiting middleware backed by SecurityMiddleware.hit.
+    """
+    def __init__(self, app, limiter: SecurityMiddleware = security_middleware):
+        self.app = app
+        self.limiter = limiter
+
+    @staticmethod
+    def _client_id(scope) -> str:
+        for name, value in scope.get("headers", ()):
+            if name == b"authorization":
+                return value.decode("latin-1")
+        client = scope.get("client")
+        return f"ip:{client[0] if client else '127.0.0.1'}"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        allowed, retry_after = await self.limiter.hit(self._client_id(scope))
+        if not allowed:
+            response = JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={"detail": f"Too many requests. Try again in {retry_after} seconds."},
+                headers={"Retry-After": str(retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
@@ -0,0 +1,85 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.expression import ClauseElement
+
+
+from settings import settings
+
+
+COUNT_MODES = ("exact", "estimated", "none")
+COUNT_PATTERN = "^(exact|estimated|none)$"
+
+
+def encode_cursor(timestamp: datetime, object_id: int) -> str:
+    """
+    Build an opaque keyset cursor from the last row of a page.
+    """
+    payload = json.dumps([timestamp.isoformat() if timestamp else None, object_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Decode a cursor produced by encode_cursor, raising 400 when it is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, object_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(timestamp), int(object_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Invalid pagination cursor.")
+
+
+class Explain(Executable, ClauseElement):
+    """
+    EXPLAIN (FORMAT JSON) of a statement. The statement is compiled by the
+    same compiler as the wrapper, so its parameters (including expanding IN
+    lists) are bound exactly as when it runs on its own.
+    """
+    inherit_cache = False
+
+    def __init__(self, statement) -> None:
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return f"EXPLAIN (FORMAT JSON) {compiler.process(element.statement, **kw)}"
+
+
+async def estimate_count(db_session: AsyncSession, query) -> int:
+    """
+    Row estimate for a query from the PostgreSQL planner, without executing it.
+    """
+    result = await db_session.execute(Explain(query))
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_query(db_session: AsyncSession, query, count: str = "exact") -> Optional[int]:
+    """
+    Total rows of a query under the given count mode.
+
+    "exact" runs COUNT(*), "estimated" uses the planner estimate (falling back
+    to an exact count when the estimate is small enough to be cheap) and
+    "none" skips counting and returns None.
+    """
+    if count == "none":
+        return None
+    query = query.order_by(None)
+    if count == "estimated":
+        estimate = await estimate_count(db_session, query)
+        if estimate >= settings.COUNT_ESTIMATE_EXACT_BELOW:
+            return estimate
+    result = await db_session.execute(select(func.count()).select_from(query.subquery()))
+    return result.scalar_one()
@@ -0,0 +1,81 @@
+from itertools import product
+from typing import Optional
+
+
+# Plate letter codes used by the LPR and their Persian display characters
+dict_char_alpha = {
+    'a':'ا', 'b': "ب", 'c': 'ص', 'd':'د', 'e': 'ژ', 'f':'ف', 'g':'گ', 'h':'ه', 'i':'ع','j': 'ج',
+    'k':'ک', 'l':'ل', 'm':'م','n':'ن','o':'ث','q':'ق', 's':'س', 't':'ت','v':'و' , 'w':'ط', 'y':'ی', 'x':'x',
+    'p':'پ', 'u':'ش' , 'z':'ز', 'D':'D', 'S':'S',
+}
+persian_char_alpha = {value: key for key, value in dict_char_alpha.items() if value != key}
+
+# Persian and Arabic-Indic digits typed by users
+DIGIT_TRANSLATION = str.maketrans("۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩", "01234567890123456789")
+
+# (segment, length) in plate key order: 12 b 345 67
+PLATE_SEGMENTS = (("prefix_2", 2), ("alpha", 1), ("mid_3", 3), ("suffix_2", 2))
+
+LIKE_ESCAPE = "\\"
+
+
+def normalize_plate_text(value: str) -> str:
+    """
+    Map Persian digits and letters to the codes stored by the LPR.
+    """
+    value = value.strip().translate(DIGIT_TRANSLATION)
+    return "".join(persian_char_alpha.get(char, char) for char in value)
+
+
+def canonical_plate_key(prefix_2: str, alpha: str, mid_3: str, suffix_2: str) -> str:
+    """
+    Fixed-width key stored with every traffic row and matched by plate filters.
+    """
+    return normalize_plate_text(f"{prefix_2}{alpha}{mid_3}{suffix_2}")
+
+
+def escape_like(value: str) -> str:
+    return (
+        value.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2)
+        .replace("%", f"{LIKE_ESCAPE}%")
+        .replace("_", f"{LIKE_ESCAPE}_")
+    )
+
+
+def segment_key_patterns(segments: dict) -> Optional[list[str]]:
+    """
+    Turn per-segment filters into positional LIKE patterns on the plate key
+    (e.g. prefix_2="12", mid_3="345" -> ["12_345__"]).
+
+    A value shorter than its segment may sit at any offset inside it, so it
+    yields one pattern per placement (mid_3="4" -> "___4____", "____4___",
+    "_____4__"); the plate matches if any pattern does. Returns None without
+    segment filters and an empty list when a value can't fit its segment.
+    """
+    choices = []
+    has_value = False
+    for name, length in PLATE_SEGMENTS:
+        value = segments.get(name)
+        value = normalize_plate_text(value) if value else None
+        if not value:
+            choices.append(["_" * length])
+            continue
+        has_value = True
+        escaped = escape_like(value)
+        choices.append([
+            "_" * offset + escaped + "_" * (length - len(value) - offset)
+            for offset in range(length - len(value) + 1)
+        ])
+    if not has_value:
+        return None
+    return ["".join(parts) for parts in product(*choices)]
+
+
+def plate_search_pattern(pattern: str) -> str:
+    """
+    Convert a user plate pattern into a LIKE pattern on the plate key:
+    ? matches one character, * any run, and the pattern may match anywhere
+    (e.g. "12?345" -> "%12_345%").
+    """
+    escaped = escape_like(normalize_plate_text(pattern))
+    return "%" + escaped.replace("?", "_").replace("*", "%") + "%"
@@ -0,0 +1,83 @@
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+_current_counter: ContextVar[Optional["QueryCounter"]] = ContextVar("query_counter", default=None)
+
+
+class QueryCounter:
+    """
+    Number of SQL statements executed while the counter is active.
+    """
+    def __init__(self) -> None:
+        self.count = 0
+
+
+def _on_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    counter = _current_counter.get()
+    if counter is not None:
+        counter.count += 1
+
+
+def install_query_counter(db_engine: AsyncEngine) -> None:
+    """
+    Count statements run on an engine for whichever counter is active in the
+    calling task. SQLAlchemy's async layer carries contextvars into the
+    greenlet that executes the statement, so concurrent requests don't mix.
+    """
+    if not event.contains(db_engine.sync_engine, "before_cursor_execute", _on_execute):
+        event.listen(db_engine.sync_engine, "before_cursor_execute", _on_execute)
+
+
+@contextmanager
+def count_queries():
+    """
+    Count the statements executed inside the block:
+
+        with count_queries() as queries:
+            await gate_op.get_all_objects(1, 10)
+        assert queries.count <= 3
+    """
+    counter = QueryCounter()
+    token = _current_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _current_counter.reset(token)
+
+
+class QueryCountMiddleware:
+    """
+    Pure ASGI middleware reporting the statements each request executed in an
+    X-Query-Count header, and logging requests above QUERY_COUNT_WARN_THRESHOLD.
+    """
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with count_queries() as queries:
+            async def send_with_count(message):
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", ()))
+                    headers.append((b"x-query-count", str(queries.count).encode()))
+                    message = {**message, "headers": headers}
+                    if queries.count > settings.QUERY_COUNT_WARN_THRESHOLD:
+                        logger.warning(
+                            f"{scope['method']} {scope['path']} executed {queries.count} queries"
+                        )
+                await send(message)
+
+            await self.app(scope, receive, send_with_count)
@@ -0,0 +1,210 @@
+import functools
+import hashlib
+import inspect
+import json
+import time
+from typing import Iterable, Optional
+
+from fastapi import Request, Response, status
+from fastapi.responses import ORJSONResponse
+
+from database.engine import async_session
+from models.user import UserType
+from redis_cache import RedisCache, redis_cache
+from schema.auth import Principal
+from settings import settings
+
+
+# Writes to a table also change what is listed under these tags, e.g.
+# deleting a gate cascades to its cameras and relays.
+DEPENDENT_TAGS = {
+    "buildings": ("gates",),
+    "gates": ("cameras", "relays"),
+    "lprs": ("cameras", "lpr_setting_instances"),
+    "cameras": ("camera_setting_instances", "keys"),
+    "relays": ("keys",),
+    "statuses": ("keys",),
+    "users": ("vehicles", "guests"),
+    "guests": ("vehicles",),
+}
+
+
+def expand_tags(tags: Iterable[str]) -> set[str]:
+    """
+    The given tags plus every tag that depends on them, transitively.
+    """
+    expanded, pending = set(), list(tags)
+    while pending:
+        tag = pending.pop()
+        if tag not in expanded:
+            expanded.add(tag)
+            pending.extend(DEPENDENT_TAGS.get(tag, ()))
+    return expanded
+
+
+def principal_scope(principal: Optional[Principal]) -> str:
+    """
+    The slice of data a principal can see: admins and staff share one scope,
+    viewers share one per set of accessible gates, anyone else gets their own.
+    """
+    if principal is None:
+        return "anonymous"
+    if principal.user_type in (UserType.ADMIN, UserType.STAFF):
+        return "staff"
+    if principal.user_type == UserType.VIEWER:
+        return f"viewer:{','.join(str(gate_id) for gate_id in sorted(principal.gate_ids))}"
+    return f"user:{principal.id}"
+
+
+class ResponseCache:
+    """
+    Read-through cache of serialized API responses, tagged by the tables they
+    were built from.
+
+    Every tag has a generation counter that is folded into the cache key, so
+    invalidating a tag is one INCR and superseded entries age out by TTL.
+    Hits, misses and invalidations are counted in a Redis hash shared by all
+    workers.
+    """
+    STATS_KEY = "cache:response:stats"
+
+    def __init__(self, cache: RedisCache) -> None:
+        self.cache = cache
+
+    @staticmethod
+    def tag_key(tag: str) -> str:
+        return f"cache:tag:{tag}"
+
+    async def _count(self, field: str, amount: int = 1) -> None:
+        async with self.cache.get_connection() as conn:
+            await conn.hincrby(self.STATS_KEY, field, amount)
+
+    async def fingerprint(self, endpoint: str, tags: Iterable[str], scope: str, params: dict) -> str:
+        """
+        Digest of an endpoint call and the current generations of its tags.
+        It changes whenever a tagged table is written, so it doubles as the
+        version of the response.
+        """
+        tags = sorted(tags)
+        async with self.cache.get_connection() as conn:
+            generations = await conn.mget([self.tag_key(tag) for tag in tags])
+
+        fingerprint = json.dumps(
+            [endpoint, dict(zip(tags, generations)), scope, params], sort_keys=True, default=str
+        )
+        return hashlib.md5(fingerprint.encode()).hexdigest()
+
+    async def get_or_compute(self, endpoint: str, digest: str, compute, ttl: int = None):
+        key = f"cache:response:{endpoint}:{digest}"
+
+        computed = False
+
+        async def tracked_compute():
+            nonlocal computed
+            computed = True
+            return await compute()
+
+        value = await self.cache.get_or_compute(key, tracked_compute, ttl=ttl or settings.CONFIG_CACHE_TTL)
+        await self._count("misses" if computed else "hits")
+        return value
+
+    async def invalidate(self, *tags: str) -> None:
+        tags = expand_tags(tags)
+        async with self.cache.get_connection() as conn:
+            async with conn.pipeline(transaction=False) as pipe:
+                for tag in tags:
+                    pipe.incr(self.tag_key(tag))
+                pipe.hincrby(self.STATS_KEY, "invalidations", len(tags))
+                await pipe.execute()
+
+    async def stats(self) -> dict:
+        async with self.cache.get_connection() as conn:
+            counters = await conn.hgetall(self.STATS_KEY)
+        stats = {field: int(counters.get(field, 0)) for field in ("hits", "misses", "invalidations")}
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else None
+        return stats
+
+
+response_cache = ResponseCache(redis_cache)
+
+
+def make_etag(digest: str) -> str:
+    """
+    Weak ETag for a response fingerprint. It also rolls over every
+    CONFIG_CACHE_TTL seconds, so a client revalidating with it never keeps an
+    embedded MinIO presigned link past its expiry.
+    """
+    epoch = int(time.time() // settings.CONFIG_CACHE_TTL)
+    return f'W/"{hashlib.md5(f"{digest}:{epoch}".encode()).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {candidate.strip() for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def cached_response(response_model, tags: Iterable[str], ttl: int = None):
+    """
+    Serve a GET endpoint through response_cache. The cache key covers the
+    endpoint, its query/path parameters and the caller's principal scope;
+    the entry is invalidated whenever one of the tagged tables changes.
+    The endpoint must take its principal as current_user.
+
+    Responses carry an ETag derived from the same tag generations, and a
+    matching If-None-Match gets a 304 before the endpoint or the cache is
+    touched.
+
+    Cached entries were validated against response_model when they were
+    computed, so hits are written out with orjson as they are.
+
+    The cache may run the computation after the request has finished (a
+    background refresh, or a miss other callers share), so it gets its own
+    database session in place of the request's db.
+    """
+    tags = tuple(tags)
+
+    def decorator(func):
+        endpoint = f"{func.__module__}.{func.__qualname__}"
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            request: Request = kwargs["request"]
+            call_kwargs = {name: value for name, value in kwargs.items() if name in signature.parameters}
+            params = {
+                name: value for name, value in call_kwargs.items()
+                if name not in ("db", "current_user", "request")
+            }
+
+            digest = await response_cache.fingerprint(
+                endpoint, tags, principal_scope(kwargs.get("current_user")), params
+            )
+            etag = make_etag(digest)
+            headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+            if etag_matches(request.headers.get("if-none-match"), etag):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+            async def compute():
+                if "db" not in call_kwargs:
+                    result = await func(*args, **call_kwargs)
+                    return response_model.model_validate(result).model_dump(mode="json")
+                async with async_session() as db:
+                    result = await func(*args, **{**call_kwargs, "db": db})
+                    return response_model.model_validate(result).model_dump(mode="json")
+
+            content = await response_cache.get_or_compute(endpoint, digest, compute, ttl)
+            return ORJSONResponse(content, headers=headers)
+
+        # Let FastAPI inject the request the wrapper needs
+        extra = [
+            inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY, annotation=Request)
+        ] if "request" not in signature.parameters else []
+        wrapper.__signature__ = signature.replace(
+            parameters=[*signature.parameters.values(), *extra]
+        )
+        return wrapper
+
+    return decorator
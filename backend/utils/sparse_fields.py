@@ -0,0 +1,43 @@
+import functools
+from typing import Optional, Type
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, create_model
+
+
+FIELDS_DESCRIPTION = "Comma-separated fields to return (e.g. plate_number,timestamp,gate_name); all fields if omitted"
+
+
+def parse_fields(fields: Optional[str], schema: Type[BaseModel]) -> Optional[tuple[str, ...]]:
+    """
+    Validate a fields= query parameter against a response schema. The id is
+    always included so clients can still key the rows. None means every
+    field.
+    """
+    if not fields:
+        return None
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = sorted(set(requested) - set(schema.model_fields))
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+    if "id" in schema.model_fields:
+        requested.insert(0, "id")
+    return tuple(dict.fromkeys(requested))
+
+
+@functools.lru_cache(maxsize=256)
+def sparse_model(schema: Type[BaseModel], fields: Optional[tuple[str, ...]]) -> Type[BaseModel]:
+    """
+    A copy of schema limited to the selected fields, with the same types and
+    config. Returns schema itself when no selection was made.
+    """
+    if fields is None:
+        return schema
+    return create_model(
+        f"Sparse{schema.__name__}",
+        __config__=schema.model_config,
+        **{name: (schema.model_fields[name].annotation, schema.model_fields[name]) for name in fields},
+    )
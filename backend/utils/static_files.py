@@ -0,0 +1,16 @@
+from fastapi.staticfiles import StaticFiles
+
+from image_storage.content_store import IMMUTABLE_CACHE_CONTROL, is_content_addressed
+
+
+class ImageStaticFiles(StaticFiles):
+    """
+    StaticFiles marking content-addressed images as immutable. Their name is
+    the hash of their bytes, so a URL never changes content and browsers and
+    proxies can keep it for IMAGE_IMMUTABLE_MAX_AGE without revalidating.
+    """
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if is_content_addressed(full_path):
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
@@ -0,0 +1,286 @@
+import asyncio
+import logging
+import shutil
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+from zipfile import ZipFile, ZIP_STORED
+
+import openpyxl
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import func
+from sqlalchemy.future import select
+
+from settings import settings
+from database.engine import async_session
+from crud.traffic import TrafficOperation
+from models.traffic import DBTraffic
+from redis_cache import redis_cache
+from image_storage.storage_management import StorageFactory
+from utils.plates import dict_char_alpha
+
+
+logger = logging.getLogger(__name__)
+
+ZIP_FILE_DIR = Path("uploads") / "zips"
+ZIP_FILE_DIR.mkdir(parents=True, exist_ok=True)
+
+EXPORT_HEADERS = ["ID", "Plate Number", "OCR Accuracy", "Vision Speed", "Timestamp", "Camera", "Gate", "Plate Image", "Full Image"]
+
+# Keeps references to running jobs so they are not garbage collected
+_running_exports = set()
+
+
+def persian_plate_number(plate_number: str) -> str:
+    return plate_number[3:] + dict_char_alpha.get(plate_number[2], plate_number[2]) + plate_number[:2]
+
+
+class TrafficExportWriter:
+    """
+    Writes an export ZIP in one pass: images are streamed from storage
+    straight into their ZIP entries and rows go to a write-only worksheet,
+    which is saved as the last entry. All methods block; run them in a
+    worker thread.
+    """
+    extension = "zip"
+    entity_rows = True  # batches are DBTraffic objects
+
+    @staticmethod
+    def batch_size() -> int:
+        return settings.EXPORT_BATCH_SIZE
+
+    @staticmethod
+    def prepare_query(query):
+        return query
+
+    def __init__(self, zip_path: Path, storage):
+        self.storage = storage
+        self.zip_file = ZipFile(zip_path, "w", compression=ZIP_STORED, allowZip64=True)
+        self.workbook = openpyxl.Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet("Traffic Data")
+        self.sheet.append(EXPORT_HEADERS)
+
+    def add_image(self, image_path: Optional[str], folder: str, traffic_id: int) -> Optional[str]:
+        """Copy one image into the ZIP and return its archive name."""
+        if not image_path:
+            return None
+        arcname = f"{folder}/{traffic_id}_{Path(image_path).name}"
+        try:
+            with self.storage.open_image(image_path) as source:
+                if source is None:
+                    return None
+                with self.zip_file.open(arcname, "w") as target:
+                    shutil.copyfileobj(source, target)
+        except Exception as e:
+            logger.warning(f"Skipping image {image_path} in export: {e}")
+            return None
+        return arcname
+
+    def write_batch(self, items) -> None:
+        for item in items:
+            plate_image = self.add_image(item.plate_image, "plate_images", item.id)
+            full_image = self.add_image(item.full_image, "full_images", item.id)
+            self.sheet.append([
+                item.id,
+                persian_plate_number(item.plate_number),
+                item.ocr_accuracy,
+                item.vision_speed,
+                item.timestamp.isoformat(),
+                item.camera_name,
+                item.gate_name,
+                f'=HYPERLINK("{plate_image}", "View Image")' if plate_image else None,
+                f'=HYPERLINK("{full_image}", "View Image")' if full_image else None,
+            ])
+
+    def close(self) -> None:
+        with self.zip_file.open("traffic_data.xlsx", "w", force_zip64=True) as target:
+            self.workbook.save(target)
+        self.zip_file.close()
+
+    def abort(self) -> None:
+        self.zip_file.close()
+
+
+class TrafficParquetWriter:
+    """
+    Writes typed traffic columns to Parquet, one row group per DB batch, so
+    memory stays bounded by the batch size. Images are exported as their
+    storage keys.
+    """
+    extension = "parquet"
+    entity_rows = False  # batches are plain column tuples
+
+    COLUMNS = (
+        ("id", pa.int64()),
+        ("plate_number", pa.string()),
+        ("plate_key", pa.string()),
+        ("prefix_2", pa.string()),
+        ("alpha", pa.string()),
+        ("mid_3", pa.string()),
+        ("suffix_2", pa.string()),
+        ("timestamp", pa.timestamp("us")),
+        ("ocr_accuracy", pa.float64()),
+        ("vision_speed", pa.float64()),
+        ("camera_id", pa.int32()),
+        ("camera_name", pa.string()),
+        ("gate_id", pa.int32()),
+        ("gate_name", pa.string()),
+        ("access_granted", pa.bool_()),
+        ("plate_image", pa.string()),
+        ("full_image", pa.string()),
+    )
+    schema = pa.schema(COLUMNS)
+
+    @staticmethod
+    def batch_size() -> int:
+        return settings.EXPORT_PARQUET_ROW_GROUP_SIZE
+
+    @classmethod
+    def prepare_query(cls, query):
+        return query.with_only_columns(*(getattr(DBTraffic, name) for name, _ in cls.COLUMNS))
+
+    def __init__(self, path: Path, storage=None):
+        self.writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+
+    def write_batch(self, rows) -> None:
+        columns = list(zip(*rows))
+        arrays = [
+            pa.array(values, type=column_type)
+            for values, (_, column_type) in zip(columns, self.COLUMNS)
+        ]
+        self.writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self) -> None:
+        self.writer.close()
+
+    def abort(self) -> None:
+        self.writer.close()
+
+
+EXPORT_WRITERS = {
+    "zip": TrafficExportWriter,
+    "parquet": TrafficParquetWriter,
+}
+
+
+def _state_key(job_id: str) -> str:
+    return f"export:traffic:{job_id}"
+
+
+async def _save_state(state: dict) -> None:
+    state["updated_at"] = datetime.now(timezone.utc).isoformat()
+    await redis_cache.set(_state_key(state["job_id"]), state, ttl=settings.EXPORT_ARTIFACT_TTL)
+
+
+async def _heartbeat(state: dict) -> None:
+    """
+    Refresh updated_at while a job runs, so long batches don't look stalled.
+    """
+    while True:
+        await asyncio.sleep(settings.EXPORT_HEARTBEAT_INTERVAL)
+        await _save_state(state)
+
+
+def _is_stale(state: dict) -> bool:
+    if state["status"] not in ("pending", "running") or not state.get("updated_at"):
+        return False
+    age = datetime.now(timezone.utc) - datetime.fromisoformat(state["updated_at"])
+    return age.total_seconds() > settings.EXPORT_STALE_AFTER
+
+
+async def get_traffic_export(job_id: str) -> Optional[dict]:
+    """
+    Current state of an export job. A pending or running job whose worker
+    stopped heartbeating (e.g. the process died) is reported, and stored,
+    as failed.
+    """
+    state = await redis_cache.get(_state_key(job_id))
+    if state is not None and _is_stale(state):
+        state.update(status="failed", error="Export worker stopped responding")
+        await _save_state(state)
+    return state
+
+
+async def start_traffic_export(filters: dict, user_id: int, export_format: str = "zip") -> dict:
+    """
+    Register an export job and run it in the background.
+    """
+    job_id = uuid.uuid4().hex
+    state = {
+        "job_id": job_id,
+        "format": export_format,
+        "status": "pending",
+        "owner_id": user_id,
+        "processed": 0,
+        "total": None,
+        "file_name": None,
+        "error": None,
+        "created_at": datetime.now().isoformat(),
+    }
+    await _save_state(state)
+    task = asyncio.create_task(_run_traffic_export(state, filters))
+    _running_exports.add(task)
+    task.add_done_callback(_running_exports.discard)
+    return state
+
+
+async def _run_traffic_export(state: dict, filters: dict) -> None:
+    writer_class = EXPORT_WRITERS[state["format"]]
+    file_name = (
+        f"traffic_export_{datetime.now():%Y%m%d_%H%M%S}_{state['job_id'][:8]}.{writer_class.extension}"
+    )
+    artifact_path = ZIP_FILE_DIR / file_name
+    writer = None
+    heartbeat = asyncio.create_task(_heartbeat(state))
+    try:
+        storage = StorageFactory.get_instance(settings.STORAGE_BACKEND)
+        async with async_session() as session:
+            query = TrafficOperation(session).build_traffic_query(**filters)
+            total_query = await session.execute(
+                select(func.count()).select_from(query.order_by(None).subquery())
+            )
+            state.update(status="running", total=total_query.scalar_one())
+            await _save_state(state)
+
+            writer = await asyncio.to_thread(writer_class, artifact_path, storage)
+            # Server-side cursor: rows arrive in batches instead of all at once
+            batch_size = writer_class.batch_size()
+            query = writer_class.prepare_query(query).execution_options(yield_per=batch_size)
+            if writer_class.entity_rows:
+                result = await session.stream_scalars(query)
+            else:
+                result = await session.stream(query)
+            async for batch in result.partitions(batch_size):
+                await asyncio.to_thread(writer.write_batch, batch)
+                state["processed"] += len(batch)
+                await _save_state(state)
+
+        await asyncio.to_thread(writer.close)
+        state.update(status="completed", file_name=file_name)
+        await _save_state(state)
+        logger.info(f"Traffic export {state['job_id']} finished with {state['processed']} rows")
+    except Exception as e:
+        logger.error(f"Traffic export {state['job_id']} failed: {e}")
+        if writer is not None:
+            await asyncio.to_thread(writer.abort)
+        artifact_path.unlink(missing_ok=True)
+        state.update(status="failed", error=str(e))
+        await _save_state(state)
+    finally:
+        heartbeat.cancel()
+
+
+async def cleanup_expired_exports() -> None:
+    """
+    Scheduled job: remove export artifacts older than EXPORT_ARTIFACT_TTL.
+    """
+    cutoff = time.time() - settings.EXPORT_ARTIFACT_TTL
+    for path in ZIP_FILE_DIR.glob("traffic_export_*"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError as e:
+            logger.warning(f"Failed to remove export artifact {path}: {e}")
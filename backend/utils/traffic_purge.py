@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+from settings import settings
+from database.engine import async_session
+from crud.traffic import TrafficOperation
+from redis_cache import redis_cache
+from image_storage.storage_management import StorageFactory
+from search_service.search_config import traffic_search
+
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_PURGES_KEY = "purge:traffic:active"
+MAX_REPORTED_ERRORS = 50
+
+# Keeps references to running jobs so they are not garbage collected
+_running_purges = set()
+
+
+def _state_key(job_id: str) -> str:
+    return f"purge:traffic:{job_id}"
+
+
+def _lock_key(job_id: str) -> str:
+    return f"purge:traffic:lock:{job_id}"
+
+
+async def _save_state(state: dict) -> None:
+    await redis_cache.set(_state_key(state["job_id"]), state, ttl=settings.PURGE_STATE_TTL)
+
+
+async def get_traffic_purge(job_id: str) -> Optional[dict]:
+    return await redis_cache.get(_state_key(job_id))
+
+
+def _naive_utc(value: datetime) -> datetime:
+    # Traffic timestamps are stored as naive UTC
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+
+def _spawn(state: dict) -> None:
+    task = asyncio.create_task(_run_traffic_purge(state))
+    _running_purges.add(task)
+    task.add_done_callback(_running_purges.discard)
+
+
+async def start_traffic_purge(
+    start_date: datetime,
+    end_date: datetime,
+    camera_id: Optional[int],
+    user_id: int
+) -> dict:
+    """
+    Register a purge job and run it in the background.
+    """
+    state = {
+        "job_id": uuid.uuid4().hex,
+        "status": "pending",
+        "owner_id": user_id,
+        "camera_id": camera_id,
+        "start_date": _naive_utc(start_date).isoformat(),
+        "end_date": _naive_utc(end_date).isoformat(),
+        # Checkpoint: ids below next_id are done. chunk_end is set while a
+        # chunk's delete is being committed; chunk_ids and pending_images are
+        # what that chunk deleted and are cleaned up from search and storage
+        "next_id": None,
+        "last_id": None,
+        "chunk_end": None,
+        "chunk_ids": [],
+        "pending_images": [],
+        "deleted_count": 0,
+        "image_errors": [],
+        "image_error_count": 0,
+        "created_at": datetime.now().isoformat(),
+    }
+    await _save_state(state)
+    async with redis_cache.get_connection() as conn:
+        await conn.sadd(ACTIVE_PURGES_KEY, state["job_id"])
+    _spawn(state)
+    return state
+
+
+async def resume_traffic_purges() -> None:
+    """
+    Restart unfinished purge jobs from their last checkpoint (run at startup).
+    """
+    async with redis_cache.get_connection() as conn:
+        job_ids = await conn.smembers(ACTIVE_PURGES_KEY)
+    for job_id in job_ids:
+        state = await get_traffic_purge(job_id)
+        if state is None or state["status"] in ("completed", "failed"):
+            async with redis_cache.get_connection() as conn:
+                await conn.srem(ACTIVE_PURGES_KEY, job_id)
+            continue
+        logger.info(f"Resuming traffic purge {job_id} at id {state['next_id']}")
+        _spawn(state)
+
+
+async def _settle_chunk(state: dict, traffic_op: TrafficOperation) -> None:
+    """
+    Resolve a chunk checkpointed before its commit: if its rows are gone the
+    commit went through and the checkpoint advances, otherwise the chunk is
+    redone and its images are kept.
+    """
+    chunk_ids = state.get("chunk_ids", [])
+    if chunk_ids and await traffic_op.traffic_exists(chunk_ids[0]):
+        state.update(chunk_ids=[], pending_images=[])
+    else:
+        state["next_id"] = state["chunk_end"] + 1
+        state["deleted_count"] += len(chunk_ids)
+    state["chunk_end"] = None
+    await _save_state(state)
+
+
+async def _cleanup_chunk(state: dict, storage) -> None:
+    await traffic_search.delete_documents(state.get("chunk_ids", []))
+    errors = await storage.delete_images(state["pending_images"])
+    if errors:
+        state["image_error_count"] += len(errors)
+        room = MAX_REPORTED_ERRORS - len(state["image_errors"])
+        state["image_errors"].extend(errors[:max(room, 0)])
+    state.update(chunk_ids=[], pending_images=[])
+    await _save_state(state)
+
+
+async def _run_traffic_purge(state: dict) -> None:
+    job_id = state["job_id"]
+    async with redis_cache.get_connection() as conn:
+        # Only one worker processes a job at a time
+        if not await conn.set(_lock_key(job_id), "1", nx=True, ex=settings.PURGE_LOCK_TTL):
+            return
+
+        start_date = datetime.fromisoformat(state["start_date"])
+        end_date = datetime.fromisoformat(state["end_date"])
+        camera_id = state["camera_id"]
+        try:
+            storage = StorageFactory.get_instance(settings.STORAGE_BACKEND)
+            async with async_session() as session:
+                traffic_op = TrafficOperation(session)
+                if state["next_id"] is None:
+                    first_id, last_id = await traffic_op.get_id_bounds(start_date, end_date, camera_id)
+                    if first_id is None:
+                        first_id, last_id = 0, -1
+                    state.update(next_id=first_id, last_id=last_id)
+                state["status"] = "running"
+                await _save_state(state)
+
+                if state.get("chunk_end") is not None:
+                    await _settle_chunk(state, traffic_op)
+                if state["pending_images"] or state.get("chunk_ids"):
+                    await _cleanup_chunk(state, storage)
+
+                while state["next_id"] <= state["last_id"]:
+                    chunk_end = min(state["next_id"] + settings.PURGE_CHUNK_SIZE - 1, state["last_id"])
+
+                    async def checkpoint(rows, chunk_end=chunk_end):
+                        # Saved before the commit so a crash in between can't
+                        # lose the image paths of committed rows
+                        state.update(
+                            chunk_end=chunk_end,
+                            chunk_ids=[row.id for row in rows],
+                            pending_images=[
+                                path for row in rows for path in (row.plate_image, row.full_image) if path
+                            ],
+                        )
+                        await _save_state(state)
+
+                    try:
+                        rows = await traffic_op.delete_traffic_chunk(
+                            state["next_id"], chunk_end, start_date, end_date, camera_id,
+                            before_commit=checkpoint,
+                        )
+                    except Exception:
+                        state.update(chunk_end=None, chunk_ids=[], pending_images=[])
+                        await _save_state(state)
+                        raise
+                    state["next_id"] = chunk_end + 1
+                    state["deleted_count"] += len(rows)
+                    state["chunk_end"] = None
+                    await _save_state(state)
+
+                    await _cleanup_chunk(state, storage)
+                    await conn.expire(_lock_key(job_id), settings.PURGE_LOCK_TTL)
+
+            state["status"] = "completed"
+            await _save_state(state)
+            await conn.srem(ACTIVE_PURGES_KEY, job_id)
+            logger.info(f"Traffic purge {job_id} deleted {state['deleted_count']} rows")
+        except asyncio.CancelledError:
+            # Shutdown: keep the job active so it resumes from the checkpoint
+            raise
+        except Exception as e:
+            logger.error(f"Traffic purge {job_id} failed: {e}")
+            state.update(status="failed", error=str(e))
+            await _save_state(state)
+            await conn.srem(ACTIVE_PURGES_KEY, job_id)
+        finally:
+            await conn.delete(_lock_key(job_id))